@@ -0,0 +1,136 @@
+"""initial schema
+
+Revision ID: a1f3c9e2b7d4
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a1f3c9e2b7d4"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("company_name", sa.String(), nullable=False),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("industry", sa.String(), nullable=False),
+        sa.Column("employee_count", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String()),
+        sa.Column("subscription_tier", sa.String()),
+        sa.Column("subscription_status", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("idx_users_email", "users", ["email"])
+    op.create_index("idx_users_company", "users", ["company_name"])
+    op.create_index("idx_users_subscription", "users", ["subscription_tier", "subscription_status"])
+
+    op.create_table(
+        "forms",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("content", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("form_metadata", sa.JSON()),
+        sa.Column("completion_percentage", sa.Float()),
+        sa.Column("processing_status", sa.String()),
+        sa.Column("last_processed_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "form_versions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id"), nullable=False),
+        sa.Column("version_number", sa.Integer(), nullable=False),
+        sa.Column("content", sa.JSON(), nullable=False),
+        sa.Column("changes_description", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("created_by", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+    )
+
+    op.create_table(
+        "form_analyses",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id"), nullable=False),
+        sa.Column("analysis_type", sa.String(), nullable=False),
+        sa.Column("model_used", sa.String(), nullable=False),
+        sa.Column("suggestions", sa.JSON(), nullable=False),
+        sa.Column("compliance_score", sa.Float()),
+        sa.Column("processing_time", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("created_by", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+    )
+
+    op.create_table(
+        "chat_sessions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id"), nullable=False),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("context", sa.JSON(), nullable=False),
+        sa.Column("model_used", sa.String(), nullable=False),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("session_id", sa.String(36), sa.ForeignKey("chat_sessions.id"), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("selected_option", sa.String()),
+        sa.Column("form_updates", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "files",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id"), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("mime_type", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("processing_status", sa.String()),
+        sa.Column("extracted_data", sa.JSON()),
+        sa.Column("uploaded_by", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("files")
+    op.drop_table("chat_messages")
+    op.drop_table("chat_sessions")
+    op.drop_table("form_analyses")
+    op.drop_table("form_versions")
+    op.drop_table("forms")
+    op.drop_index("idx_users_subscription", table_name="users")
+    op.drop_index("idx_users_company", table_name="users")
+    op.drop_index("idx_users_email", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
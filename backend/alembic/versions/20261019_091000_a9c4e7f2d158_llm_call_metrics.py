@@ -0,0 +1,43 @@
+"""llm call metrics
+
+Revision ID: a9c4e7f2d158
+Revises: a1f3c9e2b7d4
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9c4e7f2d158"
+down_revision: Union[str, None] = "a1f3c9e2b7d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Kept out of the initial revision, which must match databases created by create_all
+    # before migrations existed (see "alembic stamp" in the README)
+    op.create_table(
+        "llm_call_metrics",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id", ondelete="SET NULL")),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id", ondelete="SET NULL")),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("queue_wait_ms", sa.Float(), nullable=False),
+        sa.Column("ttft_ms", sa.Float()),
+        sa.Column("latency_ms", sa.Float(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer()),
+        sa.Column("completion_tokens", sa.Integer()),
+        sa.Column("cost_usd", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("llm_call_metrics")
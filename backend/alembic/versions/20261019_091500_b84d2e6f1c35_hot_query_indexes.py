@@ -0,0 +1,43 @@
+"""composite indexes for per-user hot queries
+
+Revision ID: b84d2e6f1c35
+Revises: a9c4e7f2d158
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b84d2e6f1c35"
+down_revision: Union[str, None] = "a9c4e7f2d158"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns); trailing id lets (created_at, id) ordered scans skip the sort
+INDEXES = [
+    ("idx_forms_user_created", "forms", ["user_id", "created_at", "id"]),
+    ("idx_forms_user_status", "forms", ["user_id", "status"]),
+    ("idx_form_versions_form_created", "form_versions", ["form_id", "created_at", "id"]),
+    ("idx_form_analyses_form_created", "form_analyses", ["form_id", "created_at"]),
+    ("idx_chat_sessions_user_status", "chat_sessions", ["user_id", "status"]),
+    ("idx_chat_sessions_user_created", "chat_sessions", ["user_id", "created_at", "id"]),
+    ("idx_chat_sessions_form", "chat_sessions", ["form_id"]),
+    ("idx_chat_messages_session_created", "chat_messages", ["session_id", "created_at", "id"]),
+    ("idx_files_uploader_created", "files", ["uploaded_by", "created_at", "id"]),
+    ("idx_files_form", "files", ["form_id"]),
+    ("idx_llm_call_metrics_user_created", "llm_call_metrics", ["user_id", "created_at"]),
+    ("idx_llm_call_metrics_form_created", "llm_call_metrics", ["form_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
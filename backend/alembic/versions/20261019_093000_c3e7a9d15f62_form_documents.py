@@ -0,0 +1,79 @@
+"""move extracted PDF text from forms.content to form_documents
+
+Revision ID: c3e7a9d15f62
+Revises: b84d2e6f1c35
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e7a9d15f62"
+down_revision: Union[str, None] = "b84d2e6f1c35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+forms = sa.table("forms", sa.column("id", sa.String), sa.column("content", sa.JSON))
+form_documents = sa.table(
+    "form_documents",
+    sa.column("form_id", sa.String),
+    sa.column("text_compressed", sa.LargeBinary),
+    sa.column("text_sha256", sa.String),
+    sa.column("text_length", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+    sa.column("updated_at", sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "form_documents",
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("filename", sa.String()),
+        sa.Column("text_compressed", sa.LargeBinary(), nullable=False),
+        sa.Column("text_sha256", sa.String(64), nullable=False),
+        sa.Column("text_length", sa.Integer(), nullable=False),
+        sa.Column("opening_turn", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    # Precomputed opening turns are dropped rather than moved; they are recomputed on the next upload
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    for form_id, content in connection.execute(sa.select(forms.c.id, forms.c.content)).all():
+        if not isinstance(content, dict) or not ({"text", "opening_turn"} & content.keys()):
+            continue
+        text = content.get("text")
+        if text:
+            raw = text.encode("utf-8")
+            connection.execute(form_documents.insert().values(
+                form_id=form_id,
+                text_compressed=zlib.compress(raw, 6),
+                text_sha256=hashlib.sha256(raw).hexdigest(),
+                text_length=len(text),
+                created_at=now,
+                updated_at=now,
+            ))
+        slim = {key: value for key, value in content.items() if key not in ("text", "opening_turn")}
+        connection.execute(forms.update().where(forms.c.id == form_id).values(content=slim))
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(
+        forms.c.id, forms.c.content, form_documents.c.text_compressed
+    ).join(form_documents, form_documents.c.form_id == forms.c.id)).all()
+    for form_id, content, text_compressed in rows:
+        text = zlib.decompress(text_compressed).decode("utf-8")
+        connection.execute(
+            forms.update().where(forms.c.id == form_id).values(content={**(content or {}), "text": text})
+        )
+    op.drop_table("form_documents")
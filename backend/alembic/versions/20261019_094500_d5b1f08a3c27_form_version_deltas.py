@@ -0,0 +1,38 @@
+"""delta-encoded form versions with periodic snapshots
+
+Revision ID: d5b1f08a3c27
+Revises: c3e7a9d15f62
+Create Date: 2026-10-19 09:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b1f08a3c27"
+down_revision: Union[str, None] = "c3e7a9d15f62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows hold full content and stay snapshots; new versions are written as deltas
+    with op.batch_alter_table("form_versions") as batch_op:
+        batch_op.add_column(sa.Column("is_snapshot", sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.add_column(sa.Column("delta", sa.JSON()))
+        batch_op.alter_column("content", existing_type=sa.JSON(), nullable=True)
+    op.create_index(
+        "idx_form_versions_form_number", "form_versions", ["form_id", "version_number", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    # Delta rows cannot be represented without the replay logic; rebuild them in the app before downgrading
+    op.drop_index("idx_form_versions_form_number", table_name="form_versions")
+    with op.batch_alter_table("form_versions") as batch_op:
+        batch_op.alter_column("content", existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column("delta")
+        batch_op.drop_column("is_snapshot")
@@ -0,0 +1,40 @@
+"""per-user and per-company analytics rollups
+
+Revision ID: e6c2a4b9d813
+Revises: d5b1f08a3c27
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6c2a4b9d813"
+down_revision: Union[str, None] = "d5b1f08a3c27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are built on first dashboard read or write, so no backfill is needed here
+    op.create_table(
+        "analytics_rollups",
+        sa.Column("scope", sa.String(16), primary_key=True),
+        sa.Column("scope_id", sa.String(), primary_key=True),
+        sa.Column("total_forms", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("forms_by_status", sa.JSON(), nullable=False),
+        sa.Column("completion_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("completion_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("active_chats", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("recent_analyses", sa.JSON(), nullable=False),
+        sa.Column("recent_files", sa.JSON(), nullable=False),
+        sa.Column("compliance_daily", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_rollups")
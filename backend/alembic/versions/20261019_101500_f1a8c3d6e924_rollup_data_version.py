@@ -0,0 +1,28 @@
+"""data version counter on analytics rollups for response caching
+
+Revision ID: f1a8c3d6e924
+Revises: e6c2a4b9d813
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a8c3d6e924"
+down_revision: Union[str, None] = "e6c2a4b9d813"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("analytics_rollups") as batch_op:
+        batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("analytics_rollups") as batch_op:
+        batch_op.drop_column("version")
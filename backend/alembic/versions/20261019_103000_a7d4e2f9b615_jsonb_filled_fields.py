@@ -0,0 +1,61 @@
+"""JSONB form/file documents with GIN and filled_fields expression indexes
+
+Revision ID: a7d4e2f9b615
+Revises: f1a8c3d6e924
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d4e2f9b615"
+down_revision: Union[str, None] = "f1a8c3d6e924"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB_COLUMNS = (("forms", "content"), ("forms", "form_metadata"), ("files", "extracted_data"))
+
+# Mirrors FILLED_FIELD_INDEXES in app/models/form.py
+FILLED_FIELD_INDEXES = {
+    "idx_forms_ff_establishment_name": ("osha_300", "establishment_name"),
+    "idx_forms_ff_total_hours_worked": ("osha_300a", "total_hours_worked"),
+    "idx_forms_ff_annual_avg_employees": ("osha_300a", "annual_avg_employees"),
+    "idx_forms_ff_case_number": ("osha_301", "case_number"),
+}
+
+
+def _field_expression(dialect: str, path) -> str:
+    # Must render exactly like app.db.types.json_text for the planner to match it
+    if dialect == "postgresql":
+        return "coalesce(content #>> '{filled_fields,%s}', '')" % ",".join(path)
+    return "coalesce(json_extract(content, '$.filled_fields.%s'), '')" % ".".join(path)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for table, column in JSONB_COLUMNS:
+            op.alter_column(
+                table, column, type_=postgresql.JSONB(), postgresql_using=f"{column}::jsonb"
+            )
+        op.create_index(
+            "idx_forms_content_gin", "forms", ["content"],
+            postgresql_using="gin", postgresql_ops={"content": "jsonb_path_ops"},
+        )
+    for name, path in FILLED_FIELD_INDEXES.items():
+        op.create_index(name, "forms", [sa.text("user_id"), sa.text(_field_expression(dialect, path))])
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for name in FILLED_FIELD_INDEXES:
+        op.drop_index(name, table_name="forms")
+    if dialect == "postgresql":
+        op.drop_index("idx_forms_content_gin", table_name="forms")
+        for table, column in JSONB_COLUMNS:
+            op.alter_column(table, column, type_=sa.JSON(), postgresql_using=f"{column}::json")
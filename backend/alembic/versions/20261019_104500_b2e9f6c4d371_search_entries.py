@@ -0,0 +1,129 @@
+"""full-text search entries (Postgres tsvector GIN / SQLite FTS5)
+
+Revision ID: b2e9f6c4d371
+Revises: a7d4e2f9b615
+Create Date: 2026-10-19 10:45:00.000000
+
+"""
+import zlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b2e9f6c4d371"
+down_revision: Union[str, None] = "a7d4e2f9b615"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same statements as SQLITE_FTS_DDL in app/models/search.py
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE search_entries_fts USING fts5("
+    "body, content='search_entries', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER search_entries_ai AFTER INSERT ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER search_entries_au AFTER UPDATE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_entries_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+# Backfill copy of app.services.search_service.form_text as of this revision
+CASE_TEXT_FIELDS = (
+    "employee_name", "job_title", "injury_location", "description_of_injury",
+    "body_part_affected", "object_substance", "injury_type",
+)
+REPORT_TEXT_FIELDS = (
+    "employee_full_name", "activity_before_incident", "how_injury_occurred",
+    "injury_or_illness", "object_that_harmed",
+)
+
+forms = sa.table(
+    "forms", sa.column("id", sa.String), sa.column("user_id", sa.String),
+    sa.column("title", sa.String), sa.column("content", sa.JSON),
+)
+form_documents = sa.table(
+    "form_documents", sa.column("form_id", sa.String), sa.column("text_compressed", sa.LargeBinary),
+)
+chat_sessions = sa.table(
+    "chat_sessions", sa.column("id", sa.String), sa.column("form_id", sa.String), sa.column("user_id", sa.String),
+)
+chat_messages = sa.table(
+    "chat_messages", sa.column("id", sa.String), sa.column("session_id", sa.String), sa.column("content", sa.Text),
+)
+
+
+def _form_text(title, content) -> str:
+    fields = (content or {}).get("filled_fields") or {}
+    lines = [title or ""]
+    cases = (fields.get("osha_300") or {}).get("cases") or []
+    for case in cases if isinstance(cases, list) else []:
+        if isinstance(case, dict):
+            lines.append(" ".join(str(case[name]) for name in CASE_TEXT_FIELDS if case.get(name)))
+    report = fields.get("osha_301") or {}
+    if isinstance(report, dict):
+        lines.append(" ".join(str(report[name]) for name in REPORT_TEXT_FIELDS if report.get(name)))
+    return "\n".join(line for line in lines if line.strip())
+
+
+def upgrade() -> None:
+    search_entries = op.create_table(
+        "search_entries",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("source", sa.String(16), nullable=False),
+        sa.Column("source_id", sa.String(36), nullable=False),
+        sa.Column("form_id", sa.String(36), sa.ForeignKey("forms.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("idx_search_entries_source", "search_entries", ["source", "source_id"], unique=True)
+    op.create_index("idx_search_entries_form", "search_entries", ["form_id"])
+    op.create_index("idx_search_entries_user", "search_entries", ["user_id"])
+
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        op.create_index(
+            "idx_search_entries_tsv", "search_entries",
+            [sa.text("to_tsvector('english', body)")], postgresql_using="gin",
+        )
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+    now = datetime.utcnow()
+    rows = []
+    owners = {}
+    for form_id, user_id, title, content in connection.execute(
+        sa.select(forms.c.id, forms.c.user_id, forms.c.title, forms.c.content)
+    ).all():
+        owners[form_id] = user_id
+        rows.append(("form", form_id, form_id, user_id, _form_text(title, content)))
+    for form_id, text_compressed in connection.execute(
+        sa.select(form_documents.c.form_id, form_documents.c.text_compressed)
+    ).all():
+        if form_id in owners:
+            rows.append(("document", form_id, form_id, owners[form_id], zlib.decompress(text_compressed).decode("utf-8")))
+    for message_id, form_id, user_id, content in connection.execute(
+        sa.select(chat_messages.c.id, chat_sessions.c.form_id, chat_sessions.c.user_id, chat_messages.c.content)
+        .join(chat_sessions, chat_sessions.c.id == chat_messages.c.session_id)
+    ).all():
+        rows.append(("chat", message_id, form_id, user_id, content))
+    rows = [
+        {"source": source, "source_id": source_id, "form_id": form_id, "user_id": user_id, "body": body, "updated_at": now}
+        for source, source_id, form_id, user_id, body in rows
+        if body and body.strip()
+    ]
+    if rows:
+        op.bulk_insert(search_entries, rows)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_entries_fts")
+    op.drop_table("search_entries")
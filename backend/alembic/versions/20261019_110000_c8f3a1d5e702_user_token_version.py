@@ -0,0 +1,28 @@
+"""token version on users for principal caching and token revocation
+
+Revision ID: c8f3a1d5e702
+Revises: b2e9f6c4d371
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8f3a1d5e702"
+down_revision: Union[str, None] = "b2e9f6c4d371"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
@@ -0,0 +1,42 @@
+"""content-addressed upload blobs referenced from files
+
+Revision ID: d4b7e2a9f318
+Revises: c8f3a1d5e702
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e2a9f318"
+down_revision: Union[str, None] = "c8f3a1d5e702"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=False), nullable=True),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    # Existing uploads keep their own files (sha256 NULL) until deleted
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.add_column(sa.Column("sha256", sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key("fk_files_sha256_blobs", "blobs", ["sha256"], ["sha256"])
+        batch_op.create_index("idx_files_sha256", ["sha256"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.drop_index("idx_files_sha256")
+        batch_op.drop_constraint("fk_files_sha256_blobs", type_="foreignkey")
+        batch_op.drop_column("sha256")
+    op.drop_table("blobs")
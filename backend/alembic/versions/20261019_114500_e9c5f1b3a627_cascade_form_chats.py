@@ -0,0 +1,41 @@
+"""delete a form's chat sessions and their messages with it
+
+Revision ID: e9c5f1b3a627
+Revises: d4b7e2a9f318
+Create Date: 2026-10-19 11:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9c5f1b3a627"
+down_revision: Union[str, None] = "d4b7e2a9f318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The initial schema left these unnamed: Postgres named them <table>_<column>_fkey, and
+# SQLite batch mode names them through this convention so they can be dropped
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+FOREIGN_KEYS = (
+    ("chat_sessions", "form_id", "forms"),
+    ("chat_messages", "session_id", "chat_sessions"),
+)
+
+
+def _replace_foreign_keys(ondelete: Union[str, None]) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+            batch_op.create_foreign_key(name, referred, [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
@@ -0,0 +1,28 @@
+"""one form version per form and version number
+
+Revision ID: f2a8d6c4b913
+Revises: e9c5f1b3a627
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a8d6c4b913"
+down_revision: Union[str, None] = "e9c5f1b3a627"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails if a form already repeats a version number; those rows have to be renumbered first
+    op.create_index(
+        "idx_form_versions_unique", "form_versions", ["form_id", "version_number"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_form_versions_unique", table_name="form_versions")
@@ -1,103 +1,119 @@
 from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
 
+from app.core.response_cache import response_cache
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.replica import get_read_db
+from app.db.session import get_async_db
 from app.models.user import User
-from app.models.form import Form, FormAnalysis
-from app.models.chat import ChatSession
-from app.models.file import File
+from app.models.metrics import LLMCallMetric
+from app.services.analytics_service import get_data_version, get_rollup, rollup_summary
+from app.services.metrics_service import llm_metrics
 
 router = APIRouter()
 
 @router.get("/dashboard")
-def get_dashboard_stats(
-    db: Session = Depends(get_db),
+async def get_dashboard_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Get dashboard statistics.
+    Get dashboard statistics from the user's analytics rollup. Supports If-None-Match.
     """
-    # Get total forms count
-    total_forms = db.query(func.count(Form.id)).filter(
-        Form.user_id == current_user.id
-    ).scalar()
-    
-    # Get forms by status
-    forms_by_status = db.query(
-        Form.status,
-        func.count(Form.id)
-    ).filter(
-        Form.user_id == current_user.id
-    ).group_by(Form.status).all()
-    
-    # Get average completion percentage
-    avg_completion = db.query(
-        func.avg(Form.completion_percentage)
-    ).filter(
-        Form.user_id == current_user.id
-    ).scalar() or 0
-    
-    # Get recent analyses
-    recent_analyses = db.query(FormAnalysis).join(Form).filter(
-        Form.user_id == current_user.id
-    ).order_by(FormAnalysis.created_at.desc()).limit(5).all()
-    
-    # Get active chat sessions
-    active_chats = db.query(func.count(ChatSession.id)).filter(
-        ChatSession.user_id == current_user.id,
-        ChatSession.status == "active"
-    ).scalar()
-    
-    # Get recent file uploads
-    recent_files = db.query(File).filter(
-        File.uploaded_by == current_user.id
-    ).order_by(File.created_at.desc()).limit(5).all()
-    
-    # Get compliance score trend
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    compliance_trend = db.query(
-        func.date(FormAnalysis.created_at),
-        func.avg(FormAnalysis.compliance_score)
-    ).join(Form).filter(
-        Form.user_id == current_user.id,
-        FormAnalysis.created_at >= thirty_days_ago
-    ).group_by(
-        func.date(FormAnalysis.created_at)
-    ).all()
-    
+    async def build(response):
+        return rollup_summary(await get_rollup(db, "user", current_user.id))
+
+    version = await get_data_version(db, "user", current_user.id)
+    # The trend window moves daily even when nothing is written
+    return await response_cache.respond(
+        request, current_user.id, version, build, vary=(datetime.utcnow().date(),)
+    )
+
+@router.get("/company")
+async def get_company_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get dashboard statistics across every user of the current user's company. Admins only.
+    Supports If-None-Match.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions.")
+
+    async def build(response):
+        rollup = await get_rollup(db, "company", current_user.company_name)
+        return {"company_name": current_user.company_name, **rollup_summary(rollup)}
+
+    version = await get_data_version(db, "company", current_user.company_name)
+    return await response_cache.respond(
+        request, f"company:{current_user.company_name}", version, build, vary=(datetime.utcnow().date(),)
+    )
+
+@router.get("/llm-usage")
+async def get_llm_usage(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    group_by: str = Query("form", pattern="^(form|model|user)$"),
+    days: int = Query(30, ge=1, le=365),
+) -> Any:
+    """
+    Get LLM latency, token and cost totals grouped by form, model or user.
+    Admins see the calls of every user in their company; everyone else sees their own.
+    """
+    # Make calls still sitting in the write buffer visible; the recorder writes through the sync engine
+    await run_in_threadpool(llm_metrics.flush)
+
+    group_column = {
+        "form": LLMCallMetric.form_id,
+        "model": LLMCallMetric.model,
+        "user": LLMCallMetric.user_id,
+    }[group_by]
+    query = select(
+        group_column,
+        func.count(LLMCallMetric.id),
+        func.sum(case((LLMCallMetric.status != "ok", 1), else_=0)),
+        func.avg(LLMCallMetric.queue_wait_ms),
+        func.avg(LLMCallMetric.ttft_ms),
+        func.avg(LLMCallMetric.latency_ms),
+        func.max(LLMCallMetric.latency_ms),
+        func.sum(LLMCallMetric.prompt_tokens),
+        func.sum(LLMCallMetric.completion_tokens),
+        func.sum(LLMCallMetric.cost_usd),
+    ).where(
+        LLMCallMetric.created_at >= datetime.utcnow() - timedelta(days=days)
+    )
+    if current_user.role == "admin":
+        query = query.where(LLMCallMetric.user_id.in_(
+            select(User.id).where(User.company_name == current_user.company_name)
+        ))
+    else:
+        query = query.where(LLMCallMetric.user_id == current_user.id)
+    rows = (await db.execute(query.group_by(group_column))).all()
+
     return {
-        "total_forms": total_forms,
-        "forms_by_status": dict(forms_by_status),
-        "average_completion": round(avg_completion, 2),
-        "recent_analyses": [
+        "group_by": group_by,
+        "days": days,
+        "groups": [
             {
-                "id": str(analysis.id),
-                "form_id": str(analysis.form_id),
-                "type": analysis.analysis_type,
-                "score": analysis.compliance_score,
-                "created_at": analysis.created_at
+                group_by: key,
+                "calls": calls,
+                "errors": errors or 0,
+                "avg_queue_wait_ms": round(queue_wait or 0, 2),
+                "avg_ttft_ms": round(ttft, 2) if ttft is not None else None,
+                "avg_latency_ms": round(latency or 0, 2),
+                "max_latency_ms": round(max_latency or 0, 2),
+                "prompt_tokens": prompt_tokens or 0,
+                "completion_tokens": completion_tokens or 0,
+                "cost_usd": round(cost or 0, 6),
             }
-            for analysis in recent_analyses
+            for key, calls, errors, queue_wait, ttft, latency, max_latency,
+                prompt_tokens, completion_tokens, cost in rows
         ],
-        "active_chats": active_chats,
-        "recent_files": [
-            {
-                "id": str(file.id),
-                "filename": file.filename,
-                "status": file.processing_status,
-                "created_at": file.created_at
-            }
-            for file in recent_files
-        ],
-        "compliance_trend": [
-            {
-                "date": date.strftime("%Y-%m-%d"),
-                "score": round(score, 2)
-            }
-            for date, score in compliance_trend
-        ]
-    } 
\ No newline at end of file
+    }
\ No newline at end of file
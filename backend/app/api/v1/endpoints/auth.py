@@ -1,13 +1,16 @@
+import json
 from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import get_current_user, decode_token
-from app.db.session import get_db
+from app.core.rate_limit import auth_ip_limiter, client_ip, login_email_limiter
+from app.core.revocation import revocation_store
+from app.core.security import get_current_user, decode_token, oauth2_scheme, revoke_token
+from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from app.services.auth_service import AuthService
@@ -15,21 +18,28 @@ from app.services.auth_service import AuthService
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse, status_code=201)
-def register(
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
 ) -> Any:
-    user = AuthService.register_user(db, user_in)
+    user = await AuthService.register_user(db, user_in)
     return user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserLogin
 ) -> Any:
-    user = AuthService.authenticate_user(db, user_in)
+    # Limited before the bcrypt verify, so rejected guesses cost a counter lookup
+    email = user_in.email.strip().lower()
+    await auth_ip_limiter.hit(client_ip(request))
+    # Counted up front, so concurrent guesses can't all pass before one of them fails
+    await login_email_limiter.hit(email)
+    user = await AuthService.authenticate_user(db, user_in)
+    await login_email_limiter.reset(email)
     access_token, refresh_token = AuthService.create_tokens(user)
     return {
         "access_token": access_token,
@@ -42,19 +52,24 @@ def login(
 async def refresh_token(
     *,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
+    await auth_ip_limiter.hit(client_ip(request))
     data = await request.json()
     refresh_token = data.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=400, detail="Refresh token required.")
     payload = decode_token(refresh_token)
-    if payload.get("type") != "refresh":
+    if payload.get("type") != "refresh" or await revocation_store.is_revoked(payload.get("jti")):
         raise HTTPException(status_code=401, detail="Invalid refresh token.")
     user_id = payload.get("sub")
-    user = db.query(User).filter_by(id=user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
+    if not user.is_active or payload.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=401, detail="Invalid refresh token.")
+    # Refresh tokens are single use: a replayed one is rejected above
+    await revoke_token(payload)
     access_token, new_refresh_token = AuthService.create_tokens(user)
     return {
         "access_token": access_token,
@@ -64,10 +79,36 @@ async def refresh_token(
     }
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user=Depends(get_current_user)):
+async def get_me(current_user=Depends(get_current_user)):
     return current_user
 
+@router.post("/users/{user_id}/deactivate", response_model=UserResponse)
+async def deactivate_user(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Deactivate a user of the current user's company; their tokens stop working at once. Admins only.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions.")
+    user = await db.get(User, user_id)
+    if not user or user.company_name != current_user.company_name:
+        raise HTTPException(status_code=404, detail="User not found.")
+    return await AuthService.deactivate_user(db, user.id)
+
 @router.post("/logout")
-def logout():
-    # For stateless JWT, logout is handled client-side (token deletion)
-    return {"message": "Logged out successfully."} 
\ No newline at end of file
+async def logout(request: Request, token: str = Depends(oauth2_scheme)):
+    # Revoke the presented access token and, if sent, the refresh token paired with it
+    await revoke_token(decode_token(token))
+    body = await request.body()
+    try:
+        data = json.loads(body) if body else {}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body.")
+    refresh_token = data.get("refresh_token") if isinstance(data, dict) else None
+    if refresh_token:
+        await revoke_token(decode_token(refresh_token))
+    return {"message": "Logged out successfully."}
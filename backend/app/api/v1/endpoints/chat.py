@@ -1,10 +1,15 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 import os
 
+from app.core.pagination import paginate
+from app.core.response_cache import response_cache
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.replica import get_read_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.models.chat import ChatSession, ChatMessage
 from app.schemas.chat import (
@@ -15,6 +20,7 @@ from app.schemas.chat import (
     ChatMessageResponse,
     ChatResponse,
 )
+from app.services.analytics_service import get_data_version
 from app.services.pdf_service import process_pdf_from_path
 from app.core.config import settings
 from pydantic import BaseModel
@@ -27,10 +33,25 @@ class TemplateChatRequest(BaseModel):
     message: str
     template_name: str
 
+def _session_query():
+    # Responses embed the messages; load them up front since async sessions can't lazy-load
+    return select(ChatSession).options(selectinload(ChatSession.messages))
+
+async def _get_user_session(db: AsyncSession, session_id: str, user_id: str) -> ChatSession:
+    session = (await db.execute(
+        _session_query().where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+    )).scalar_one_or_none()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found",
+        )
+    return session
+
 @router.post("/sessions", response_model=ChatSessionResponse)
-def create_chat_session(
+async def create_chat_session(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     session_in: ChatSessionCreate,
     current_user: User = Depends(get_current_user),
 ) -> Any:
@@ -42,50 +63,48 @@ def create_chat_session(
         **session_in.dict()
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
-    return session
+    await db.commit()
+    return await _get_user_session(db, session.id, current_user.id)
 
 @router.get("/sessions", response_model=List[ChatSessionResponse])
-def list_chat_sessions(
-    db: Session = Depends(get_db),
+async def list_chat_sessions(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
 ) -> Any:
     """
-    Retrieve chat sessions.
+    Retrieve chat sessions, newest first. Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    Supports If-None-Match.
     """
-    sessions = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return sessions
+    async def build(response):
+        sessions = await paginate(
+            db, _session_query().where(ChatSession.user_id == current_user.id),
+            ChatSession, response, limit=limit, cursor=cursor, skip=skip,
+        )
+        return [ChatSessionResponse.model_validate(session) for session in sessions]
+
+    version = await get_data_version(db, "user", current_user.id)
+    return await response_cache.respond(request, current_user.id, version, build)
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
-def get_chat_session(
+async def get_chat_session(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     session_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get chat session by ID.
     """
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat session not found",
-        )
-    return session
+    return await _get_user_session(db, session_id, current_user.id)
 
 @router.put("/sessions/{session_id}", response_model=ChatSessionResponse)
-def update_chat_session(
+async def update_chat_session(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     session_id: str,
     session_in: ChatSessionUpdate,
     current_user: User = Depends(get_current_user),
@@ -93,28 +112,19 @@ def update_chat_session(
     """
     Update chat session.
     """
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat session not found",
-        )
+    session = await _get_user_session(db, session_id, current_user.id)
     
     for field, value in session_in.dict(exclude_unset=True).items():
         setattr(session, field, value)
     
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
     return session
 
 @router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse)
-def create_chat_message(
+async def create_chat_message(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     session_id: str,
     message_in: ChatMessageCreate,
     current_user: User = Depends(get_current_user),
@@ -122,10 +132,12 @@ def create_chat_message(
     """
     Create new chat message.
     """
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
+    session = (await db.execute(
+        select(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -137,36 +149,46 @@ def create_chat_message(
         **message_in.dict()
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageResponse])
-def list_chat_messages(
+async def list_chat_messages(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     session_id: str,
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
 ) -> Any:
     """
-    Retrieve chat messages.
+    Retrieve chat messages, oldest first. Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    Supports If-None-Match.
     """
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    if not session:
+    session_exists = (await db.execute(
+        select(ChatSession.id).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == current_user.id
+        )
+    )).first()
+    if not session_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chat session not found",
         )
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).offset(skip).limit(limit).all()
-    return messages
+    async def build(response):
+        messages = await paginate(
+            db, select(ChatMessage).where(ChatMessage.session_id == session_id),
+            ChatMessage, response, limit=limit, cursor=cursor, skip=skip, descending=False,
+        )
+        return [ChatMessageResponse.model_validate(message) for message in messages]
+
+    version = await get_data_version(db, "user", current_user.id)
+    return await response_cache.respond(request, current_user.id, version, build)
 
 @router.post("/template", response_model=ChatResponse)
 async def chat_with_template(
@@ -1,86 +1,96 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-import aiofiles
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-from datetime import datetime
 
 from app.core.config import settings
+from app.core.pagination import paginate
+from app.core.response_cache import response_cache
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.replica import get_read_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.models.file import File as FileModel
 from app.schemas.file import FileResponse, FileUpdate
+from app.services.analytics_service import get_data_version
+from app.services.blob_store import blob_store
 
 router = APIRouter()
 
 @router.post("/upload", response_model=FileResponse)
 async def upload_file(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     file: UploadFile = File(...),
     form_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
-    Upload new file.
+    Upload new file. Content already stored by any upload is referenced, not written again.
     """
-    # Create upload directory if it doesn't exist
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(settings.UPLOAD_DIR, filename)
-    
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await file.read()
-        await out_file.write(content)
-    
-    # Create file record
+    content = await file.read()
+    digest = await blob_store.store(db, content)
     db_file = FileModel(
         form_id=form_id,
         filename=file.filename,
-        file_path=file_path,
+        file_path=blob_store.path(digest),
+        sha256=digest,
         mime_type=file.content_type,
         size=len(content),
         uploaded_by=current_user.id
     )
     db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
+    try:
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        # Written before the commit; unless another upload's reference has committed, it's now an orphan
+        await blob_store.discard(db, digest)
+        raise
+    await blob_store.ensure(digest, content)
+    await db.refresh(db_file)
     return db_file
 
 @router.get("/", response_model=List[FileResponse])
-def list_files(
-    db: Session = Depends(get_db),
+async def list_files(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
 ) -> Any:
     """
-    Retrieve files.
+    Retrieve files, newest first. Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    Supports If-None-Match.
     """
-    files = db.query(FileModel).filter(
-        FileModel.uploaded_by == current_user.id
-    ).offset(skip).limit(limit).all()
-    return files
+    async def build(response):
+        files = await paginate(
+            db, select(FileModel).where(FileModel.uploaded_by == current_user.id),
+            FileModel, response, limit=limit, cursor=cursor, skip=skip,
+        )
+        return [FileResponse.model_validate(file) for file in files]
+
+    version = await get_data_version(db, "user", current_user.id)
+    return await response_cache.respond(request, current_user.id, version, build)
 
 @router.get("/{file_id}", response_model=FileResponse)
-def get_file(
+async def get_file(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     file_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get file by ID.
     """
-    file = db.query(FileModel).filter(
-        FileModel.id == file_id,
-        FileModel.uploaded_by == current_user.id
-    ).first()
+    file = (await db.execute(
+        select(FileModel).where(
+            FileModel.id == file_id,
+            FileModel.uploaded_by == current_user.id
+        )
+    )).scalar_one_or_none()
     if not file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,9 +99,9 @@ def get_file(
     return file
 
 @router.put("/{file_id}", response_model=FileResponse)
-def update_file(
+async def update_file(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     file_id: str,
     file_in: FileUpdate,
     current_user: User = Depends(get_current_user),
@@ -99,10 +109,12 @@ def update_file(
     """
     Update file.
     """
-    file = db.query(FileModel).filter(
-        FileModel.id == file_id,
-        FileModel.uploaded_by == current_user.id
-    ).first()
+    file = (await db.execute(
+        select(FileModel).where(
+            FileModel.id == file_id,
+            FileModel.uploaded_by == current_user.id
+        )
+    )).scalar_one_or_none()
     if not file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,34 +125,43 @@ def update_file(
         setattr(file, field, value)
     
     db.add(file)
-    db.commit()
-    db.refresh(file)
+    await db.commit()
+    await db.refresh(file)
     return file
 
 @router.delete("/{file_id}", response_model=FileResponse)
-def delete_file(
+async def delete_file(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     file_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Delete file.
     """
-    file = db.query(FileModel).filter(
-        FileModel.id == file_id,
-        FileModel.uploaded_by == current_user.id
-    ).first()
+    file = (await db.execute(
+        select(FileModel).where(
+            FileModel.id == file_id,
+            FileModel.uploaded_by == current_user.id
+        )
+    )).scalar_one_or_none()
     if not file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found",
         )
     
-    # Delete physical file
-    if os.path.exists(file.file_path):
-        os.remove(file.file_path)
-    
-    db.delete(file)
-    db.commit()
-    return file 
\ No newline at end of file
+    await db.delete(file)
+    if file.sha256 is None:
+        # Stored before the blob store, one copy per upload
+        if os.path.exists(file.file_path):
+            os.remove(file.file_path)
+        await db.commit()
+        return file
+    # The files row must go before release() may delete the blobs row it references
+    await db.flush()
+    unreferenced = await blob_store.release(db, file.sha256)
+    await db.commit()
+    if unreferenced:
+        await blob_store.discard(db, file.sha256)
+    return file
@@ -1,39 +1,73 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body
-from sqlalchemy.orm import Session
-import pdfplumber
-import requests
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from fastapi import (
+    APIRouter, Depends, HTTPException, status, UploadFile, File, Body, Header, Query, BackgroundTasks,
+    Request,
+)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+from starlette.concurrency import run_in_threadpool
+import io
+import logging
 import os
 from fastapi.responses import JSONResponse
 import re
-
+import copy
+import hashlib
+import json
+from datetime import datetime
+
+from app.core.cache import TTLCache
+from app.core.coalescing import InFlightCoalescer
+from app.core.pagination import paginate
+from app.core.response_cache import response_cache
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.replica import get_read_db
+from app.db.session import get_async_db, AsyncSessionLocal
 from app.models.user import User
-from app.models.form import Form, FormVersion, FormAnalysis
+from app.models.form import Form, FormDocument, FormVersion, FormAnalysis
 from app.schemas.form import (
     FormCreate,
     FormUpdate,
     FormResponse,
+    FormSummaryResponse,
     FormVersionCreate,
     FormVersionResponse,
     FormAnalysisCreate,
     FormAnalysisResponse,
+    FormDocumentResponse,
+    BulkResult,
+)
+from app.services.analytics_service import get_data_version
+from app.services.bulk_import_service import BulkImportService, BulkItem
+from app.services.chat_service import ChatService
+from app.services.form_document_service import FormDocumentService
+from app.services.form_query_service import FormQueryService
+from app.services.form_version_service import FormVersionService
+from app.services.llm_service import chat_completion
+from app.services.osha_fields import (
+    STRUCTURED_OUTPUT_INSTRUCTIONS,
+    merge_field_updates,
+    parse_structured_reply,
+    validate_field_updates,
 )
 from app.core.config import settings
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
-OPENROUTER_API_KEY = settings.OPENROUTER_API_KEY
-if not OPENROUTER_API_KEY:
-    raise RuntimeError("OPENROUTER_API_KEY is not set in environment variables.")
+router = APIRouter()
 
 OPENROUTER_MODEL = settings.OPENROUTER_MODEL
 
+chat_coalescer = InFlightCoalescer()
+idempotent_chat_responses = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+
 @router.post("/", response_model=FormResponse)
-def create_form(
+async def create_form(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_in: FormCreate,
     current_user: User = Depends(get_current_user),
 ) -> Any:
@@ -45,34 +79,139 @@ def create_form(
         **form_in.dict()
     )
     db.add(form)
-    db.commit()
-    db.refresh(form)
+    await db.commit()
+    return await _get_user_form(db, form.id, current_user.id, detail=True)
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return ValueError("Invalid JSON")
+
+async def _bulk_items(request: Request) -> AsyncIterator[BulkItem]:
+    """
+    Items of a bulk body: a JSON array, or NDJSON (`application/x-ndjson`) decoded
+    line by line as it streams in, so large imports are never held whole in memory.
+    """
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        index, pending = 0, b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _decode_line(line)
+                    index += 1
+        if pending.strip():
+            yield index, _decode_line(pending)
+        return
+
+    try:
+        items = await request.json()
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON",
+        )
+    for index, item in enumerate(items):
+        yield index, item
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_upsert_forms(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Create or update many forms. Items with an "id" update that form, the rest are
+    created; each item gets its own result, in request order.
+    """
+    return await BulkImportService.import_forms(db, current_user.id, _bulk_items(request))
+
+@router.post("/bulk/versions", response_model=BulkResult)
+async def bulk_create_form_versions(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Create many form versions; each item names its form with "form_id".
+    """
+    return await BulkImportService.import_versions(db, current_user.id, _bulk_items(request))
+
+def _form_detail_query():
+    # Versions and analyses come in two batched selects; async sessions can't lazy-load them
+    return select(Form).options(selectinload(Form.versions), selectinload(Form.analyses))
+
+async def _get_user_form(db: AsyncSession, form_id: str, user_id: str, detail: bool = False) -> Optional[Form]:
+    statement = _form_detail_query() if detail else select(Form)
+    form = (await db.execute(
+        statement.where(Form.id == form_id, Form.user_id == user_id)
+    )).scalar_one_or_none()
+    if form is not None and detail:
+        # Delta-encoded versions get their full content replayed in memory
+        FormVersionService.materialize(form.versions)
     return form
 
-@router.get("/", response_model=List[FormResponse])
-def list_forms(
-    db: Session = Depends(get_db),
+def _per_form(aggregate, model):
+    # Correlated per-form aggregate; an index lookup on (form_id, created_at) for each listed form
+    return select(aggregate).where(model.form_id == Form.id).correlate(Form).scalar_subquery()
+
+@router.get("/", response_model=List[FormSummaryResponse])
+async def list_forms(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
+    field: List[str] = Query(
+        [], description="filled_fields filter `path:op[:value]` (op: eq, exists, missing); repeatable"
+    ),
 ) -> Any:
     """
-    Retrieve forms.
+    Retrieve forms, newest first. Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    `field` filters narrow the list by filled_fields values. Supports If-None-Match.
     """
-    forms = db.query(Form).filter(Form.user_id == current_user.id).offset(skip).limit(limit).all()
-    return forms
+    filters = FormQueryService.field_filters(field, db.bind.dialect.name)
+
+    async def build(response):
+        statement = select(
+            Form,
+            _per_form(func.count(FormVersion.id), FormVersion),
+            _per_form(func.max(FormVersion.created_at), FormVersion),
+            _per_form(func.count(FormAnalysis.id), FormAnalysis),
+            _per_form(func.max(FormAnalysis.created_at), FormAnalysis),
+        ).options(defer(Form.content)).where(Form.user_id == current_user.id, *filters)
+        rows = await paginate(db, statement, Form, response, limit=limit, cursor=cursor, skip=skip)
+
+        summaries = []
+        for form, version_count, latest_version_at, analysis_count, latest_analysis_at in rows:
+            summary = FormSummaryResponse.model_validate(form)
+            summary.version_count = version_count
+            summary.latest_version_at = latest_version_at
+            summary.analysis_count = analysis_count
+            summary.latest_analysis_at = latest_analysis_at
+            summaries.append(summary)
+        return summaries
+
+    version = await get_data_version(db, "user", current_user.id)
+    return await response_cache.respond(request, current_user.id, version, build)
 
 @router.get("/{form_id}", response_model=FormResponse)
-def get_form(
+async def get_form(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     form_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get form by ID.
     """
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
+    form = await _get_user_form(db, form_id, current_user.id, detail=True)
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,9 +220,9 @@ def get_form(
     return form
 
 @router.put("/{form_id}", response_model=FormResponse)
-def update_form(
+async def update_form(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_id: str,
     form_in: FormUpdate,
     current_user: User = Depends(get_current_user),
@@ -91,7 +230,7 @@ def update_form(
     """
     Update form.
     """
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
+    form = await _get_user_form(db, form_id, current_user.id)
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,35 +241,34 @@ def update_form(
         setattr(form, field, value)
     
     db.add(form)
-    db.commit()
-    db.refresh(form)
-    return form
+    await db.commit()
+    return await _get_user_form(db, form_id, current_user.id, detail=True)
 
 @router.delete("/{form_id}", response_model=FormResponse)
-def delete_form(
+async def delete_form(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_id: str,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Delete form.
     """
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
+    form = await _get_user_form(db, form_id, current_user.id, detail=True)
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Form not found",
         )
     
-    db.delete(form)
-    db.commit()
+    await db.delete(form)
+    await db.commit()
     return form
 
 @router.post("/{form_id}/versions", response_model=FormVersionResponse)
-def create_form_version(
+async def create_form_version(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_id: str,
     version_in: FormVersionCreate,
     current_user: User = Depends(get_current_user),
@@ -138,69 +276,103 @@ def create_form_version(
     """
     Create new form version.
     """
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
+    form = await _get_user_form(db, form_id, current_user.id)
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Form not found",
         )
     
-    version = FormVersion(
+    version = await FormVersionService.create(
+        db,
         form_id=form.id,
         created_by=current_user.id,
         **version_in.dict()
     )
-    db.add(version)
-    db.commit()
-    db.refresh(version)
+    await db.commit()
+    return version
+
+@router.get("/{form_id}/versions/{version_number}", response_model=FormVersionResponse)
+async def get_form_version(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    form_id: str,
+    version_number: int,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get form content as of a version, rebuilt from the nearest snapshot.
+    """
+    form = await _get_user_form(db, form_id, current_user.id)
+    version = await FormVersionService.get_at(db, form_id, version_number) if form else None
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form version not found",
+        )
     return version
 
 @router.post("/{form_id}/analyze")
 async def analyze_form(
     form_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    precompute_opener: Optional[bool] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Analyze uploaded PDF for the given form.
     """
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
+    form = await _get_user_form(db, form_id, current_user.id)
     if not form:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Form not found",
         )
 
-    # Save the uploaded file (for MVP, you can use a temp path)
+    # Parsed from memory: the text is kept in form_documents and the PDF isn't needed afterwards
     contents = await file.read()
-    file_path = f"uploads/{form_id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(contents)
 
-    # Extract text from PDF
+    # Extract text from PDF; parsing is CPU-bound, so it runs off the event loop
     try:
-        with pdfplumber.open(file_path) as pdf:
-            all_text = ""
-            for page in pdf.pages:
-                all_text += page.extract_text() or ""
+        all_text = await run_in_threadpool(_extract_pdf_text, contents)
     except Exception as e:
         return {"error": f"Failed to extract PDF text: {str(e)}"}
 
-    # Save extracted text in form.content
-    form.content = {"text": all_text}
+    # Extracted text goes to form_documents; the form row keeps only filled fields, reset for the new PDF
+    await FormDocumentService.save_text(db, form.id, file.filename, all_text)
+    # A new document starts a new conversation, as when it was kept in form.content
+    await ChatService.close_form_sessions(db, form.id, current_user.id)
+    form.content = {}
     db.add(form)
-    db.commit()
-    db.refresh(form)
+    await db.commit()
+
+    if precompute_opener is None:
+        precompute_opener = settings.CHAT_PRECOMPUTE_OPENER
+    if precompute_opener and all_text:
+        # Warm the first chat turn while the user reads the extraction result
+        background_tasks.add_task(precompute_opening_turn, form_id, current_user.id)
 
     return {
         "message": "File uploaded and analyzed.",
         "filename": file.filename,
         "size": len(contents),
         "form_id": form_id,
-        "extracted": {"text": all_text}
+        "extracted": {"text": all_text},
+        "opening_message": settings.CHAT_OPENER_MESSAGE,
     }
 
+def _extract_pdf_text(contents: bytes) -> str:
+    # pdfplumber (and pdfminer under it) is loaded on first use, not at worker startup
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(contents)) as pdf:
+        all_text = ""
+        for page in pdf.pages:
+            all_text += page.extract_text() or ""
+    return all_text
+
 def extract_fields(user_message: str, filled_fields: dict) -> dict:
     """
     Extracts all possible OSHA 300, 300A, and 301 fields from user input and updates filled_fields dict.
@@ -446,35 +618,40 @@ def extract_fields(user_message: str, filled_fields: dict) -> dict:
     return filled_fields
 
 @router.post("/{form_id}/chat")
-def chat_with_form(
+async def chat_with_form(
     form_id: str,
     message: dict = Body(...),
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Try to get first and last name, then full_name, then username, then 'User'
-    first_name = getattr(current_user, 'first_name', None)
-    last_name = getattr(current_user, 'last_name', None)
-    if first_name and last_name:
-        user_name = f"{first_name} {last_name}"
-    else:
-        user_name = (
-            getattr(current_user, 'full_name', None)
-            or getattr(current_user, 'username', None)
-            or "User"
-        )
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
-    if not form or not form.content:
-        raise HTTPException(status_code=404, detail="Form or extracted content not found")
-    
     user_message = message.get("message", "")
-    extracted_text = form.content.get("text", "")
-    conversation_history = form.content.get("conversation", [])
-    # Initialize or get filled_fields
-    filled_fields = form.content.get("filled_fields", {})
-
+    if idempotency_key:
+        replay_key = (current_user.id, form_id, idempotency_key)
+        cached = idempotent_chat_responses.get(replay_key)
+        if cached is not None:
+            return cached
+        coalesce_key = ("idempotency-key", *replay_key)
+    else:
+        message_hash = hashlib.sha256(user_message.encode("utf-8")).hexdigest()
+        coalesce_key = ("message", current_user.id, form_id, message_hash)
+
+    async def run_turn():
+        result = await _run_form_chat_turn(form_id, user_message, db, current_user)
+        # Stored before the in-flight entry is released so late retries hit the cache; only
+        # completed turns (with field_updates), so a retry after an AI error tries again
+        if idempotency_key and "field_updates" in result:
+            idempotent_chat_responses.set(replay_key, result)
+        return result
+
+    # Double-clicks and retries wait for the in-flight turn instead of paying for another completion
+    return await chat_coalescer.run(coalesce_key, run_turn)
+
+def _build_chat_messages(
+    extracted_text: str, filled_fields: dict, conversation_history: List[dict], user_message: str
+) -> List[dict]:
     # Dynamically adjust the session intro based on PDF upload status
-    if form.content.get("text"):
+    if extracted_text:
         session_intro = (
             "Welcome back, Safety Manager. I have your uploaded OSHA form PDF (oshaforms.pdf). "
             "I'll extract all the necessary information and guide you through any missing or ambiguous fields. Let's get started!"
@@ -535,6 +712,8 @@ Failure Modes & Safe Fallbacks:
 - PDF parse error (×2): "I'm having trouble reading your PDF. Would you prefer to switch to a quick‑fill form?"
 - Persistent ambiguity (×2): "This entry is unusual—should I flag for manual review or proceed with a best guess?"
 '''
+    if settings.LLM_STRUCTURED_OUTPUT:
+        system_prompt += STRUCTURED_OUTPUT_INSTRUCTIONS
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "system", "content": f"Current filled fields: {filled_fields}"},
@@ -544,49 +723,204 @@ Failure Modes & Safe Fallbacks:
     for msg in conversation_history:
         messages.append(msg)
     messages.append({"role": "user", "content": user_message})
+    return messages
 
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers={"Authorization": f"Bearer {OPENROUTER_API_KEY}"},
-        json={
-            "model": OPENROUTER_MODEL,
-            "messages": messages
-        }
+async def _request_completion(
+    messages: List[dict], form_id: str, user_id: str, operation: str
+) -> Tuple[Optional[str], dict, dict]:
+    """
+    Returns (reply, validated field updates, raw response); reply is None on API errors.
+    """
+    structured = settings.LLM_STRUCTURED_OUTPUT
+    # The OpenRouter client is blocking; run it in the threadpool so other requests keep flowing
+    resp_json = await run_in_threadpool(
+        chat_completion,
+        messages,
+        operation=operation,
+        form_id=form_id,
+        user_id=user_id,
+        model=OPENROUTER_MODEL,
+        **({"response_format": {"type": "json_object"}} if structured else {}),
     )
-    resp_json = response.json()
-    if "choices" in resp_json:
-        ai_response = resp_json["choices"][0]["message"]["content"]
-        
-        # Update filled_fields using expanded extraction logic
-        filled_fields = extract_fields(user_message, filled_fields)
-
-        # Update conversation history
-        # Only add the greeting in the very first assistant reply
-        if not conversation_history:
-            ai_response = f"Hi {user_name}! {ai_response}"
-        conversation_history.extend([
-            {"role": "user", "content": user_message},
-            {"role": "assistant", "content": ai_response}
-        ])
-        # Do not trim conversation history; pass all for best context
-        form.content["conversation"] = conversation_history
-        form.content["filled_fields"] = filled_fields
-        db.add(form)
-        db.commit()
-        return {"response": ai_response}
+    if "choices" not in resp_json:
+        return None, {}, resp_json
+    ai_response = resp_json["choices"][0]["message"]["content"]
+    field_updates = {}
+    if structured:
+        ai_response, raw_updates = parse_structured_reply(ai_response)
+        field_updates, rejected = validate_field_updates(raw_updates)
+        if rejected:
+            logger.warning("Dropped invalid field updates from model: %s", rejected)
+    return ai_response, field_updates, resp_json
+
+def _is_opener(user_message: str) -> bool:
+    normalize = lambda value: re.sub(r"[^a-z0-9]+", " ", value.lower()).strip()
+    return normalize(user_message) == normalize(settings.CHAT_OPENER_MESSAGE)
+
+async def _compute_opening_turn(
+    document: FormDocument, filled_fields: dict, form_id: str, user_id: str
+) -> Optional[dict]:
+    messages = _build_chat_messages(document.text, filled_fields, [], settings.CHAT_OPENER_MESSAGE)
+    ai_response, field_updates, resp_json = await _request_completion(
+        messages, form_id, user_id, "form_chat_precompute"
+    )
+    if ai_response is None:
+        logger.warning("OpenRouter API error during opening precompute: %s", resp_json)
+        return None
+    return {
+        "message": settings.CHAT_OPENER_MESSAGE,
+        "response": ai_response,
+        "field_updates": field_updates,
+        "text_sha256": document.text_sha256,
+    }
+
+async def precompute_opening_turn(form_id: str, user_id: str) -> None:
+    """
+    Background task run after analyze_form: computes the reply to the default
+    opening message ahead of time and caches it on the form's document row.
+    """
+    async with AsyncSessionLocal() as db:
+        form = await _get_user_form(db, form_id, user_id)
+        document = await FormDocumentService.get(db, form_id) if form else None
+        if not document or not document.text_length:
+            return
+        # Only the first turn of a conversation uses it, so don't pay for a completion once one started
+        if await ChatService.form_has_messages(db, form_id):
+            return
+        filled_fields = (form.content or {}).get("filled_fields", {})
+        opening_turn = await chat_coalescer.run(
+            ("opening-turn", form_id),
+            lambda: _compute_opening_turn(document, filled_fields, form_id, user_id),
+        )
+        if not opening_turn:
+            return
+        await db.refresh(document)
+        # Skip if the PDF was replaced or the chat already started while the completion ran
+        if document.text_sha256 != opening_turn["text_sha256"]:
+            return
+        if await ChatService.form_has_messages(db, form_id):
+            return
+        document.opening_turn = opening_turn
+        db.add(document)
+        await db.commit()
+
+async def _take_opening_turn(
+    form: Form, document: Optional[FormDocument], user_id: str, user_message: str
+) -> Optional[dict]:
+    """
+    Precomputed reply for the default opener, waiting for an in-flight precompute if needed.
+    """
+    if document is None or not _is_opener(user_message):
+        return None
+    opening_turn = document.opening_turn
+    if opening_turn and opening_turn.get("text_sha256") == document.text_sha256:
+        return opening_turn
+    key = ("opening-turn", form.id)
+    if chat_coalescer.in_flight(key):
+        filled_fields = (form.content or {}).get("filled_fields", {})
+        return await chat_coalescer.run(
+            key, lambda: _compute_opening_turn(document, filled_fields, form.id, user_id)
+        )
+    return None
+
+async def _run_form_chat_turn(form_id: str, user_message: str, db: AsyncSession, current_user: User) -> dict:
+    # Try to get first and last name, then full_name, then username, then 'User'
+    first_name = getattr(current_user, 'first_name', None)
+    last_name = getattr(current_user, 'last_name', None)
+    if first_name and last_name:
+        user_name = f"{first_name} {last_name}"
     else:
-        print("OpenRouter API error:", resp_json)
-        return {"response": f"AI error: {resp_json.get('error', resp_json)}"}
+        user_name = (
+            getattr(current_user, 'full_name', None)
+            or getattr(current_user, 'username', None)
+            or "User"
+        )
+    received_at = datetime.utcnow()
+    form = await _get_user_form(db, form_id, current_user.id)
+    document = await FormDocumentService.get(db, form_id) if form else None
+    if not form or (document is None and not form.content):
+        raise HTTPException(status_code=404, detail="Form or extracted content not found")
+    
+    # Conversation lives in chat_messages; only a bounded recent window is sent to the model
+    chat_session = await ChatService.get_or_create_form_session(db, form, current_user.id)
+    conversation_history = await ChatService.load_recent_messages(db, chat_session.id)
+    # Initialize or get filled_fields
+    previous_fields = form.content.get("filled_fields", {})
+    filled_fields = copy.deepcopy(previous_fields)
+
+    opening_turn = None
+    if not conversation_history:
+        opening_turn = await _take_opening_turn(form, document, current_user.id, user_message)
+    if opening_turn:
+        ai_response, field_updates = opening_turn["response"], opening_turn["field_updates"]
+    else:
+        extracted_text = document.text if document else ""
+        messages = _build_chat_messages(extracted_text, filled_fields, conversation_history, user_message)
+        ai_response, field_updates, resp_json = await _request_completion(
+            messages, form.id, current_user.id, "form_chat"
+        )
+        if ai_response is None:
+            logger.warning("OpenRouter API error: %s", resp_json)
+            return {"response": f"AI error: {resp_json.get('error', resp_json)}"}
+
+    # Update filled_fields using expanded extraction logic, then apply what the model inferred
+    filled_fields = extract_fields(user_message, filled_fields)
+    if field_updates:
+        filled_fields = merge_field_updates(filled_fields, field_updates)
+
+    # Update conversation history
+    # Only add the greeting in the very first assistant reply
+    if not conversation_history:
+        ai_response = f"Hi {user_name}! {ai_response}"
+    ChatService.append_turn(
+        db, chat_session, user_message, ai_response, received_at,
+        form_updates=field_updates or None,
+    )
+    # Only rewrite form.content when the turn actually changed a field
+    if filled_fields != previous_fields:
+        form.content = {**form.content, "filled_fields": filled_fields}
+        db.add(form)
+    if document is not None and document.opening_turn is not None:
+        # Used by this turn, or stale now that the conversation has started
+        document.opening_turn = None
+        db.add(document)
+    await db.commit()
+    return {"response": ai_response, "field_updates": field_updates}
+
+@router.get("/{form_id}/document", response_model=FormDocumentResponse)
+async def get_form_document(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    form_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    Get the text extracted from the form's uploaded PDF.
+    """
+    form = await _get_user_form(db, form_id, current_user.id)
+    document = await FormDocumentService.get(db, form_id) if form else None
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form document not found",
+        )
+    return document
 
 @router.get("/{form_id}/export")
-def export_form(
+async def export_form(
     form_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    form = db.query(Form).filter(Form.id == form_id, Form.user_id == current_user.id).first()
-    if not form or not form.content:
+    form = await _get_user_form(db, form_id, current_user.id)
+    document = await FormDocumentService.get(db, form_id) if form else None
+    if not form or (document is None and not form.content):
         raise HTTPException(status_code=404, detail="Form not found or not completed")
-    return JSONResponse(content=form.content, headers={
+    content = {
+        **form.content,
+        "text": document.text if document else "",
+        "conversation": await ChatService.load_form_conversation(db, form.id, current_user.id),
+    }
+    return JSONResponse(content=content, headers={
         "Content-Disposition": f"attachment; filename=osha_form_{form_id}.json"
     }) 
\ No newline at end of file
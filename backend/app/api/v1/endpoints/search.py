@@ -0,0 +1,23 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_current_user
+from app.db.replica import get_read_db
+from app.models.user import User
+from app.schemas.search import SearchHit
+from app.services.search_service import SearchService
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchHit])
+async def search(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+) -> Any:
+    """
+    Full-text search over the current user's extracted PDF text, case descriptions and chats.
+    """
+    return await SearchService.search(db, current_user.id, q, limit)
@@ -7,6 +7,7 @@ from app.api.v1.endpoints import (
     chat,
     analytics,
     files,
+    search,
     templates
 )
 
@@ -18,4 +19,5 @@ api_router.include_router(forms.router, prefix="/forms", tags=["Forms"])
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 api_router.include_router(files.router, prefix="/files", tags=["Files"])
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
 api_router.include_router(templates.router, prefix="/templates", tags=["Templates"]) 
\ No newline at end of file
@@ -0,0 +1,30 @@
+import hashlib
+import math
+from typing import Iterator
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives and about `error_rate`
+    false positives once `capacity` items are in; items can't be removed, so
+    owners rebuild it when entries expire.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class InFlightCoalescer:
+    """
+    Collapses concurrent calls that share a key into one execution: the first
+    caller (the leader) awaits the coroutine, later callers await its outcome.
+    Keys are tracked per process and per event loop.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None
+    ) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            # Re-raises the leader's exception, if any; a follower timing out leaves the leader running
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a leader without followers doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
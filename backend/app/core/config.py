@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
 import os
@@ -40,14 +40,81 @@ class Settings(BaseSettings):
             return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
         return "sqlite:///./complymate.db"
 
+    # Connection pool, applied to both the async request engine and the sync engine
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds; stay under server/proxy idle timeouts
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # Postgres statement_timeout; 0 disables
+    # Alembic owns the schema; set for throwaway local databases only
+    DB_CREATE_TABLES_ON_STARTUP: bool = False
+
+    # Optional read replica for read-only endpoints. A user's reads stay on the primary for
+    # REPLICA_STICKY_SECONDS after they write, and everyone's do while the replica is down
+    # or more than REPLICA_MAX_LAG_SECONDS behind (probed every REPLICA_CHECK_INTERVAL_SECONDS).
+    # With more than one worker, set SHARED_CACHE_URL so the sticky window holds across them.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_STICKY_SECONDS: float = 10.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    REPLICA_CHECK_TIMEOUT_SECONDS: float = 1.0
+
     # JWT Configuration
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # bcrypt cost and its dedicated thread pool; logins beyond PASSWORD_HASH_MAX_PENDING
+    # concurrent hashes get a 503 instead of queueing without bound
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    # Sliding-window limits on /auth/login and /auth/refresh: attempts per client address,
+    # login attempts per email (cleared on success); counted before any password hashing or database work
+    AUTH_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    AUTH_RATE_LIMIT_PER_IP: int = 20
+    AUTH_RATE_LIMIT_PER_EMAIL: int = 5
+    # Revoked token ids (logout, refresh rotation): a bloom filter sized for this many
+    # live revocations in front of the exact set, synced between workers via SHARED_CACHE_URL
+    TOKEN_REVOCATION_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 1.0
+    # Resolved users, keyed by user id and token version; profile updates and deactivation
+    # invalidate them here and in the shared cache, other workers' copies expire within the TTL
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_SIZE: int = 10_000
 
     # AI Service Configuration
-    OPENROUTER_API_KEY: str
+    # Only needed for LLM calls, which fail with an error result when it's unset
+    OPENROUTER_API_KEY: Optional[str] = None
     OPENROUTER_MODEL: str = "anthropic/claude-3-opus-20240229"
+    CHAT_HISTORY_WINDOW: int = 20  # messages sent back to the model per turn
+    LLM_MAX_CONCURRENCY: int = 8
+    # Ask the model for a JSON reply carrying field updates alongside its message
+    LLM_STRUCTURED_OUTPUT: bool = True
+    # USD per million tokens as [prompt, completion]; used when the provider does not report cost
+    LLM_PRICING_PER_MTOK: Dict[str, List[float]] = {
+        "anthropic/claude-3-opus-20240229": [15.0, 75.0],
+    }
+    LLM_METRICS_BATCH_SIZE: int = 50
+    LLM_METRICS_FLUSH_SECONDS: float = 10.0
+    # analyze_form can precompute the reply to this opening message in the background; off by
+    # default since it costs a completion per upload even if the user never opens the chat
+    CHAT_PRECOMPUTE_OPENER: bool = False
+    CHAT_OPENER_MESSAGE: str = "What did you find in my form, and what is still missing?"
+    # Replays of a chat request with the same Idempotency-Key return the stored response
+    IDEMPOTENCY_TTL_SECONDS: int = 300
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    # Form versions are stored as JSON-patch deltas with a full snapshot every N versions
+    FORM_VERSION_SNAPSHOT_INTERVAL: int = 10
+    # Per-user cache of dashboard and list responses, validated against the user's data version
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_SIZE: int = 5_000
+    # Bulk form/version imports are validated, flushed and committed this many items at a time
+    BULK_CHUNK_SIZE: int = 500
+
+    # Optional Redis (redis://...) shared by all workers; needs the redis package
+    SHARED_CACHE_URL: Optional[str] = None
 
     # File Storage Configuration
     UPLOAD_DIR: str = "uploads"
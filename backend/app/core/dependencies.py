@@ -1,38 +1,13 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.config import settings
-from app.core.security import decode_token
-from app.db.session import SessionLocal
-from app.models.user import User
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+from fastapi import Depends, HTTPException
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    payload = decode_token(token)
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+# There is one authentication dependency, in app.core.security; it shares the request's
+# session (get_async_db) with the endpoint. Re-exported for existing imports.
+from app.core.security import get_current_user
+from app.models.user import User
 
 def require_role(role: str):
-    def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role != role:
             raise HTTPException(status_code=403, detail="Insufficient permissions.")
         return current_user
-    return role_checker 
\ No newline at end of file
+    return role_checker
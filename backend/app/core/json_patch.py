@@ -0,0 +1,77 @@
+import copy
+from typing import Any, Dict, List
+
+# Minimal RFC 6902 JSON Patch (add/remove/replace) over RFC 6901 pointers,
+# enough to store form versions as deltas against their predecessor.
+
+class JsonPatchError(ValueError):
+    pass
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Operations turning `old` into `new`. Objects and arrays are diffed member by
+    member, so the patch is proportional to what changed, not to the document.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [{"op": "remove", "path": f"{path}/{_escape(key)}"} for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                ops.extend(make_patch(old[key], value, f"{path}/{_escape(key)}"))
+            else:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        ops = []
+        for i in range(common):
+            ops.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+        # Trailing removals go back to front so earlier indices stay valid
+        ops.extend({"op": "remove", "path": f"{path}/{i}"} for i in range(len(old) - 1, common - 1, -1))
+        ops.extend({"op": "add", "path": f"{path}/-", "value": value} for value in new[common:])
+        return ops
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """
+    Return a copy of `document` with `patch` applied; the input is not modified.
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op, path = operation.get("op"), operation.get("path", "")
+        if op not in ("add", "remove", "replace"):
+            raise JsonPatchError(f"Unsupported operation: {op!r}")
+        value = copy.deepcopy(operation.get("value"))
+        if path == "":
+            if op == "remove":
+                raise JsonPatchError("Cannot remove the document root")
+            document = value
+            continue
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        try:
+            parent = document
+            for token in tokens[:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+            last = tokens[-1]
+            if isinstance(parent, list):
+                index = len(parent) if last == "-" else int(last)
+                if op == "add":
+                    parent.insert(index, value)
+                elif op == "replace":
+                    parent[index] = value
+                else:
+                    del parent[index]
+            elif op == "remove":
+                del parent[last]
+            else:
+                parent[last] = value
+        except (KeyError, IndexError, ValueError, TypeError) as exc:
+            raise JsonPatchError(f"Cannot apply {op} at {path!r}") from exc
+    return document
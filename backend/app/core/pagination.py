@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Row, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def keyset(statement: Any, model: Any, cursor: Optional[str] = None, descending: bool = True) -> Any:
+    """
+    Order a query/select by (created_at, id) and, given a cursor, continue
+    strictly after the row it points at. Page N costs the same index seek as page 1.
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        statement = statement.where(key < position if descending else key > position)
+    if descending:
+        return statement.order_by(model.created_at.desc(), model.id.desc())
+    return statement.order_by(model.created_at.asc(), model.id.asc())
+
+async def paginate(
+    db: AsyncSession,
+    statement: Any,
+    model: Any,
+    response: Response,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: Optional[int] = None,
+    descending: bool = True,
+) -> List[Any]:
+    """
+    Fetch one page of the `statement` select ordered by (created_at, id). When more
+    rows exist, an opaque token for the next page is returned in the X-Next-Cursor header.
+    `skip` is the deprecated offset fallback and is ignored when a cursor is given.
+    """
+    statement = keyset(statement, model, cursor, descending)
+    if skip and not cursor:
+        statement = statement.offset(skip)
+        response.headers["Deprecation"] = "true"
+    result = await db.execute(statement.limit(limit + 1))
+    # Single-entity selects page over model instances, multi-column ones over rows
+    rows = result.scalars().all() if len(statement.column_descriptions) == 1 else result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # Multi-column rows carry the paginated model first
+        last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own thread pool, so a burst of logins queues here instead of
+    filling the shared threadpool every other handler's blocking work runs on. At most
+    `max_pending` hashes run or wait at once; beyond that callers get a 503.
+    """
+
+    def __init__(self, context: CryptContext, workers: int = 4, max_pending: int = 256):
+        self.context = context
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Only touched from event loop threads
+        self._pending = 0
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress; retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        (matches, replacement hash); the replacement is set when the stored hash
+        was made with other parameters than the current ones.
+        """
+        return await self._run(self.context.verify_and_update, password, password_hash)
+
+password_hasher = PasswordHasher(
+    pwd_context, workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.shared_cache import SharedCache, shared_cache
+from app.models.user import User
+
+# Never copied into a cache
+_EXCLUDED = {"password_hash"}
+_COLUMNS = [column for column in User.__table__.columns if column.key not in _EXCLUDED]
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    snapshot = {}
+    for column in _COLUMNS:
+        value = getattr(user, column.key)
+        snapshot[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return snapshot
+
+def _restore(snapshot: Dict[str, Any]) -> User:
+    values = dict(snapshot)
+    for column in _COLUMNS:
+        if isinstance(column.type, DateTime) and values.get(column.key) is not None:
+            values[column.key] = datetime.fromisoformat(values[column.key])
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+class PrincipalCache:
+    """
+    Authenticated users by (user id, token version): an in-process TTL/LRU tier in
+    front of the optional shared cache, so resolving a token costs a JWT decode
+    and a dict lookup. Entries are column snapshots (no password hash), merged
+    into the request's session without a query.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 30.0, shared: Optional[SharedCache] = None):
+        self.ttl = ttl
+        self.shared = shared
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _shared_key(user_id: str, token_version: int) -> str:
+        return f"principal:{user_id}:{token_version}"
+
+    async def _get(self, user_id: str, token_version: int) -> Optional[Dict[str, Any]]:
+        snapshot = self._local.get((user_id, token_version))
+        if snapshot is None and self.shared is not None:
+            snapshot = await self.shared.get(self._shared_key(user_id, token_version))
+            if snapshot is not None:
+                self._local.set((user_id, token_version), snapshot)
+        return snapshot
+
+    async def _put(self, user: User) -> None:
+        snapshot = _snapshot(user)
+        self._local.set((user.id, user.token_version), snapshot)
+        if self.shared is not None:
+            await self.shared.set(self._shared_key(user.id, user.token_version), snapshot, self.ttl)
+
+    async def resolve(self, db: AsyncSession, user_id: str, token_version: int) -> Optional[User]:
+        """
+        The active user a token with this subject and version stands for, or None
+        when the user is gone, deactivated or the token's version was revoked.
+        """
+        snapshot = await self._get(user_id, token_version)
+        if snapshot is not None:
+            # The snapshot is a committed row, so load=False attaches it without a SELECT
+            return await db.merge(_restore(snapshot), load=False)
+        user = await db.get(User, user_id)
+        if user is None or not user.is_active or user.token_version != token_version:
+            return None
+        await self._put(user)
+        return user
+
+    async def invalidate(self, user_id: str, *token_versions: int) -> None:
+        for token_version in token_versions:
+            self._local.pop((user_id, token_version))
+        if self.shared is not None:
+            await self.shared.delete(*(self._shared_key(user_id, version) for version in token_versions))
+
+    def clear(self) -> None:
+        self._local.clear()
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS, shared=shared_cache
+)
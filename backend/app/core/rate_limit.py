@@ -0,0 +1,130 @@
+import logging
+import math
+import time
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.shared_cache import SharedCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+class SlidingWindowLimiter:
+    """
+    At most `limit` hits per key in any `window` seconds, estimated from two fixed
+    windows: the current count plus the previous window's count weighted by how much
+    of it still overlaps the sliding one. That's two counters per key instead of a
+    timestamp log, in process or in the optional shared cache (so the limit holds
+    across workers); if the shared cache fails, the in-process counters take over.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        window: float,
+        shared: Optional[SharedCache] = None,
+        maxsize: int = 100_000,
+    ):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.shared = shared
+        # bucket -> hits, per key; a key idle for two windows can't affect the estimate
+        self._local = TTLCache(maxsize=maxsize, ttl=2 * window)
+
+    def _shared_key(self, key: str, bucket: int) -> str:
+        return self.shared.key(f"ratelimit:{self.name}:{key}:{bucket}")
+
+    def _local_add(self, key: str, bucket: int, amount: int) -> Tuple[int, int]:
+        counts = self._local.get(key) or {}
+        previous, current = counts.get(bucket - 1, 0), counts.get(bucket, 0) + amount
+        self._local.set(key, {bucket - 1: previous, bucket: current})
+        return previous, current
+
+    async def _increment(self, key: str, bucket: int) -> Tuple[int, int, bool]:
+        """
+        Count a hit and return the (previous, current) bucket counts including it,
+        and whether the shared counters took it.
+        """
+        # Always counted locally too, so a shared cache outage doesn't reset every limit
+        counts = self._local_add(key, bucket, 1)
+        if self.shared is None:
+            return (*counts, False)
+        name = self._shared_key(key, bucket)
+        try:
+            # INCR is atomic, so concurrent hits each see a different count
+            current = await self.shared.client.incr(name)
+            await self.shared.client.pexpire(name, int(2 * self.window * 1000))
+            previous = await self.shared.client.get(self._shared_key(key, bucket - 1))
+            return int(previous or 0), int(current), True
+        except Exception:
+            logger.warning("Shared rate limit write failed for %s; counting locally", self.name, exc_info=True)
+        return (*counts, False)
+
+    async def _decrement(self, key: str, bucket: int, shared: bool) -> None:
+        self._local_add(key, bucket, -1)
+        if not shared:
+            return
+        try:
+            await self.shared.client.decr(self._shared_key(key, bucket))
+        except Exception:
+            logger.warning("Shared rate limit write failed for %s", self.name, exc_info=True)
+
+    def _retry_after(self, previous: int, current: int, elapsed: float) -> float:
+        if current >= self.limit or previous == 0:
+            return self.window - elapsed
+        # When the previous window's weighted share has dropped enough to fit another hit
+        return self.window * (1 - (self.limit - current) / previous) - elapsed
+
+    async def hit(self, key: str) -> None:
+        """
+        Count a hit for `key`, or raise 429 if it has used up its hits. The decision
+        uses the counts returned by the increment, not an earlier read, so concurrent
+        hits can't all pass on the same stale count; a refused hit is taken back.
+        """
+        now = time.time()
+        bucket = int(now // self.window)
+        elapsed = now - bucket * self.window
+        previous, current, shared = await self._increment(key, bucket)
+        # Counts before this hit, as if it hadn't been made yet
+        current -= 1
+        if previous * (1 - elapsed / self.window) + current >= self.limit:
+            await self._decrement(key, bucket, shared)
+            retry_after = max(math.ceil(self._retry_after(previous, current, elapsed)), 1)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts; retry later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    async def reset(self, key: str) -> None:
+        """
+        Forget every hit counted for `key`.
+        """
+        self._local.pop(key)
+        if self.shared is not None:
+            bucket = int(time.time() // self.window)
+            try:
+                await self.shared.client.delete(self._shared_key(key, bucket - 1), self._shared_key(key, bucket))
+            except Exception:
+                logger.warning("Shared rate limit reset failed for %s", self.name, exc_info=True)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy this is only the real client with uvicorn's --proxy-headers
+    return request.client.host if request.client else "unknown"
+
+# Every login and refresh attempt, per client address
+auth_ip_limiter = SlidingWindowLimiter(
+    "auth-ip", settings.AUTH_RATE_LIMIT_PER_IP, settings.AUTH_RATE_LIMIT_WINDOW_SECONDS, shared=shared_cache
+)
+# Login attempts per account, so a guessed password list can't be spread over many addresses;
+# counted before the password is checked and reset by a successful login
+login_email_limiter = SlidingWindowLimiter(
+    "login-email", settings.AUTH_RATE_LIMIT_PER_EMAIL, settings.AUTH_RATE_LIMIT_WINDOW_SECONDS, shared=shared_cache
+)
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Headers set while building a response that are replayed with the cached body
+_STORED_HEADERS = ("x-next-cursor", "deprecation")
+
+def _if_none_match(request: Request) -> set:
+    header = request.headers.get("if-none-match", "")
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+class ResponseCache:
+    """
+    Per-user cache of rendered GET responses. An entry is reused only while the
+    owner's data version is unchanged, so writes invalidate it without a purge;
+    TTL and LRU eviction bound memory. Each response carries an ETag built from
+    the version, and a matching If-None-Match gets a bodiless 304 before any
+    data is loaded.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _key(request: Request, owner: str, vary: Tuple[Hashable, ...]) -> Tuple[Hashable, ...]:
+        return (owner, request.url.path, tuple(sorted(request.query_params.multi_items())), *vary)
+
+    @staticmethod
+    def etag(key: Tuple[Hashable, ...], version: int) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        return f'W/"{digest}-{version}"'
+
+    async def respond(
+        self,
+        request: Request,
+        owner: str,
+        version: int,
+        build: Callable[[Response], Awaitable[Any]],
+        vary: Tuple[Hashable, ...] = (),
+    ) -> Response:
+        """
+        Serve the response for `request` as of `version`. `build` is only called on
+        a miss; it gets a Response whose headers (e.g. X-Next-Cursor) are kept with
+        the entry. `vary` adds anything besides the URL that changes the body.
+        """
+        key = self._key(request, owner, vary)
+        etag = self.etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in _if_none_match(request):
+            return Response(status_code=304, headers=headers)
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            scratch = Response()
+            content = await build(scratch)
+            body = JSONResponse(jsonable_encoder(content)).body
+            stored = {name: value for name, value in scratch.headers.items() if name in _STORED_HEADERS}
+            entry = (version, body, stored)
+            self._entries.set(key, entry)
+        _, body, stored = entry
+        return Response(content=body, media_type="application/json", headers={**stored, **headers})
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,119 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.shared_cache import SharedCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Slack for clocks that differ between workers when pulling recent revocations
+_CLOCK_SKEW_SECONDS = 5.0
+_PRUNE_INTERVAL_SECONDS = 600.0
+
+class RevocationStore:
+    """
+    Revoked token ids (jti) until the token would have expired anyway. Checks go
+    through a local bloom filter first, so a token that was never revoked costs a
+    few hash probes; only filter hits look at the exact set. With a shared cache,
+    revocations also go into a Redis sorted set scored by revocation time, and
+    every worker pulls new ones at most once per `sync_interval`, so a logout on
+    one worker is honoured by all of them within that interval.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        shared: Optional[SharedCache] = None,
+        sync_interval: float = 1.0,
+        retention: float = 7 * 86400,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.shared = shared
+        self.sync_interval = sync_interval
+        # Longest token lifetime; shared entries older than this can't matter any more
+        self.retention = retention
+        self._revoked: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_until = 0.0
+        self._next_sync = 0.0
+        self._next_prune = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+
+    @property
+    def _shared_key(self) -> str:
+        return self.shared.key("revoked_tokens")
+
+    def _add_local(self, jti: str, expires_at: float) -> None:
+        self._revoked[jti] = max(expires_at, self._revoked.get(jti, 0.0))
+        self._filter.add(jti)
+        # Past what the filter was sized for its error rate climbs; the rebuild doubles it,
+        # so rebuilds get rarer as the set grows instead of happening on every revoke
+        if len(self._revoked) > self._filter.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        # Bloom filters can't drop items: rebuild from the entries that still matter
+        now = time.time()
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+        self._filter = BloomFilter(max(self.capacity, len(self._revoked) * 2), self.error_rate)
+        for jti in self._revoked:
+            self._filter.add(jti)
+        self._next_prune = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        self._add_local(jti, expires_at)
+        if self.shared is None:
+            return
+        now = time.time()
+        try:
+            await self.shared.client.zadd(self._shared_key, {f"{jti}:{expires_at}": now})
+            await self.shared.client.zremrangebyscore(self._shared_key, "-inf", now - self.retention)
+        except Exception:
+            logger.warning("Could not share revocation of %s; other workers won't see it", jti, exc_info=True)
+
+    async def _sync(self) -> None:
+        now = time.monotonic()
+        if self.shared is None or now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        try:
+            entries = await self.shared.client.zrangebyscore(
+                self._shared_key, max(self._synced_until - _CLOCK_SKEW_SECONDS, 0), "+inf", withscores=True
+            )
+        except Exception:
+            logger.warning("Could not pull shared token revocations", exc_info=True)
+            return
+        for member, revoked_at in entries:
+            member = member.decode() if isinstance(member, bytes) else member
+            jti, _, expires_at = member.rpartition(":")
+            self._add_local(jti, float(expires_at))
+            self._synced_until = max(self._synced_until, float(revoked_at))
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            # Tokens issued before ids were added can only be revoked through token_version
+            return False
+        await self._sync()
+        if time.monotonic() >= self._next_prune:
+            self._prune()
+        if jti not in self._filter:
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self) -> None:
+        self._revoked.clear()
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+
+revocation_store = RevocationStore(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    shared=shared_cache,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    retention=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+)
@@ -1,28 +1,34 @@
 from datetime import datetime, timedelta
 from typing import Any, Union
 import re
+import uuid
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.principals import principal_cache
+from app.core.revocation import revocation_store
+from app.db.session import get_async_db
 from app.models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    # Pinning min = max = default makes any hash with another cost "need update",
+    # so changing BCRYPT_ROUNDS upgrades (or lowers) stored hashes at their next login
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -31,17 +37,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("type") == "refresh":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+    # A bloom filter probe for the common, never-revoked token
+    if await revocation_store.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    # Tokens issued before token versions existed carry none; they match version 0
+    user = await principal_cache.resolve(db, user_id, payload.get("ver", 0))
     if user is None:
         raise credentials_exception
     return user
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta | None = None
+    subject: Union[str, Any], expires_delta: timedelta | None = None, token_version: int = 0
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -49,7 +59,7 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "ver": token_version, "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -76,15 +86,26 @@ def validate_password_strength(password: str) -> None:
 
 # Refresh token utilities
 
-def create_refresh_token(subject: Union[str, Any], expires_delta: timedelta | None = None) -> str:
+def create_refresh_token(
+    subject: Union[str, Any], expires_delta: timedelta | None = None, token_version: int = 0
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(days=7)  # Default: 7 days
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {
+        "exp": expire, "sub": str(subject), "type": "refresh", "ver": token_version, "jti": uuid.uuid4().hex,
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+async def revoke_token(payload: dict) -> None:
+    """
+    Revoke a decoded token until it expires; tokens without an id can't be revoked singly.
+    """
+    if payload.get("jti") and payload.get("exp"):
+        await revocation_store.revoke(payload["jti"], float(payload["exp"]))
+
 def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -0,0 +1,47 @@
+import json
+import logging
+from typing import Any, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SharedCache:
+    """
+    Optional Redis-backed store shared by every worker, for state that an in-process
+    cache can't keep consistent across processes. Values are JSON. Failures are
+    logged and treated as misses so Redis being down never fails a request.
+    """
+
+    def __init__(self, url: str, prefix: str = "complymate:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("SHARED_CACHE_URL is set but the redis package is not installed") from exc
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    def key(self, name: str) -> str:
+        return self.prefix + name
+
+    async def get(self, name: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self.key(name))
+        except Exception:
+            logger.warning("Shared cache read failed for %s", name, exc_info=True)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, name: str, value: Any, ttl: float) -> None:
+        try:
+            await self.client.set(self.key(name), json.dumps(value), px=max(int(ttl * 1000), 1))
+        except Exception:
+            logger.warning("Shared cache write failed for %s", name, exc_info=True)
+
+    async def delete(self, *names: str) -> None:
+        try:
+            await self.client.delete(*(self.key(name) for name in names))
+        except Exception:
+            logger.warning("Shared cache delete failed for %s", names, exc_info=True)
+
+shared_cache: Optional[SharedCache] = SharedCache(settings.SHARED_CACHE_URL) if settings.SHARED_CACHE_URL else None
@@ -2,6 +2,12 @@
 # imported by Alembic
 from app.db.session import Base
 from app.models.user import User
-from app.models.form import Form, FormVersion, FormAnalysis
+from app.models.form import Form, FormDocument, FormVersion, FormAnalysis
 from app.models.chat import ChatSession, ChatMessage
-from app.models.file import File 
\ No newline at end of file
+from app.models.file import Blob, File
+from app.models.metrics import LLMCallMetric
+from app.models.analytics import AnalyticsRollup
+from app.models.search import SearchEntry
+# Register the flush hooks that keep analytics_rollups and search_entries current for any Session
+import app.services.analytics_service  # noqa: F401
+import app.services.search_service  # noqa: F401
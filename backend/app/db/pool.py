@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+class PoolMetrics:
+    """
+    Checkout counters for one connection pool: how long callers waited for a
+    connection, how many gave up, and how close the pool came to its limit.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent_waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.peak_in_use = 0
+
+    def observe_checkout(self, wait_ms: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self._recent_waits.append(wait_ms)
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        in_use = pool.checkedout()
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+            return {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "in_use": in_use,
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "saturation": round(in_use / capacity, 4) if capacity else None,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "p95_wait_ms": round(p95, 3),
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+class _InstrumentedPoolMixin:
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        # Covers waiting on the queue, opening overflow connections and the pre-ping
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.observe_timeout()
+            raise
+        if self.metrics:
+            self.metrics.observe_checkout((time.perf_counter() - started) * 1000, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncPool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(uri: str) -> Dict[str, Any]:
+    """
+    create_engine/create_async_engine keyword arguments for `uri`, built from the
+    DB_POOL_* and DB_STATEMENT_TIMEOUT_MS settings.
+    """
+    url = make_url(uri)
+    is_async = url.get_dialect().is_async
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    connect_args: Dict[str, Any] = {}
+
+    if url.get_backend_name() == "sqlite":
+        if not is_async:
+            connect_args["check_same_thread"] = False
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; leave SQLAlchemy's default pool
+            return {**options, "connect_args": connect_args}
+    elif url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    options.update(
+        poolclass=InstrumentedAsyncPool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+    return options
+
+def instrument(pool: Any) -> Any:
+    if isinstance(pool, _InstrumentedPoolMixin) and pool.metrics is None:
+        pool.metrics = PoolMetrics()
+    return pool
+
+def pool_status(pool: Any) -> Dict[str, Any]:
+    if isinstance(pool, _InstrumentedPoolMixin) and pool.metrics is not None:
+        return pool.metrics.snapshot(pool)
+    return {"status": pool.status()}
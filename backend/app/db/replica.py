@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.shared_cache import SharedCache, shared_cache
+from app.core.security import get_current_user
+from app.db.session import ReplicaSessionLocal, get_async_db
+from app.models.user import User
+from app.services.analytics_service import data_owners
+
+logger = logging.getLogger(__name__)
+
+# Seconds of replay lag; 0 on a primary or when everything received has been replayed
+_POSTGRES_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaRouter:
+    """
+    Decides per request whether reads may use the replica: never for a user inside
+    their read-your-writes window, and for nobody while the replica is unreachable
+    or more than `max_lag` seconds behind. Health is probed at most once per
+    `check_interval`, so routing costs no queries on the hot path. With a shared
+    cache the window is kept there too, so it holds whichever worker serves the
+    user's next request.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: Optional[async_sessionmaker] = None,
+        max_lag: float = 5.0,
+        sticky_seconds: float = 10.0,
+        check_interval: float = 5.0,
+        check_timeout: float = 1.0,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.sessionmaker = sessionmaker
+        self.sticky_seconds = sticky_seconds
+        self.shared = shared
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._writers = TTLCache(maxsize=100_000, ttl=sticky_seconds)
+        self._available = False
+        self._checked_at = float("-inf")
+
+    @staticmethod
+    def _shared_key(user_id: str) -> str:
+        return f"replica_sticky:{user_id}"
+
+    def mark_write(self, user_id: str) -> None:
+        self._writers.set(user_id, True)
+
+    async def share_writes(self, db: AsyncSession) -> None:
+        # Queued by pin_writers_to_primary; runs once the writes are committed
+        for user_id in db.info.pop("replica_writers", ()):
+            await self.shared.set(self._shared_key(user_id), True, self.sticky_seconds)
+
+    async def is_sticky(self, user_id: str) -> bool:
+        if self._writers.get(user_id, False):
+            return True
+        return self.shared is not None and bool(await self.shared.get(self._shared_key(user_id)))
+
+    def mark_down(self) -> None:
+        self._available = False
+        self._checked_at = time.monotonic()
+
+    async def _lag(self) -> float:
+        async with self.sessionmaker() as db:
+            if db.bind.dialect.name == "postgresql":
+                return float(await db.scalar(_POSTGRES_LAG))
+            await db.execute(text("SELECT 1"))
+            return 0.0
+
+    async def _probe(self) -> bool:
+        try:
+            lag = await asyncio.wait_for(self._lag(), self.check_timeout)
+        except (asyncio.TimeoutError, SQLAlchemyError, OSError):
+            logger.warning("Read replica unreachable; reading from the primary", exc_info=True)
+            return False
+        if lag > self.max_lag:
+            logger.warning("Read replica is %.1fs behind; reading from the primary", lag)
+            return False
+        return True
+
+    async def available(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            # Claimed before probing, so concurrent requests keep the last answer meanwhile
+            self._checked_at = now
+            self._available = await self._probe()
+        return self._available
+
+    async def use_replica(self, user_id: str) -> bool:
+        if self.sessionmaker is None or await self.is_sticky(user_id):
+            return False
+        return await self.available()
+
+replica_router = ReplicaRouter(
+    ReplicaSessionLocal,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    check_timeout=settings.REPLICA_CHECK_TIMEOUT_SECONDS,
+    shared=shared_cache,
+)
+
+@event.listens_for(Session, "after_flush")
+def pin_writers_to_primary(session: Session, flush_context) -> None:
+    # Whoever's forms, files or chats changed reads from the primary for a while: marked
+    # here for this worker, and after commit in the shared cache for the others
+    if replica_router.sessionmaker is None:
+        return
+    owners = data_owners(session)
+    for user_id in owners:
+        replica_router.mark_write(user_id)
+    if owners and replica_router.shared is not None:
+        session.info.setdefault("replica_writers", set()).update(owners)
+        callbacks = session.info.setdefault("after_commit", [])
+        if replica_router.share_writes not in callbacks:
+            callbacks.append(replica_router.share_writes)
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only endpoints: the replica when routing allows it, otherwise
+    the request's primary session (the one get_current_user already uses).
+    """
+    if not await replica_router.use_replica(current_user.id):
+        yield db
+        return
+    async with replica_router.sessionmaker() as replica:
+        try:
+            yield replica
+        except OperationalError:
+            # Lost connection or a recovery conflict; route to the primary until the next probe
+            replica_router.mark_down()
+            raise
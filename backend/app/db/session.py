@@ -1,18 +1,132 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.core.config import settings
+from app.db.pool import engine_options, instrument, pool_status
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_uri(uri: str) -> str:
+    """
+    Map a sync database URL (postgresql://, postgresql+psycopg2://, sqlite://)
+    onto its async driver: asyncpg for Postgres, aiosqlite for SQLite.
+    """
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or url.drivername == driver:
+        return uri
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+class RequestSession(Session):
+    """
+    Checks out one connection on first use and keeps it across commits until the
+    session closes, so a request that commits and then reads back (or commits twice)
+    costs a single pool checkout instead of one per transaction. Requests that never
+    query, e.g. auth from the principal cache plus a cached response, check out none.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._request_connection = None
+
+    def get_bind(self, mapper=None, **kwargs: Any):
+        bind = super().get_bind(mapper, **kwargs)
+        if isinstance(bind, Connection):
+            return bind
+        if self._request_connection is None or self._request_connection.closed:
+            self._request_connection = bind.connect()
+        return self._request_connection
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            if self._request_connection is not None:
+                self._request_connection.close()
+                self._request_connection = None
+
+def _sqlite_foreign_keys_on(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def enforce_foreign_keys(engine: Engine) -> Engine:
+    """
+    SQLite only checks REFERENCES and runs ON DELETE CASCADE when each connection asks
+    for it; turn that on so it deletes like Postgres. A no-op for other databases.
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_foreign_keys_on)
+    return engine
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+class RequestAsyncSession(AsyncSession):
+    """
+    Awaits the callbacks that sync flush hooks queue in `info["after_commit"]` once a
+    commit succeeds, for async work (e.g. the shared cache) those hooks can't do
+    themselves. It finishes before the endpoint returns, so before the response is sent.
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        for callback in self.info.pop("after_commit", ()):
+            await callback(self)
+
+    async def rollback(self) -> None:
+        self.info.pop("after_commit", None)
+        await super().rollback()
+
+def async_session_factory(bind: Any, **kwargs: Any) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind, class_=RequestAsyncSession, sync_session_class=RequestSession,
+        autoflush=False, expire_on_commit=False, **kwargs,
+    )
+
+# The one place engines are built. Request handlers use the async engine; the sync one
+# stays for Alembic, scripts and the metrics writer. Both use the DB_POOL_* settings.
+engine = enforce_foreign_keys(
+    create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings.SQLALCHEMY_DATABASE_URI))
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URI = async_database_uri(settings.SQLALCHEMY_DATABASE_URI)
+async_engine = create_async_engine(ASYNC_DATABASE_URI, **engine_options(ASYNC_DATABASE_URI))
+enforce_foreign_keys(async_engine.sync_engine)
+AsyncSessionLocal = async_session_factory(async_engine)
+
+# Read replica, when configured; its sessions are flagged read-only (see app.db.replica)
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    REPLICA_DATABASE_URI = async_database_uri(settings.DATABASE_REPLICA_URL)
+    replica_engine = create_async_engine(REPLICA_DATABASE_URI, **engine_options(REPLICA_DATABASE_URI))
+    ReplicaSessionLocal = async_session_factory(replica_engine, info={"read_only": True})
+    instrument(replica_engine.sync_engine.pool)
+
+instrument(engine.pool)
+instrument(async_engine.sync_engine.pool)
+
 Base = declarative_base()
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
+def get_pool_stats():
+    stats = {
+        "async": pool_status(async_engine.sync_engine.pool),
+        "sync": pool_status(engine.pool),
+    }
+    if replica_engine is not None:
+        stats["replica"] = pool_status(replica_engine.sync_engine.pool)
+    return stats
+
+async def get_async_db():
+    # The request's one unit of work: FastAPI caches dependencies per request, so the
+    # endpoint, get_current_user and get_read_db (on the primary) all share this session
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -0,0 +1,43 @@
+import re
+from typing import Any, Sequence
+
+from sqlalchemy import JSON, String, bindparam, func, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB on Postgres (binary, GIN-indexable, supports @>), plain JSON text elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+_SEGMENT = re.compile(r"^[A-Za-z0-9_]+$")
+
+def _checked(path: Sequence[str]) -> Sequence[str]:
+    # Paths are inlined into SQL (see json_text), so only plain keys are allowed
+    for segment in path:
+        if not _SEGMENT.match(segment):
+            raise ValueError(f"Invalid JSON path segment: {segment!r}")
+    return path
+
+def json_text(column: Any, path: Sequence[str], dialect: str) -> Any:
+    """
+    The text value at `path` inside a JSON column, '' when absent or null. Everything
+    is rendered inline rather than bound, so the expression matches the expression
+    indexes declared with this same function, and "missing" is a single seekable `= ''`.
+    """
+    path = _checked(path)
+    if dialect == "postgresql":
+        value = column.op("#>>", return_type=String)(literal_column("'{%s}'" % ",".join(path)))
+    else:
+        value = func.json_extract(column, literal_column("'$.%s'" % ".".join(path)), type_=String)
+    return func.coalesce(value, literal_column("''"), type_=String)
+
+def json_each(column: Any, path: Sequence[str]) -> Any:
+    """
+    SQLite table-valued json_each over the array at `path`, with a `value` column.
+    """
+    path = _checked(path)
+    return func.json_each(column, literal_column("'$.%s'" % ".".join(path))).table_valued("value")
+
+def json_contains(column: Any, document: Any) -> Any:
+    """
+    Postgres JSONB containment (`column @> document`), served by a GIN index.
+    """
+    return column.op("@>", is_comparison=True)(bindparam(None, document, type_=JSONB))
@@ -6,8 +6,9 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.db.session import Base, engine
-from app.core.dependencies import get_current_user
+from app.db.session import Base, engine, async_engine, get_pool_stats
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.metrics_service import llm_metrics
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -25,11 +26,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-# Create tables on startup
-Base.metadata.create_all(bind=engine)
-
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -39,6 +38,7 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 @app.exception_handler(RequestValidationError)
@@ -48,6 +48,27 @@ async def validation_exception_handler(request, exc):
         content={"detail": exc.errors()},
     )
 
+@app.on_event("startup")
+def create_tables_for_development():
+    # The schema belongs to Alembic (`alembic upgrade head`); workers don't reflect it at boot
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
+
+@app.on_event("shutdown")
+def flush_llm_metrics():
+    llm_metrics.flush()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+@app.get("/health/db")
+async def database_health_check():
+    """
+    Connection pool usage: checkout waits, timeouts and saturation per engine.
+    """
+    return {"pools": get_pool_stats()}
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, Float, JSON, DateTime
+from datetime import datetime
+
+from app.db.session import Base
+
+class AnalyticsRollup(Base):
+    """
+    Dashboard aggregates for one user or one company, kept current by
+    app.services.analytics_service as forms, analyses, files and chats are written.
+    """
+    __tablename__ = "analytics_rollups"
+
+    scope = Column(String(16), primary_key=True)  # "user" or "company"
+    scope_id = Column(String, primary_key=True)  # users.id or users.company_name
+    total_forms = Column(Integer, nullable=False, default=0)
+    forms_by_status = Column(JSON, nullable=False, default=dict)
+    completion_sum = Column(Float, nullable=False, default=0)
+    completion_count = Column(Integer, nullable=False, default=0)
+    active_chats = Column(Integer, nullable=False, default=0)
+    recent_analyses = Column(JSON, nullable=False, default=list)
+    recent_files = Column(JSON, nullable=False, default=list)
+    # {"YYYY-MM-DD": [score_sum, analysis_count]} for the trend window
+    compliance_daily = Column(JSON, nullable=False, default=dict)
+    # Bumped by every write to the scope's forms, files or chats; keys the response cache
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=False), default=datetime.utcnow, onupdate=datetime.utcnow)
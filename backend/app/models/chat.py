@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, JSON, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, JSON, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -9,7 +9,7 @@ class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    form_id = Column(String(36), ForeignKey("forms.id"), nullable=False)
+    form_id = Column(String(36), ForeignKey("forms.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     status = Column(String, default="active")
     context = Column(JSON, nullable=False)
@@ -22,13 +22,13 @@ class ChatSession(Base):
     # Relationships
     form = relationship("Form", back_populates="chat_sessions")
     user = relationship("User")
-    messages = relationship("ChatMessage", back_populates="session")
+    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan", passive_deletes=True)
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id = Column(String(36), ForeignKey("chat_sessions.id"), nullable=False)
+    session_id = Column(String(36), ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
     role = Column(String, nullable=False)  # 'user', 'assistant', 'system'
     content = Column(Text, nullable=False)
     selected_option = Column(String)
@@ -36,4 +36,10 @@ class ChatMessage(Base):
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
 
     # Relationships
-    session = relationship("ChatSession", back_populates="messages") 
\ No newline at end of file
+    session = relationship("ChatSession", back_populates="messages") 
+
+# Indexes for the per-user list queries
+Index('idx_chat_sessions_user_status', ChatSession.user_id, ChatSession.status)
+Index('idx_chat_sessions_user_created', ChatSession.user_id, ChatSession.created_at, ChatSession.id)
+Index('idx_chat_sessions_form', ChatSession.form_id)
+Index('idx_chat_messages_session_created', ChatMessage.session_id, ChatMessage.created_at, ChatMessage.id)
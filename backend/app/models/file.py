@@ -1,9 +1,21 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 
 from app.db.session import Base
+from app.db.types import JSONDocument
+
+class Blob(Base):
+    """
+    Upload content stored once under its sha256; ref_count is the number of files rows pointing at it.
+    """
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
 
 class File(Base):
     __tablename__ = "files"
@@ -12,13 +24,20 @@ class File(Base):
     form_id = Column(String(36), ForeignKey("forms.id"), nullable=False)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    # Content in the blob store; NULL for uploads stored before it existed
+    sha256 = Column(String(64), ForeignKey("blobs.sha256"))
     mime_type = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
     processing_status = Column(String, default="pending")
-    extracted_data = Column(JSON)
+    extracted_data = Column(JSONDocument)
     uploaded_by = Column(String(36), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
 
     # Relationships
     form = relationship("Form", back_populates="files")
-    uploader = relationship("User") 
\ No newline at end of file
+    uploader = relationship("User")
+
+# Indexes for the per-user list queries
+Index('idx_files_uploader_created', File.uploaded_by, File.created_at, File.id)
+Index('idx_files_form', File.form_id)
+Index('idx_files_sha256', File.sha256)
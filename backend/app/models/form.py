@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, DateTime, Index, LargeBinary, Boolean
 from sqlalchemy.orm import relationship
+import hashlib
 import uuid
+import zlib
 from datetime import datetime
 
 from app.db.session import Base
+from app.db.types import JSONDocument, json_text
 
 class Form(Base):
     __tablename__ = "forms"
@@ -13,9 +16,9 @@ class Form(Base):
     title = Column(String, nullable=False)
     type = Column(String, nullable=False)
     year = Column(Integer, nullable=False)
-    content = Column(JSON, nullable=False)
+    content = Column(JSONDocument, nullable=False)
     status = Column(String, default="draft")
-    form_metadata = Column(JSON)
+    form_metadata = Column(JSONDocument)
     completion_percentage = Column(Float, default=0)
     processing_status = Column(String)
     last_processed_at = Column(DateTime(timezone=False))
@@ -26,8 +29,46 @@ class Form(Base):
     user = relationship("User", back_populates="forms")
     versions = relationship("FormVersion", back_populates="form")
     analyses = relationship("FormAnalysis", back_populates="form")
-    chat_sessions = relationship("ChatSession", back_populates="form")
+    chat_sessions = relationship(
+        "ChatSession", back_populates="form", cascade="all, delete-orphan", passive_deletes=True
+    )
     files = relationship("File", back_populates="form")
+    # form_documents.form_id (like chat_sessions.form_id) is ON DELETE CASCADE, so the
+    # rows go without being loaded
+    document = relationship(
+        "FormDocument", back_populates="form", uselist=False, cascade="all, delete-orphan", passive_deletes=True
+    )
+
+class FormDocument(Base):
+    """
+    Text extracted from the form's uploaded PDF, zlib-compressed and kept off the
+    forms row so list/get queries don't load it. One per form; re-uploads replace it.
+    """
+    __tablename__ = "form_documents"
+
+    form_id = Column(String(36), ForeignKey("forms.id", ondelete="CASCADE"), primary_key=True)
+    filename = Column(String)
+    text_compressed = Column(LargeBinary, nullable=False)
+    text_sha256 = Column(String(64), nullable=False)
+    text_length = Column(Integer, nullable=False)
+    # Precomputed reply to the default chat opener, valid while text_sha256 matches
+    opening_turn = Column(JSON)
+    created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=False), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    form = relationship("Form", back_populates="document")
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.text_compressed).decode("utf-8")
+
+    @text.setter
+    def text(self, value: str) -> None:
+        raw = value.encode("utf-8")
+        self.text_compressed = zlib.compress(raw, 6)
+        self.text_sha256 = hashlib.sha256(raw).hexdigest()
+        self.text_length = len(value)
 
 class FormVersion(Base):
     __tablename__ = "form_versions"
@@ -35,7 +76,10 @@ class FormVersion(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     form_id = Column(String(36), ForeignKey("forms.id"), nullable=False)
     version_number = Column(Integer, nullable=False)
-    content = Column(JSON, nullable=False)
+    # Snapshot rows keep the full content; delta rows keep a JSON patch against the previous version
+    is_snapshot = Column(Boolean, nullable=False, default=True)
+    snapshot = Column("content", JSON)
+    delta = Column(JSON)
     changes_description = Column(String)
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
     created_by = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -44,6 +88,9 @@ class FormVersion(Base):
     form = relationship("Form", back_populates="versions")
     creator = relationship("User")
 
+    # Full content, filled in by FormVersionService when a version is read or written; not a column
+    content = None
+
 class FormAnalysis(Base):
     __tablename__ = "form_analyses"
 
@@ -59,4 +106,29 @@ class FormAnalysis(Base):
 
     # Relationships
     form = relationship("Form", back_populates="analyses")
-    creator = relationship("User") 
\ No newline at end of file
+    creator = relationship("User") 
+
+# Indexes for the per-user list/dashboard queries; trailing id keeps (created_at, id) ordering sort-free
+Index('idx_forms_user_created', Form.user_id, Form.created_at, Form.id)
+Index('idx_forms_user_status', Form.user_id, Form.status)
+Index('idx_form_versions_form_created', FormVersion.form_id, FormVersion.created_at, FormVersion.id)
+Index('idx_form_versions_form_number', FormVersion.form_id, FormVersion.version_number, FormVersion.created_at)
+Index('idx_form_versions_unique', FormVersion.form_id, FormVersion.version_number, unique=True)
+Index('idx_form_analyses_form_created', FormAnalysis.form_id, FormAnalysis.created_at)
+
+# filled_fields lookups (app.services.form_query_service). Equality filters use JSONB
+# containment on Postgres, served by the GIN index; exists/missing filters on these
+# common paths use per-user expression indexes, which SQLite gets too.
+FILLED_FIELD_INDEXES = {
+    "idx_forms_ff_establishment_name": ("osha_300", "establishment_name"),
+    "idx_forms_ff_total_hours_worked": ("osha_300a", "total_hours_worked"),
+    "idx_forms_ff_annual_avg_employees": ("osha_300a", "annual_avg_employees"),
+    "idx_forms_ff_case_number": ("osha_301", "case_number"),
+}
+Index(
+    'idx_forms_content_gin', Form.content,
+    postgresql_using='gin', postgresql_ops={'content': 'jsonb_path_ops'},
+).ddl_if(dialect='postgresql')
+for _name, _path in FILLED_FIELD_INDEXES.items():
+    for _dialect in ('postgresql', 'sqlite'):
+        Index(_name, Form.user_id, json_text(Form.content, ('filled_fields', *_path), _dialect)).ddl_if(dialect=_dialect)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Index
+import uuid
+from datetime import datetime
+
+from app.db.session import Base
+
+class LLMCallMetric(Base):
+    __tablename__ = "llm_call_metrics"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    form_id = Column(String(36), ForeignKey("forms.id", ondelete="SET NULL"))
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"))
+    model = Column(String, nullable=False)
+    operation = Column(String, nullable=False)  # 'form_chat', ...
+    status = Column(String, nullable=False, default="ok")  # 'ok', 'error'
+    queue_wait_ms = Column(Float, nullable=False, default=0)
+    ttft_ms = Column(Float)
+    latency_ms = Column(Float, nullable=False)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0)
+    created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
+
+# Indexes for the usage aggregation queries
+Index('idx_llm_call_metrics_user_created', LLMCallMetric.user_id, LLMCallMetric.created_at)
+Index('idx_llm_call_metrics_form_created', LLMCallMetric.form_id, LLMCallMetric.created_at)
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, DDL, DateTime, ForeignKey, Index, Integer, String, Text, event, func, literal_column
+from datetime import datetime
+
+from app.db.session import Base
+
+class SearchEntry(Base):
+    """
+    One searchable piece of a form: its extracted PDF text ("document"), its title and
+    case descriptions ("form"), or a chat message ("chat"). Kept current by
+    app.services.search_service; full-text indexed by Postgres tsvector or SQLite FTS5.
+    """
+    __tablename__ = "search_entries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String(16), nullable=False)
+    source_id = Column(String(36), nullable=False)  # forms.id, or chat_messages.id for "chat"
+    form_id = Column(String(36), ForeignKey("forms.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    body = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=False), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+SEARCH_CONFIG = "english"
+
+def search_vector(body):
+    # Inline config so queries match the GIN expression index below
+    return func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'"), body)
+
+Index('idx_search_entries_source', SearchEntry.source, SearchEntry.source_id, unique=True)
+Index('idx_search_entries_form', SearchEntry.form_id)
+Index('idx_search_entries_user', SearchEntry.user_id)
+Index(
+    'idx_search_entries_tsv', search_vector(SearchEntry.body), postgresql_using='gin',
+).ddl_if(dialect='postgresql')
+
+# SQLite: an external-content FTS5 table over search_entries, synced by triggers
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE search_entries_fts USING fts5("
+    "body, content='search_entries', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER search_entries_ai AFTER INSERT ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER search_entries_au AFTER UPDATE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_entries_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+for _statement in SQLITE_FTS_DDL:
+    event.listen(SearchEntry.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    SearchEntry.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS search_entries_fts").execute_if(dialect="sqlite"),
+)
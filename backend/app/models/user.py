@@ -20,6 +20,8 @@ class User(Base):
     subscription_tier = Column(String, default="free")
     subscription_status = Column(String, default="active")
     is_active = Column(Boolean, default=True)
+    # Carried in issued tokens; bumping it revokes every token issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -20,6 +20,9 @@ class FormUpdate(BaseModel):
     form_metadata: Optional[Dict[str, Any]] = None
     status: Optional[str] = None
 
+class FormBulkUpdate(FormUpdate):
+    id: str
+
 class FormVersionBase(BaseModel):
     version_number: int
     content: Dict[str, Any]
@@ -28,6 +31,9 @@ class FormVersionBase(BaseModel):
 class FormVersionCreate(FormVersionBase):
     pass
 
+class FormVersionBulkCreate(FormVersionBase):
+    form_id: str
+
 class FormVersionResponse(FormVersionBase):
     id: str
     form_id: str
@@ -56,6 +62,42 @@ class FormAnalysisResponse(FormAnalysisBase):
     class Config:
         from_attributes = True
 
+class FormSummaryResponse(BaseModel):
+    """
+    List view of a form: no content or embedded versions/analyses, just their counts.
+    """
+    id: str
+    user_id: str
+    title: str
+    type: str
+    year: int
+    form_metadata: Optional[Dict[str, Any]] = None
+    status: str
+    completion_percentage: float
+    processing_status: Optional[str] = None
+    last_processed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    version_count: int = 0
+    analysis_count: int = 0
+    latest_version_at: Optional[datetime] = None
+    latest_analysis_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class FormDocumentResponse(BaseModel):
+    form_id: str
+    filename: Optional[str] = None
+    text: str
+    text_length: int
+    text_sha256: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class FormResponse(FormBase):
     id: str
     user_id: str
@@ -69,4 +111,16 @@ class FormResponse(FormBase):
     analyses: List[FormAnalysisResponse] = []
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class BulkItemResult(BaseModel):
+    index: int  # position in the submitted array / NDJSON stream
+    status: str  # "created", "updated" or "error"
+    id: Optional[str] = None
+    error: Optional[Any] = None
+
+class BulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    results: List[BulkItemResult] = []
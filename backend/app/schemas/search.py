@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+class SearchHit(BaseModel):
+    form_id: str
+    form_title: str
+    source: str  # "document", "form" or "chat"
+    source_id: str
+    snippet: str  # matched terms wrapped in <mark></mark>
+    rank: float
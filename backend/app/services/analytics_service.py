@@ -0,0 +1,352 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.analytics import AnalyticsRollup
+from app.models.chat import ChatMessage, ChatSession
+from app.models.file import File
+from app.models.form import Form, FormAnalysis, FormDocument, FormVersion
+from app.models.user import User
+
+RECENT_LIMIT = 5
+TREND_DAYS = 30
+
+# Rollups are maintained from session hooks so every write path (endpoints, services,
+# scripts) updates them inside its own transaction: changes are collected at each flush
+# and applied just before commit, so the rollup rows are locked only while committing.
+
+def _owner_ids(scope: str, scope_id: str):
+    if scope == "user":
+        return [scope_id]
+    return select(User.id).where(User.company_name == scope_id)
+
+def _analysis_entry(analysis: FormAnalysis) -> Dict[str, Any]:
+    return {
+        "id": str(analysis.id),
+        "form_id": str(analysis.form_id),
+        "type": analysis.analysis_type,
+        "score": analysis.compliance_score,
+        "created_at": analysis.created_at.isoformat(),
+    }
+
+def _file_entry(file: File) -> Dict[str, Any]:
+    return {
+        "id": str(file.id),
+        "filename": file.filename,
+        "status": file.processing_status,
+        "created_at": file.created_at.isoformat(),
+    }
+
+def _status_key(status: Optional[str]) -> str:
+    # Matches how a None status serialized as a JSON object key before rollups
+    return "null" if status is None else status
+
+def _trend_cutoff() -> str:
+    return (datetime.utcnow() - timedelta(days=TREND_DAYS)).date().isoformat()
+
+def rebuild_rollup(session: Session, scope: str, scope_id: str, persist: bool = True) -> AnalyticsRollup:
+    """
+    Recompute a rollup from the base tables. Used to create missing rollups and
+    after deletes, which the incremental path doesn't handle. With persist=False
+    (read-only replica sessions) the result is a transient row that isn't locked or added.
+    """
+    owners = _owner_ids(scope, scope_id)
+    forms_by_status = dict(session.execute(
+        select(Form.status, func.count(Form.id)).where(Form.user_id.in_(owners)).group_by(Form.status)
+    ).all())
+    completion_sum, completion_count = session.execute(
+        select(func.coalesce(func.sum(Form.completion_percentage), 0), func.count(Form.completion_percentage))
+        .where(Form.user_id.in_(owners))
+    ).one()
+    active_chats = session.scalar(
+        select(func.count(ChatSession.id)).where(ChatSession.user_id.in_(owners), ChatSession.status == "active")
+    )
+    recent_analyses = session.scalars(
+        select(FormAnalysis).join(Form).where(Form.user_id.in_(owners))
+        .order_by(FormAnalysis.created_at.desc()).limit(RECENT_LIMIT)
+    ).all()
+    recent_files = session.scalars(
+        select(File).where(File.uploaded_by.in_(owners)).order_by(File.created_at.desc()).limit(RECENT_LIMIT)
+    ).all()
+    trend_start = datetime.utcnow() - timedelta(days=TREND_DAYS)
+    daily = session.execute(
+        select(FormAnalysis.created_at, FormAnalysis.compliance_score).join(Form).where(
+            Form.user_id.in_(owners),
+            FormAnalysis.created_at >= trend_start,
+            FormAnalysis.compliance_score.is_not(None),
+        )
+    ).all()
+    compliance_daily = defaultdict(lambda: [0.0, 0])
+    for created_at, score in daily:
+        bucket = compliance_daily[created_at.date().isoformat()]
+        bucket[0] += score
+        bucket[1] += 1
+
+    rollup = session.get(AnalyticsRollup, (scope, scope_id), with_for_update=True) if persist else None
+    if rollup is None:
+        rollup = AnalyticsRollup(scope=scope, scope_id=scope_id, version=0)
+        if persist:
+            session.add(rollup)
+    rollup.total_forms = sum(forms_by_status.values())
+    rollup.forms_by_status = {_status_key(status): count for status, count in forms_by_status.items()}
+    rollup.completion_sum = float(completion_sum or 0)
+    rollup.completion_count = completion_count
+    rollup.active_chats = active_chats or 0
+    rollup.recent_analyses = [_analysis_entry(analysis) for analysis in recent_analyses]
+    rollup.recent_files = [_file_entry(file) for file in recent_files]
+    rollup.compliance_daily = dict(compliance_daily)
+    return rollup
+
+class _RollupDelta:
+    def __init__(self):
+        self.forms = 0
+        self.statuses = Counter()
+        self.completion_sum = 0.0
+        self.completion_count = 0
+        self.active_chats = 0
+        self.analyses: List[Dict[str, Any]] = []
+        self.files: List[Dict[str, Any]] = []
+        self.scores: List[tuple] = []
+        self.needs_rebuild = False
+
+    def add_form(self, status: Optional[str], completion: Optional[float], sign: int) -> None:
+        self.forms += sign
+        self.statuses[_status_key(status)] += sign
+        if completion is not None:
+            self.completion_sum += sign * completion
+            self.completion_count += sign
+
+    def merge(self, other: "_RollupDelta") -> None:
+        self.forms += other.forms
+        self.statuses.update(other.statuses)
+        self.completion_sum += other.completion_sum
+        self.completion_count += other.completion_count
+        self.active_chats += other.active_chats
+        self.analyses.extend(other.analyses)
+        self.files.extend(other.files)
+        self.scores.extend(other.scores)
+        self.needs_rebuild = self.needs_rebuild or other.needs_rebuild
+
+    @property
+    def touches_documents(self) -> bool:
+        # The JSON columns need a read-modify-write; the counters don't
+        return bool(any(self.statuses.values()) or self.analyses or self.files or self.scores)
+
+    def counter_values(self) -> Dict[str, Any]:
+        return {
+            "total_forms": AnalyticsRollup.total_forms + self.forms,
+            "completion_sum": AnalyticsRollup.completion_sum + self.completion_sum,
+            "completion_count": AnalyticsRollup.completion_count + self.completion_count,
+            "active_chats": AnalyticsRollup.active_chats + self.active_chats,
+            "version": AnalyticsRollup.version + 1,
+        }
+
+    def apply_documents(self, rollup: AnalyticsRollup) -> None:
+        statuses = Counter(rollup.forms_by_status)
+        statuses.update(self.statuses)
+        rollup.forms_by_status = {status: count for status, count in statuses.items() if count > 0}
+        if self.analyses:
+            merged = sorted(rollup.recent_analyses + self.analyses, key=lambda entry: entry["created_at"], reverse=True)
+            rollup.recent_analyses = merged[:RECENT_LIMIT]
+        if self.files:
+            merged = sorted(rollup.recent_files + self.files, key=lambda entry: entry["created_at"], reverse=True)
+            rollup.recent_files = merged[:RECENT_LIMIT]
+        if self.scores:
+            cutoff = _trend_cutoff()
+            daily = {day: list(bucket) for day, bucket in rollup.compliance_daily.items() if day >= cutoff}
+            for day, score in self.scores:
+                bucket = daily.setdefault(day, [0.0, 0])
+                bucket[0] += score
+                bucket[1] += 1
+            rollup.compliance_daily = daily
+
+def _history(obj: Any, attribute: str):
+    """(old, new) for an attribute changed in this flush, or None if unchanged."""
+    history = inspect(obj).attrs[attribute].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+# Writes to these bump the owner's data version without touching the aggregates
+_VERSIONED_ONLY = (FormVersion, FormDocument, ChatMessage)
+_TRACKED = (Form, FormAnalysis, File, ChatSession) + _VERSIONED_ONLY
+
+def _owner(session: Session, obj: Any) -> Optional[str]:
+    if isinstance(obj, (Form, ChatSession)):
+        return obj.user_id
+    if isinstance(obj, File):
+        return obj.uploaded_by
+    if isinstance(obj, ChatMessage):
+        chat = session.get(ChatSession, obj.session_id)
+        return chat.user_id if chat is not None else None
+    form = session.get(Form, obj.form_id)
+    return form.user_id if form is not None else None
+
+def data_owners(session: Session) -> Set[str]:
+    """
+    Users whose data version the pending flush changes.
+    """
+    owners = set()
+    for changed in (session.new, session.dirty, session.deleted):
+        for obj in changed:
+            if isinstance(obj, _TRACKED):
+                owners.add(_owner(session, obj))
+    owners.discard(None)
+    return owners
+
+def _collect(session: Session) -> Dict[str, _RollupDelta]:
+    deltas: Dict[str, _RollupDelta] = defaultdict(_RollupDelta)
+
+    for obj in session.new:
+        if not isinstance(obj, _TRACKED):
+            continue
+        owner = _owner(session, obj)
+        if not owner:
+            continue
+        delta = deltas[owner]
+        if isinstance(obj, Form):
+            delta.add_form(obj.status, obj.completion_percentage, +1)
+        elif isinstance(obj, FormAnalysis):
+            delta.analyses.append(_analysis_entry(obj))
+            if obj.compliance_score is not None:
+                delta.scores.append((obj.created_at.date().isoformat(), obj.compliance_score))
+        elif isinstance(obj, File):
+            delta.files.append(_file_entry(obj))
+        elif isinstance(obj, ChatSession):
+            if obj.status == "active":
+                delta.active_chats += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, _TRACKED) or not session.is_modified(obj):
+            continue
+        owner = _owner(session, obj)
+        if not owner:
+            continue
+        delta = deltas[owner]
+        if isinstance(obj, Form):
+            status, completion = _history(obj, "status"), _history(obj, "completion_percentage")
+            if status or completion:
+                old_status = status[0] if status else obj.status
+                old_completion = completion[0] if completion else obj.completion_percentage
+                delta.add_form(old_status, old_completion, -1)
+                delta.add_form(obj.status, obj.completion_percentage, +1)
+        elif isinstance(obj, FormAnalysis):
+            if any(_history(obj, name) for name in ("compliance_score", "analysis_type")):
+                delta.needs_rebuild = True
+        elif isinstance(obj, File):
+            if any(_history(obj, name) for name in ("filename", "processing_status")):
+                delta.needs_rebuild = True
+        elif isinstance(obj, ChatSession):
+            status = _history(obj, "status")
+            if status:
+                delta.active_chats += (status[1] == "active") - (status[0] == "active")
+
+    for obj in session.deleted:
+        if not isinstance(obj, _TRACKED):
+            continue
+        owner = _owner(session, obj)
+        if not owner:
+            continue
+        delta = deltas[owner]
+        if isinstance(obj, (Form, FormAnalysis, File)):
+            # Recent lists can't be unwound, and a form's chat sessions go by ON DELETE CASCADE unseen
+            delta.needs_rebuild = True
+        elif isinstance(obj, ChatSession):
+            if obj.status == "active":
+                delta.active_chats -= 1
+    return deltas
+
+def _rebuild(session: Session, scope: str, scope_id: str) -> None:
+    # From the flushed state, which already includes the pending changes
+    rollup = rebuild_rollup(session, scope, scope_id)
+    rollup.version += 1
+
+def _apply_delta(session: Session, scope: str, scope_id: str, delta: _RollupDelta) -> None:
+    if delta.needs_rebuild:
+        _rebuild(session, scope, scope_id)
+        return
+    # Counters move in one atomic UPDATE, so concurrent writers never read-modify-write them
+    result = session.execute(
+        update(AnalyticsRollup)
+        .where(AnalyticsRollup.scope == scope, AnalyticsRollup.scope_id == scope_id)
+        .values(**delta.counter_values())
+    )
+    if result.rowcount == 0:
+        _rebuild(session, scope, scope_id)
+    elif delta.touches_documents:
+        rollup = session.get(AnalyticsRollup, (scope, scope_id), with_for_update=True, populate_existing=True)
+        delta.apply_documents(rollup)
+
+@event.listens_for(Session, "after_flush")
+def collect_rollup_deltas(session: Session, flush_context) -> None:
+    # Attribute history is only available here; the rollups are written before commit
+    if not any(isinstance(obj, _TRACKED) for changed in (session.new, session.dirty, session.deleted) for obj in changed):
+        return
+    # One delta per owner however many times the transaction flushes
+    pending = session.info.setdefault("rollup_deltas", defaultdict(_RollupDelta))
+    for owner, delta in _collect(session).items():
+        pending[owner].merge(delta)
+
+@event.listens_for(Session, "before_commit")
+def update_rollups(session: Session) -> None:
+    # Flushed first so the last changes are collected too. Until here a transaction holds no
+    # rollup locks, e.g. while a chat turn waits on the model after creating its session.
+    session.flush()
+    pending = session.info.pop("rollup_deltas", None)
+    for user_id, delta in (pending or {}).items():
+        _apply_delta(session, "user", user_id, delta)
+        user = session.get(User, user_id)
+        if user is not None and user.company_name:
+            _apply_delta(session, "company", user.company_name, delta)
+
+@event.listens_for(Session, "after_rollback")
+def discard_rollup_deltas(session: Session) -> None:
+    session.info.pop("rollup_deltas", None)
+
+async def get_rollup(db, scope: str, scope_id: str) -> AnalyticsRollup:
+    """
+    Primary-key read of a rollup, building it on first access.
+    """
+    rollup = await db.get(AnalyticsRollup, (scope, scope_id))
+    if rollup is None:
+        if db.info.get("read_only"):
+            # Replicas can't store it; the next primary read will
+            return await db.run_sync(rebuild_rollup, scope, scope_id, False)
+        rollup = await db.run_sync(rebuild_rollup, scope, scope_id)
+        await db.commit()
+    return rollup
+
+async def get_data_version(db, scope: str, scope_id: str) -> int:
+    """
+    The rollup's version counter alone; it changes on every write to the scope's
+    forms, files and chats, so response caches can be validated without loading data.
+    """
+    version = await db.scalar(select(AnalyticsRollup.version).where(
+        AnalyticsRollup.scope == scope, AnalyticsRollup.scope_id == scope_id
+    ))
+    if version is None:
+        version = (await get_rollup(db, scope, scope_id)).version
+    return version
+
+def rollup_summary(rollup: AnalyticsRollup) -> Dict[str, Any]:
+    cutoff = _trend_cutoff()
+    return {
+        "total_forms": rollup.total_forms,
+        "forms_by_status": rollup.forms_by_status,
+        "average_completion": round(
+            rollup.completion_sum / rollup.completion_count if rollup.completion_count else 0, 2
+        ),
+        "recent_analyses": rollup.recent_analyses,
+        "active_chats": rollup.active_chats,
+        "recent_files": rollup.recent_files,
+        "compliance_trend": [
+            {"date": day, "score": round(score_sum / count, 2)}
+            for day, (score_sum, count) in sorted(rollup.compliance_daily.items())
+            if day >= cutoff and count
+        ],
+    }
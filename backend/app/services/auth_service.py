@@ -1,27 +1,30 @@
 from datetime import timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin
-from app.core.security import (
-    get_password_hash, verify_password, create_access_token, create_refresh_token, validate_password_strength
-)
+from app.core.security import create_access_token, create_refresh_token, validate_password_strength
 from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.core.principals import principal_cache
 
 class AuthService:
     @staticmethod
-    def register_user(db: Session, user_in: UserCreate) -> User:
+    async def register_user(db: AsyncSession, user_in: UserCreate) -> User:
         # Check if user already exists
-        user = db.query(User).filter(User.email == user_in.email).first()
+        user = (await db.execute(select(User).where(User.email == user_in.email))).scalar_one_or_none()
         if user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="The user with this email already exists in the system."
             )
         validate_password_strength(user_in.password)
+        # bcrypt is CPU-bound; it runs on the hasher's own pool, off the event loop
+        password_hash = await password_hasher.hash(user_in.password)
         user = User(
             email=user_in.email,
-            password_hash=get_password_hash(user_in.password),
+            password_hash=password_hash,
             company_name=user_in.company_name,
             first_name=user_in.first_name,
             last_name=user_in.last_name,
@@ -29,45 +32,70 @@ class AuthService:
             employee_count=user_in.employee_count,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     @staticmethod
-    def authenticate_user(db: Session, user_in: UserLogin) -> User:
-        user = db.query(User).filter(User.email == user_in.email).first()
-        if not user or not verify_password(user_in.password, user.password_hash):
+    async def authenticate_user(db: AsyncSession, user_in: UserLogin) -> User:
+        user = (await db.execute(select(User).where(User.email == user_in.email))).scalar_one_or_none()
+        valid, new_hash = (
+            await password_hasher.verify_and_update(user_in.password, user.password_hash) if user else (False, None)
+        )
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password."
             )
+        if new_hash:
+            # Stored with an older cost; upgrade it while the plaintext is at hand
+            user.password_hash = new_hash
+            await db.commit()
         return user
 
     @staticmethod
     def create_tokens(user: User):
         access_token = create_access_token(
             subject=user.id,
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            token_version=user.token_version,
         )
         refresh_token = create_refresh_token(
-            subject=user.id
+            subject=user.id,
+            token_version=user.token_version,
         )
         return access_token, refresh_token
 
     @staticmethod
-    def get_user_profile(db: Session, user_id: str) -> User:
-        user = db.query(User).filter(User.id == user_id).first()
+    async def get_user_profile(db: AsyncSession, user_id: str) -> User:
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found.")
         return user
 
     @staticmethod
-    def update_user_profile(db: Session, user_id: str, update_data: dict) -> User:
-        user = db.query(User).filter(User.id == user_id).first()
+    async def update_user_profile(db: AsyncSession, user_id: str, update_data: dict) -> User:
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found.")
         for field, value in update_data.items():
             setattr(user, field, value)
-        db.commit()
-        db.refresh(user)
-        return user 
\ No newline at end of file
+        await db.commit()
+        await db.refresh(user)
+        await principal_cache.invalidate(user.id, user.token_version)
+        return user
+
+    @staticmethod
+    async def deactivate_user(db: AsyncSession, user_id: str) -> User:
+        """
+        Deactivate the user and revoke every token issued to them so far.
+        """
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found.")
+        previous_version = user.token_version
+        user.is_active = False
+        user.token_version = previous_version + 1
+        await db.commit()
+        await principal_cache.invalidate(user.id, previous_version, user.token_version)
+        return user
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import os
+import uuid
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.file import Blob
+
+logger = logging.getLogger(__name__)
+
+class BlobStore:
+    """
+    Content-addressed upload storage: each distinct content is written once, to
+    `root/ab/cd/<sha256>`, and the blobs table counts the files rows using it.
+    Storing content that is already there costs a hash and a stat; the file is
+    removed when the last row referencing it is released.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def _write(self, digest: str, content: bytes) -> None:
+        path = self.path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so a reader never sees a partial blob
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            with open(partial, "wb") as out:
+                out.write(content)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _hash_and_write(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        self._write(digest, content)
+        return digest
+
+    async def store(self, db: AsyncSession, content: bytes) -> str:
+        """
+        Write `content` if it's new and take a reference to it in the session's
+        transaction; returns its sha256. Call `ensure` once that transaction commits.
+        """
+        digest = await run_in_threadpool(self._hash_and_write, content)
+        result = await db.execute(
+            update(Blob).where(Blob.sha256 == digest).values(ref_count=Blob.ref_count + 1)
+        )
+        if result.rowcount == 0:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(Blob).values(sha256=digest, size=len(content), ref_count=1))
+            except IntegrityError:
+                # A concurrent upload of the same content inserted it first
+                await db.execute(
+                    update(Blob).where(Blob.sha256 == digest).values(ref_count=Blob.ref_count + 1)
+                )
+        return digest
+
+    async def ensure(self, digest: str, content: bytes) -> None:
+        # A delete of the last other reference may have removed the file after we checked for it
+        if not os.path.exists(self.path(digest)):
+            await run_in_threadpool(self._write, digest, content)
+
+    async def release(self, db: AsyncSession, digest: str) -> bool:
+        """
+        Drop a reference in the session's transaction; True when it was the last one,
+        in which case call `discard` once that transaction commits.
+        """
+        await db.execute(
+            update(Blob).where(Blob.sha256 == digest).values(ref_count=Blob.ref_count - 1)
+        )
+        result = await db.execute(delete(Blob).where(Blob.sha256 == digest, Blob.ref_count <= 0))
+        return result.rowcount > 0
+
+    async def discard(self, db: AsyncSession, digest: str) -> None:
+        """
+        Remove an unreferenced blob's file, unless an upload has referenced it again.
+        """
+        path = self.path(digest)
+        doomed = f"{path}.{uuid.uuid4().hex}.deleted"
+        try:
+            os.replace(path, doomed)
+        except FileNotFoundError:
+            return
+        # Moved aside before checking: a later upload's `ensure` sees it missing and rewrites it
+        if await db.scalar(select(Blob.sha256).where(Blob.sha256 == digest)) is not None:
+            os.replace(doomed, path)
+        else:
+            os.remove(doomed)
+
+blob_store = BlobStore(settings.UPLOAD_DIR)
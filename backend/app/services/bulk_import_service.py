@@ -0,0 +1,161 @@
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.form import Form
+from app.schemas.form import (
+    BulkItemResult,
+    BulkResult,
+    FormBulkUpdate,
+    FormCreate,
+    FormVersionBulkCreate,
+)
+from app.services.form_version_service import FormVersionService
+
+logger = logging.getLogger(__name__)
+
+# (position in the request, decoded JSON item); undecodable NDJSON lines arrive as a ValueError
+BulkItem = Tuple[int, Any]
+
+async def _chunks(items: AsyncIterator[BulkItem], size: int) -> AsyncIterator[List[BulkItem]]:
+    chunk: List[BulkItem] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _validate(model: Any, raw: Any) -> Any:
+    if isinstance(raw, ValueError):
+        raise raw
+    return model.model_validate(raw)
+
+class _Results:
+    def __init__(self):
+        self.result = BulkResult()
+
+    def fail(self, index: int, error: Any) -> None:
+        self.result.failed += 1
+        self.result.results.append(BulkItemResult(index=index, status="error", error=error))
+
+    def invalid(self, index: int, exc: Exception) -> None:
+        if isinstance(exc, ValidationError):
+            self.fail(index, exc.errors(include_url=False, include_context=False))
+        else:
+            self.fail(index, str(exc))
+
+    async def commit(self, db: AsyncSession, pending: List[Tuple[int, str, Any]]) -> None:
+        """
+        Commit one chunk; on failure the whole chunk is rolled back and reported.
+        """
+        if not pending:
+            return
+        try:
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+            logger.exception("Bulk import chunk of %d items failed", len(pending))
+            for index, _, _ in pending:
+                self.fail(index, "Database error; this item's batch was rolled back")
+            return
+        for index, status, obj in pending:
+            setattr(self.result, status, getattr(self.result, status) + 1)
+            self.result.results.append(BulkItemResult(index=index, status=status, id=obj.id))
+
+    def finish(self) -> BulkResult:
+        self.result.results.sort(key=lambda item: item.index)
+        return self.result
+
+class BulkImportService:
+    @staticmethod
+    async def import_forms(db: AsyncSession, user_id: str, items: AsyncIterator[BulkItem]) -> BulkResult:
+        """
+        Create forms (items without "id") and update existing ones (items with "id"),
+        BULK_CHUNK_SIZE at a time: each chunk is validated, loads its updated forms in
+        one select, and is written by a single flush and commit, which the unit of work
+        sends as batched multi-row INSERT/UPDATE statements.
+        """
+        results = _Results()
+        async for chunk in _chunks(items, settings.BULK_CHUNK_SIZE):
+            creates, updates = [], []
+            for index, raw in chunk:
+                try:
+                    if isinstance(raw, dict) and "id" in raw:
+                        updates.append((index, _validate(FormBulkUpdate, raw)))
+                    else:
+                        creates.append((index, _validate(FormCreate, raw)))
+                except (ValidationError, ValueError) as exc:
+                    results.invalid(index, exc)
+
+            existing: Dict[str, Form] = {}
+            if updates:
+                existing = {form.id: form for form in (await db.execute(
+                    select(Form).where(Form.id.in_({item.id for _, item in updates}), Form.user_id == user_id)
+                )).scalars()}
+
+            pending = []
+            for index, item in creates:
+                form = Form(user_id=user_id, **item.dict())
+                db.add(form)
+                pending.append((index, "created", form))
+            for index, item in updates:
+                form = existing.get(item.id)
+                if form is None:
+                    results.fail(index, "Form not found")
+                    continue
+                for field, value in item.dict(exclude_unset=True, exclude={"id"}).items():
+                    setattr(form, field, value)
+                pending.append((index, "updated", form))
+            await results.commit(db, pending)
+        return results.finish()
+
+    @staticmethod
+    async def import_versions(db: AsyncSession, user_id: str, items: AsyncIterator[BulkItem]) -> BulkResult:
+        """
+        Append versions to the user's forms, BULK_CHUNK_SIZE at a time. Versions for one
+        form are applied in submission order against a chain loaded once per form and chunk.
+        """
+        results = _Results()
+        async for chunk in _chunks(items, settings.BULK_CHUNK_SIZE):
+            by_form: Dict[str, List[Tuple[int, FormVersionBulkCreate]]] = defaultdict(list)
+            for index, raw in chunk:
+                try:
+                    item = _validate(FormVersionBulkCreate, raw)
+                except (ValidationError, ValueError) as exc:
+                    results.invalid(index, exc)
+                    continue
+                by_form[item.form_id].append((index, item))
+
+            owned = set((await db.execute(
+                select(Form.id).where(Form.id.in_(by_form), Form.user_id == user_id)
+            )).scalars()) if by_form else set()
+
+            pending = []
+            # Forms are locked in id order, so concurrent imports can't deadlock on each other
+            for form_id, entries in sorted(by_form.items()):
+                if form_id not in owned:
+                    for index, _ in entries:
+                        results.fail(index, "Form not found")
+                    continue
+                latest = await FormVersionService.lock_chain(db, form_id)
+                accepted = []
+                for index, item in entries:
+                    if latest is not None and item.version_number <= latest:
+                        results.fail(index, f"Version number must be greater than {latest}")
+                        continue
+                    latest = item.version_number
+                    accepted.append((index, item))
+                versions = await FormVersionService.create_many(
+                    db, form_id, user_id, [item.dict(exclude={"form_id"}) for _, item in accepted]
+                )
+                pending.extend((index, "created", version) for (index, _), version in zip(accepted, versions))
+            await results.commit(db, pending)
+        return results.finish()
@@ -0,0 +1,148 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.chat import ChatSession, ChatMessage
+from app.models.form import Form
+
+FORM_CHAT_SOURCE = "form_chat"
+
+class ChatService:
+    @staticmethod
+    async def get_or_create_form_session(db: AsyncSession, form: Form, user_id: str) -> ChatSession:
+        """
+        Return the active chat session backing the form chat flow, creating it
+        (and moving any conversation still stored inline in form.content) if needed.
+        """
+        session = (await db.execute(
+            select(ChatSession).where(
+                ChatSession.form_id == form.id,
+                ChatSession.user_id == user_id,
+                ChatSession.status == "active",
+            ).order_by(ChatSession.created_at.desc()).limit(1)
+        )).scalar_one_or_none()
+        if session:
+            return session
+
+        # Id assigned here rather than by a flush: the chat turn calls the model before it
+        # commits, and nothing should be written (or locked) while that call runs
+        session = ChatSession(
+            id=str(uuid.uuid4()),
+            form_id=form.id,
+            user_id=user_id,
+            context={"source": FORM_CHAT_SOURCE},
+            model_used=settings.OPENROUTER_MODEL,
+        )
+        db.add(session)
+
+        # Older forms kept the whole conversation in form.content; move it to rows once
+        legacy_conversation = (form.content or {}).get("conversation") or []
+        if legacy_conversation:
+            started_at = datetime.utcnow() - timedelta(microseconds=len(legacy_conversation))
+            db.add_all([
+                ChatMessage(
+                    session_id=session.id,
+                    role=msg.get("role", "user"),
+                    content=msg.get("content", ""),
+                    created_at=started_at + timedelta(microseconds=i),
+                )
+                for i, msg in enumerate(legacy_conversation)
+            ])
+            content = dict(form.content)
+            content.pop("conversation", None)
+            form.content = content
+            db.add(form)
+            # One-off, so the history below can be read back from rows
+            await db.flush()
+        return session
+
+    @staticmethod
+    async def load_recent_messages(
+        db: AsyncSession, session_id: str, limit: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Load the most recent `limit` messages of a session, oldest first, in the
+        {"role", "content"} shape expected by the chat completions API.
+        """
+        limit = limit or settings.CHAT_HISTORY_WINDOW
+        rows = (await db.execute(
+            select(ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(limit)
+        )).all()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    @staticmethod
+    def append_turn(
+        db: AsyncSession,
+        session: ChatSession,
+        user_message: str,
+        ai_response: str,
+        received_at: datetime,
+        form_updates: Optional[Dict[str, Any]] = None,
+    ) -> ChatMessage:
+        """
+        Append one user/assistant exchange to the session. Only the two new rows
+        are written, regardless of how long the conversation already is.
+        """
+        user_row = ChatMessage(
+            session_id=session.id,
+            role="user",
+            content=user_message,
+            created_at=received_at,
+        )
+        assistant_row = ChatMessage(
+            session_id=session.id,
+            role="assistant",
+            content=ai_response,
+            form_updates=form_updates,
+            created_at=max(datetime.utcnow(), received_at + timedelta(microseconds=1)),
+        )
+        db.add_all([user_row, assistant_row])
+        return assistant_row
+
+    @staticmethod
+    async def close_form_sessions(db: AsyncSession, form_id: str, user_id: str) -> None:
+        """
+        Complete the form's active chat sessions, so the next turn starts a new one
+        (e.g. after a new PDF replaces the one the conversation was about).
+        """
+        sessions = (await db.execute(
+            select(ChatSession).where(
+                ChatSession.form_id == form_id,
+                ChatSession.user_id == user_id,
+                ChatSession.status == "active",
+            )
+        )).scalars().all()
+        for session in sessions:
+            session.status = "completed"
+            session.completed_at = datetime.utcnow()
+
+    @staticmethod
+    async def form_has_messages(db: AsyncSession, form_id: str) -> bool:
+        # Only the current conversation; completed sessions belong to earlier uploads
+        return (await db.execute(
+            select(ChatMessage.id).join(ChatSession).where(
+                ChatSession.form_id == form_id, ChatSession.status == "active"
+            ).limit(1)
+        )).first() is not None
+
+    @staticmethod
+    async def load_form_conversation(db: AsyncSession, form_id: str, user_id: str) -> List[Dict[str, str]]:
+        """
+        The form's current conversation, for exports; like `form_has_messages` it
+        leaves out the completed sessions of earlier uploads.
+        """
+        rows = (await db.execute(
+            select(ChatMessage.role, ChatMessage.content).join(ChatSession).where(
+                ChatSession.form_id == form_id,
+                ChatSession.user_id == user_id,
+                ChatSession.status == "active",
+            ).order_by(ChatMessage.created_at, ChatMessage.id)
+        )).all()
+        return [{"role": role, "content": content} for role, content in rows]
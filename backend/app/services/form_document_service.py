@@ -0,0 +1,25 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.form import FormDocument
+
+class FormDocumentService:
+    @staticmethod
+    async def get(db: AsyncSession, form_id: str) -> Optional[FormDocument]:
+        return await db.get(FormDocument, form_id)
+
+    @staticmethod
+    async def save_text(db: AsyncSession, form_id: str, filename: str, text: str) -> FormDocument:
+        """
+        Store the extracted text for a form, replacing any previous upload and
+        dropping the opening turn precomputed from it.
+        """
+        document = await db.get(FormDocument, form_id)
+        if document is None:
+            document = FormDocument(form_id=form_id)
+        document.filename = filename
+        document.text = text
+        document.opening_turn = None
+        db.add(document)
+        return document
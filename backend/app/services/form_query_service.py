@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import exists, literal, select
+
+from app.db.types import json_contains, json_each, json_text
+from app.models.form import Form
+from app.services.osha_fields import coerce_value, field_type
+
+FIELD_OPS = ("eq", "exists", "missing")
+
+def _bad_filter(spec: str, reason: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid field filter {spec!r}: {reason}"
+    )
+
+def _nest(path: Sequence[str], array_at: Optional[int], value: Any) -> Dict[str, Any]:
+    """{"a": {"b": [{"c": value}]}} for path a.b[].c: the JSONB containment document."""
+    document = value
+    for i in range(len(path) - 1, -1, -1):
+        if i == array_at:
+            document = [document]
+        document = {path[i]: document}
+    return document
+
+class FormQueryService:
+    @staticmethod
+    def parse(spec: str) -> Tuple[List[str], Optional[int], str, Optional[str]]:
+        """
+        Split a `path:op[:value]` filter. Paths are dotted and relative to
+        filled_fields; `[]` marks an array whose elements are matched individually,
+        e.g. `osha_300.cases[].employee_name:eq:Jane Doe` or `osha_300a.total_hours_worked:missing`.
+        """
+        raw_path, _, rest = spec.partition(":")
+        op, _, value = rest.partition(":")
+        if op not in FIELD_OPS:
+            raise _bad_filter(spec, f"op must be one of {', '.join(FIELD_OPS)}")
+        path, array_at = [], None
+        for segment in raw_path.split("."):
+            if segment.endswith("[]"):
+                if array_at is not None:
+                    raise _bad_filter(spec, "only one [] segment is supported")
+                array_at = len(path)
+                segment = segment[:-2]
+            path.append(segment)
+        if field_type(path) is None:
+            raise _bad_filter(spec, "unknown field")
+        if op == "eq" and not value:
+            raise _bad_filter(spec, "eq needs a value")
+        if op != "eq" and array_at is not None:
+            raise _bad_filter(spec, f"{op} can't look inside arrays")
+        return path, array_at, op, value or None
+
+    @staticmethod
+    def field_filter(spec: str, dialect: str) -> Any:
+        """
+        WHERE clause for one filter against Form.content["filled_fields"]. On Postgres
+        eq is a JSONB containment test (GIN index); elsewhere it falls back to json_extract,
+        through json_each for array paths.
+        """
+        path, array_at, op, value = FormQueryService.parse(spec)
+        if op == "eq":
+            ok, value = coerce_value(value, field_type(path))
+            if not ok:
+                raise _bad_filter(spec, "value doesn't match the field's type")
+            if dialect == "postgresql":
+                return json_contains(Form.content, {"filled_fields": _nest(path, array_at, value)})
+            # json_extract yields 1/0 for JSON booleans
+            target = literal(value) if isinstance(value, bool) else value
+            if array_at is None:
+                return json_text(Form.content, ("filled_fields", *path), dialect) == target
+            elements = json_each(Form.content, ("filled_fields", *path[:array_at + 1]))
+            return exists(select(1).select_from(elements).where(
+                json_text(elements.c.value, path[array_at + 1:], dialect) == target
+            ))
+
+        text = json_text(Form.content, ("filled_fields", *path), dialect)
+        return text != "" if op == "exists" else text == ""
+
+    @staticmethod
+    def field_filters(specs: Sequence[str], dialect: str) -> List[Any]:
+        return [FormQueryService.field_filter(spec, dialect) for spec in specs]
@@ -0,0 +1,160 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.json_patch import apply_patch, make_patch
+from app.models.form import Form, FormVersion
+
+def _chain_order(version: FormVersion):
+    return (version.version_number, version.created_at, version.id)
+
+def _replay(chain: Iterable[FormVersion]) -> Optional[Dict[str, Any]]:
+    """
+    Walk a chain that starts at a snapshot, filling in each version's content.
+    """
+    content = None
+    for version in chain:
+        content = version.snapshot if version.is_snapshot else apply_patch(content, version.delta)
+        version.content = content
+    return content
+
+class FormVersionService:
+    @staticmethod
+    async def lock_chain(db: AsyncSession, form_id: str) -> Optional[int]:
+        """
+        Lock the form's row until the transaction ends, so appends to its chain run
+        one at a time and each builds on the previous one's version; returns the
+        form's latest version number. New versions must be numbered above it: each
+        delta is a patch against the version before it, so inserting one earlier in
+        the chain would change what the later ones replay to.
+        """
+        await db.execute(select(Form.id).where(Form.id == form_id).with_for_update())
+        return await db.scalar(
+            select(func.max(FormVersion.version_number)).where(FormVersion.form_id == form_id)
+        )
+
+    @staticmethod
+    async def _load_chain(
+        db: AsyncSession, form_id: str, version_number: Optional[int] = None
+    ) -> List[FormVersion]:
+        """
+        The latest snapshot at or below `version_number` (or overall) plus the
+        deltas written after it: at most FORM_VERSION_SNAPSHOT_INTERVAL rows.
+        """
+        bounded = (FormVersion.form_id == form_id,)
+        if version_number is not None:
+            bounded += (FormVersion.version_number <= version_number,)
+        order = (FormVersion.version_number, FormVersion.created_at, FormVersion.id)
+        base = (await db.execute(
+            select(FormVersion)
+            .where(*bounded, FormVersion.is_snapshot.is_(True))
+            .order_by(*(column.desc() for column in order))
+            .limit(1)
+        )).scalar_one_or_none()
+        if base is None:
+            return []
+        deltas = (await db.execute(
+            select(FormVersion)
+            .where(*bounded, tuple_(*order) > tuple_(*_chain_order(base)))
+            .order_by(*order)
+        )).scalars().all()
+        return [base, *deltas]
+
+    @staticmethod
+    def _next(
+        chain: List[FormVersion],
+        form_id: str,
+        created_by: str,
+        version_number: int,
+        content: Dict[str, Any],
+        changes_description: Optional[str] = None,
+    ) -> FormVersion:
+        """
+        Build the version that follows `chain` (already replayed) and extend the chain
+        with it: a patch against the latest version unless a snapshot is due or the
+        patch isn't smaller.
+        """
+        version = FormVersion(
+            form_id=form_id,
+            created_by=created_by,
+            version_number=version_number,
+            changes_description=changes_description,
+        )
+        if chain and len(chain) < settings.FORM_VERSION_SNAPSHOT_INTERVAL:
+            patch = make_patch(chain[-1].content, content)
+            if len(json.dumps(patch)) < len(json.dumps(content)):
+                version.is_snapshot = False
+                version.delta = patch
+        if version.delta is None:
+            version.is_snapshot = True
+            version.snapshot = content
+            chain.clear()
+        version.content = content
+        chain.append(version)
+        return version
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        form_id: str,
+        created_by: str,
+        version_number: int,
+        content: Dict[str, Any],
+        changes_description: Optional[str] = None,
+    ) -> FormVersion:
+        """
+        Add a version, stored as a patch against the current latest version where that's smaller.
+        """
+        latest = await FormVersionService.lock_chain(db, form_id)
+        if latest is not None and version_number <= latest:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Version number must be greater than {latest}",
+            )
+        chain = await FormVersionService._load_chain(db, form_id)
+        _replay(chain)
+        version = FormVersionService._next(
+            chain, form_id, created_by, version_number, content, changes_description
+        )
+        db.add(version)
+        return version
+
+    @staticmethod
+    async def create_many(
+        db: AsyncSession, form_id: str, created_by: str, versions: List[Dict[str, Any]]
+    ) -> List[FormVersion]:
+        """
+        Add several versions to one form in order, loading its chain once. Take
+        `lock_chain` first and pass only increasing numbers above the latest.
+        """
+        chain = await FormVersionService._load_chain(db, form_id)
+        _replay(chain)
+        created = [
+            FormVersionService._next(chain, form_id, created_by, **version) for version in versions
+        ]
+        db.add_all(created)
+        return created
+
+    @staticmethod
+    async def get_at(db: AsyncSession, form_id: str, version_number: int) -> Optional[FormVersion]:
+        """
+        Reconstruct the form's content as of `version_number`.
+        """
+        chain = await FormVersionService._load_chain(db, form_id, version_number)
+        if not chain or chain[-1].version_number != version_number:
+            return None
+        _replay(chain)
+        return chain[-1]
+
+    @staticmethod
+    def materialize(versions: Iterable[FormVersion]) -> List[FormVersion]:
+        """
+        Fill in content for a form's full, already loaded version list.
+        """
+        versions = sorted(versions, key=_chain_order)
+        _replay(versions)
+        return versions
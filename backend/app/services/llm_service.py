@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.metrics_service import estimate_cost, llm_metrics
+
+if TYPE_CHECKING:
+    import requests
+
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Bounds concurrent completions; time spent waiting here is reported as queue wait
+_llm_slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+
+def _stream_completion(response: "requests.Response", timings: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Read an OpenRouter server-sent event stream into the non-streaming
+    chat completions shape, noting when the first content token arrived.
+    """
+    response.encoding = "utf-8"
+    content_parts: List[str] = []
+    usage: Dict[str, Any] = {}
+    for line in response.iter_lines(decode_unicode=True):
+        # Blank lines separate events; lines starting with ':' are keep-alive comments
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        chunk = json.loads(data)
+        if "error" in chunk:
+            return {"error": chunk["error"]}
+        if chunk.get("usage"):
+            usage = chunk["usage"]
+        for choice in chunk.get("choices", []):
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                timings.setdefault("first_token", time.perf_counter())
+                content_parts.append(delta)
+    return {
+        "choices": [{"message": {"role": "assistant", "content": "".join(content_parts)}}],
+        "usage": usage,
+    }
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    *,
+    operation: str,
+    form_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    model: Optional[str] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Run a chat completion through OpenRouter and record queue wait,
+    time-to-first-token, latency, token usage and cost for the call.
+    Returns the parsed response, or a dict with an "error" key.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        # Checked per call rather than at import, so workers boot without the key
+        return {"error": {"message": "OPENROUTER_API_KEY is not set"}}
+    # The HTTP client is only loaded by the first completion, keeping it out of worker startup
+    import requests
+
+    model = model or settings.OPENROUTER_MODEL
+    timings = {"queued": time.perf_counter()}
+    resp_json: Dict[str, Any] = {"error": "request failed"}
+    try:
+        with _llm_slots:
+            timings["started"] = time.perf_counter()
+            response = requests.post(
+                OPENROUTER_CHAT_URL,
+                headers={"Authorization": f"Bearer {settings.OPENROUTER_API_KEY}"},
+                json={
+                    "model": model,
+                    "messages": messages,
+                    "stream": True,
+                    "usage": {"include": True},
+                    **options,
+                },
+                stream=True,
+            )
+            if response.status_code == 200:
+                resp_json = _stream_completion(response, timings)
+            else:
+                resp_json = response.json()
+            timings["finished"] = time.perf_counter()
+    finally:
+        finished = timings.get("finished") or time.perf_counter()
+        started = timings.get("started", finished)
+        first_token = timings.get("first_token")
+        usage = resp_json.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        cost = usage.get("cost")
+        if cost is None:
+            cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        llm_metrics.record(
+            form_id=form_id,
+            user_id=user_id,
+            model=model,
+            operation=operation,
+            status="ok" if "choices" in resp_json else "error",
+            queue_wait_ms=(started - timings["queued"]) * 1000,
+            ttft_ms=(first_token - started) * 1000 if first_token else None,
+            latency_ms=(finished - started) * 1000,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=cost,
+        )
+    return resp_json
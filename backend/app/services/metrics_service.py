@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.metrics import LLMCallMetric
+
+logger = logging.getLogger(__name__)
+
+class LLMMetricsRecorder:
+    """
+    Buffers per-call LLM metrics in memory and writes them with a single
+    multi-row insert once the batch is full or the flush interval has passed.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = None, flush_interval: float = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.LLM_METRICS_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.LLM_METRICS_FLUSH_SECONDS
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, **metric: Any) -> None:
+        metric.setdefault("id", str(uuid.uuid4()))
+        metric.setdefault("created_at", datetime.utcnow())
+        with self._lock:
+            self._buffer.append(metric)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        db = self.session_factory()
+        try:
+            db.execute(insert(LLMCallMetric), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to write %d LLM call metrics", len(rows))
+            return 0
+        finally:
+            db.close()
+        return len(rows)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+llm_metrics = LLMMetricsRecorder()
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = settings.LLM_PRICING_PER_MTOK.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
@@ -0,0 +1,186 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Field schema for filled_fields; see extract_fields in the forms endpoint for the layout
+OSHA_300_CASE_FIELDS: Dict[str, type] = {
+    "case_number": str,
+    "employee_name": str,
+    "job_title": str,
+    "injury_date": str,
+    "injury_location": str,
+    "description_of_injury": str,
+    "body_part_affected": str,
+    "object_substance": str,
+    "death": bool,
+    "days_away_from_work": bool,
+    "job_transfer_restriction": bool,
+    "other_recordable_cases": bool,
+    "days_away": str,
+    "days_restricted": str,
+    "injury_type": str,
+}
+
+OSHA_FIELD_SCHEMA: Dict[str, Dict[str, type]] = {
+    "osha_300": {
+        "establishment_name": str,
+        "city": str,
+        "state": str,
+        "year": str,
+    },
+    "osha_300a": {
+        field: str for field in (
+            "total_deaths", "total_days_away", "total_days_restricted", "total_cases_days_away",
+            "total_cases_job_transfer", "total_other_recordable_cases", "total_injuries",
+            "total_skin_disorders", "total_respiratory_conditions", "total_poisonings",
+            "total_hearing_loss", "total_other_illnesses", "establishment_name", "street", "city",
+            "state", "zip", "industry_description", "sic", "naics", "annual_avg_employees",
+            "total_hours_worked", "executive_name", "executive_title", "executive_phone",
+            "certification_date",
+        )
+    },
+    "osha_301": {
+        field: str for field in (
+            "employee_full_name", "employee_street", "employee_city", "employee_state",
+            "employee_zip", "employee_dob", "employee_date_hired", "employee_gender", "case_number",
+            "injury_date", "time_began_work", "time_of_event", "activity_before_incident",
+            "how_injury_occurred", "injury_or_illness", "object_that_harmed", "date_of_death",
+            "physician_name", "treatment_facility", "treatment_street", "treatment_city",
+            "treatment_state", "treatment_zip", "treated_in_er", "hospitalized_overnight",
+            "completed_by", "completed_by_title", "completed_by_phone", "completed_by_date",
+        )
+    },
+}
+
+STRUCTURED_OUTPUT_INSTRUCTIONS = f'''
+Output format: respond with one JSON object and nothing else:
+{{"reply": "<your message to the user>", "field_updates": {{...}}}}
+
+field_updates holds only values the user stated or that you can reliably infer from this turn or the form content, nested like "Current filled fields". Allowed keys:
+- osha_300: {", ".join(OSHA_FIELD_SCHEMA["osha_300"])}, cases (list of objects with: {", ".join(OSHA_300_CASE_FIELDS)})
+- osha_300a: {", ".join(OSHA_FIELD_SCHEMA["osha_300a"])}
+- osha_301: {", ".join(OSHA_FIELD_SCHEMA["osha_301"])}
+Use true/false for death, days_away_from_work, job_transfer_restriction and other_recordable_cases; strings everywhere else. Use {{}} when nothing changed.
+'''
+
+_TRUE_STRINGS = {"true", "yes", "y", "1"}
+_FALSE_STRINGS = {"false", "no", "n", "0"}
+
+def coerce_value(value: Any, expected: type) -> Tuple[bool, Any]:
+    if expected is bool:
+        if isinstance(value, bool):
+            return True, value
+        if isinstance(value, str) and value.strip().lower() in _TRUE_STRINGS | _FALSE_STRINGS:
+            return True, value.strip().lower() in _TRUE_STRINGS
+        return False, None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return False, None
+    value = str(value).strip()
+    return bool(value), value
+
+def field_type(path: Sequence[str]) -> Optional[type]:
+    """
+    Expected type of the filled_fields value at `path`, e.g. ("osha_300a", "city")
+    or ("osha_300", "cases", "death"); None for paths outside the schema.
+    """
+    if len(path) == 3 and tuple(path[:2]) == ("osha_300", "cases"):
+        return OSHA_300_CASE_FIELDS.get(path[2])
+    if len(path) == 2:
+        return OSHA_FIELD_SCHEMA.get(path[0], {}).get(path[1])
+    return None
+
+def _validate_section(updates: Any, schema: Dict[str, type], path: str, rejected: List[str]) -> Dict[str, Any]:
+    clean = {}
+    if not isinstance(updates, dict):
+        rejected.append(path)
+        return clean
+    for field, value in updates.items():
+        if field not in schema:
+            rejected.append(f"{path}.{field}")
+            continue
+        ok, coerced = coerce_value(value, schema[field])
+        if ok:
+            clean[field] = coerced
+        else:
+            rejected.append(f"{path}.{field}")
+    return clean
+
+def validate_field_updates(updates: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate a model-produced field patch against the OSHA field schema.
+    Returns the accepted updates and the dotted paths that were dropped.
+    """
+    rejected: List[str] = []
+    clean: Dict[str, Any] = {}
+    if not isinstance(updates, dict):
+        return clean, ["field_updates"] if updates else []
+    for section, section_updates in updates.items():
+        if section not in OSHA_FIELD_SCHEMA:
+            rejected.append(section)
+            continue
+        section_updates = dict(section_updates) if isinstance(section_updates, dict) else section_updates
+        cases = None
+        if section == "osha_300" and isinstance(section_updates, dict) and "cases" in section_updates:
+            raw_cases = section_updates.pop("cases")
+            if isinstance(raw_cases, list):
+                cases = [
+                    _validate_section(case, OSHA_300_CASE_FIELDS, f"osha_300.cases[{i}]", rejected)
+                    for i, case in enumerate(raw_cases)
+                ]
+            else:
+                rejected.append("osha_300.cases")
+        section_clean = _validate_section(section_updates, OSHA_FIELD_SCHEMA[section], section, rejected)
+        if cases and any(cases):
+            section_clean["cases"] = cases
+        if section_clean:
+            clean[section] = section_clean
+    return clean, rejected
+
+def merge_field_updates(filled_fields: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge validated updates into filled_fields. Cases are matched by
+    case_number when present, otherwise by position.
+    """
+    merged = {section: dict(values) for section, values in filled_fields.items()}
+    for section, values in updates.items():
+        target = merged.setdefault(section, {})
+        for field, value in values.items():
+            if field != "cases":
+                target[field] = value
+        if values.get("cases"):
+            cases = [dict(case) for case in target.get("cases", [])]
+            for i, case_update in enumerate(values["cases"]):
+                number = case_update.get("case_number")
+                index = next(
+                    (j for j, case in enumerate(cases) if number and case.get("case_number") == number),
+                    None,
+                )
+                if index is None and i < len(cases) and not (number and cases[i].get("case_number")):
+                    index = i
+                if index is None:
+                    cases.append(dict(case_update))
+                else:
+                    cases[index].update(case_update)
+            target["cases"] = cases
+    return merged
+
+def parse_structured_reply(content: str) -> Tuple[str, Any]:
+    """
+    Split a structured completion into (reply text, raw field_updates).
+    Falls back to treating the whole completion as the reply.
+    """
+    text = content.strip()
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+        except ValueError:
+            data = None
+    if not isinstance(data, dict) or not isinstance(data.get("reply"), str):
+        return content, {}
+    return data["reply"], data.get("field_updates") or {}
@@ -2,7 +2,6 @@ from fastapi import UploadFile
 from typing import Dict, Any, List
 from enum import Enum
 from pydantic import BaseModel
-import pdfplumber
 import re
 import os
 
@@ -52,6 +51,8 @@ async def upload_pdf(file: UploadFile, user_id: str) -> FormAnalysis:
 
 # 2. Extract text and fields
 async def extract_form_data(pdf_path: str) -> ExtractedData:
+    import pdfplumber
+
     with pdfplumber.open(pdf_path) as pdf:
         text = "\n".join(page.extract_text() or "" for page in pdf.pages)
     form_type = await detect_form_type(text)
@@ -104,6 +105,8 @@ async def process_pdf_from_path(pdf_path: str) -> str:
     Extract text content from a PDF file at the given path.
     Used for processing template files and existing PDFs.
     """
+    import pdfplumber
+
     try:
         with pdfplumber.open(pdf_path) as pdf:
             text = "\n".join(page.extract_text() or "" for page in pdf.pages)
@@ -0,0 +1,176 @@
+import html
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage, ChatSession
+from app.models.form import Form, FormDocument
+from app.models.search import SEARCH_CONFIG, SearchEntry, search_vector
+
+SNIPPET_START, SNIPPET_END = "<mark>", "</mark>"
+# The database wraps matches in these placeholders instead; the snippet is HTML-escaped
+# and only then do they become the tags, so indexed text can't inject markup
+_MATCH_START, _MATCH_END = "\ue000", "\ue001"
+
+# Free-text filled_fields worth searching, besides the form title
+CASE_TEXT_FIELDS = (
+    "employee_name", "job_title", "injury_location", "description_of_injury",
+    "body_part_affected", "object_substance", "injury_type",
+)
+REPORT_TEXT_FIELDS = (
+    "employee_full_name", "activity_before_incident", "how_injury_occurred",
+    "injury_or_illness", "object_that_harmed",
+)
+
+def form_text(form: Form) -> str:
+    """
+    The title plus the case descriptions from filled_fields, one per line.
+    """
+    fields = (form.content or {}).get("filled_fields") or {}
+    lines = [form.title or ""]
+    cases = (fields.get("osha_300") or {}).get("cases") or []
+    for case in cases if isinstance(cases, list) else []:
+        if isinstance(case, dict):
+            lines.append(" ".join(str(case[name]) for name in CASE_TEXT_FIELDS if case.get(name)))
+    report = fields.get("osha_301") or {}
+    if isinstance(report, dict):
+        lines.append(" ".join(str(report[name]) for name in REPORT_TEXT_FIELDS if report.get(name)))
+    return "\n".join(line for line in lines if line.strip())
+
+def _changed(obj: Any, *attributes: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+# Entries are replaced from the flush hooks, like the analytics rollups, so analyze,
+# chat and plain form edits all reindex inside their own transaction.
+
+@event.listens_for(Session, "after_flush")
+def collect_search_changes(session: Session, flush_context) -> None:
+    upserts: List[Tuple[str, str, str, str, str]] = []
+    removed: List[Tuple[str, str]] = []
+    removed_forms: List[str] = []
+
+    for obj in list(session.new) + [obj for obj in session.dirty if session.is_modified(obj)]:
+        if isinstance(obj, Form):
+            if obj in session.new or _changed(obj, "title", "content"):
+                upserts.append(("form", obj.id, obj.id, obj.user_id, form_text(obj)))
+        elif isinstance(obj, FormDocument):
+            if obj in session.new or _changed(obj, "text_compressed"):
+                form = session.get(Form, obj.form_id)
+                if form is not None:
+                    upserts.append(("document", obj.form_id, obj.form_id, form.user_id, obj.text))
+        elif isinstance(obj, ChatMessage) and obj in session.new:
+            chat = session.get(ChatSession, obj.session_id)
+            if chat is not None:
+                upserts.append(("chat", obj.id, chat.form_id, chat.user_id, obj.content))
+
+    for obj in session.deleted:
+        if isinstance(obj, Form):
+            removed_forms.append(obj.id)
+        elif isinstance(obj, FormDocument):
+            removed.append(("document", obj.form_id))
+        elif isinstance(obj, ChatMessage):
+            removed.append(("chat", obj.id))
+
+    if upserts or removed or removed_forms:
+        pending = session.info.setdefault("search_changes", ([], [], []))
+        pending[0].extend(upserts)
+        pending[1].extend(removed)
+        pending[2].extend(removed_forms)
+
+@event.listens_for(Session, "after_flush_postexec")
+def apply_search_changes(session: Session, flush_context) -> None:
+    pending = session.info.pop("search_changes", None)
+    if pending is None:
+        return
+    upserts, removed, removed_forms = pending
+    stale = defaultdict(set)
+    for source, source_id in removed:
+        stale[source].add(source_id)
+    for source, source_id, *_ in upserts:
+        # Chat entries are only ever inserted, for new messages
+        if source != "chat":
+            stale[source].add(source_id)
+    for source, source_ids in stale.items():
+        session.execute(delete(SearchEntry).where(SearchEntry.source == source, SearchEntry.source_id.in_(source_ids)))
+    if removed_forms:
+        session.execute(delete(SearchEntry).where(SearchEntry.form_id.in_(removed_forms)))
+    rows = [
+        {
+            "source": source, "source_id": source_id, "form_id": form_id, "user_id": user_id,
+            # So a highlight can only come from the database
+            "body": body.replace(_MATCH_START, "").replace(_MATCH_END, ""),
+        }
+        for source, source_id, form_id, user_id, body in upserts
+        if body and body.strip() and form_id not in removed_forms
+    ]
+    if rows:
+        session.execute(insert(SearchEntry), rows)
+
+def _highlight(snippet: str) -> str:
+    return html.escape(snippet).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can't hit FTS5 query syntax; terms are ANDed
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", query))
+
+_SQLITE_SEARCH = text(f"""
+    SELECT e.form_id, f.title, e.source, e.source_id,
+           snippet(search_entries_fts, 0, '{_MATCH_START}', '{_MATCH_END}', '…', 16) AS snippet,
+           -bm25(search_entries_fts) AS rank
+    FROM search_entries_fts
+    JOIN search_entries e ON e.id = search_entries_fts.rowid
+    JOIN forms f ON f.id = e.form_id
+    WHERE search_entries_fts MATCH :query AND e.user_id = :user_id
+    ORDER BY rank DESC
+    LIMIT :limit
+""")
+
+class SearchService:
+    @staticmethod
+    async def search(db: AsyncSession, user_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text matches across the user's forms, best first, each with a
+        highlighted snippet. Postgres uses websearch syntax ("quoted phrases", -exclude);
+        SQLite ANDs the words.
+        """
+        if db.bind.dialect.name == "postgresql":
+            config = literal_column(f"'{SEARCH_CONFIG}'")
+            tsquery = func.websearch_to_tsquery(config, query)
+            vector = search_vector(SearchEntry.body)
+            rank = func.ts_rank(vector, tsquery)
+            snippet = func.ts_headline(
+                config, SearchEntry.body, tsquery,
+                f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxWords=35, MinWords=15, MaxFragments=2",
+            )
+            statement = (
+                select(
+                    SearchEntry.form_id, Form.title, SearchEntry.source, SearchEntry.source_id,
+                    snippet.label("snippet"), rank.label("rank"),
+                )
+                .join(Form, Form.id == SearchEntry.form_id)
+                .where(SearchEntry.user_id == user_id, vector.op("@@")(tsquery))
+                .order_by(rank.desc())
+                .limit(limit)
+            )
+            rows = (await db.execute(statement)).all()
+        else:
+            terms = _fts5_query(query)
+            if not terms:
+                return []
+            rows = (await db.execute(_SQLITE_SEARCH, {"query": terms, "user_id": user_id, "limit": limit})).all()
+        return [
+            {
+                "form_id": form_id,
+                "form_title": title,
+                "source": source,
+                "source_id": source_id,
+                "snippet": _highlight(snippet),
+                "rank": float(rank),
+            }
+            for form_id, title, source, source_id, snippet, rank in rows
+        ]
@@ -0,0 +1,97 @@
+"""
+Login throughput benchmark: fires concurrent POST /auth/login requests at the app
+in-process (no network) against a scratch SQLite database, while probing a cheap
+endpoint to show how much a login burst slows everything else.
+
+    python scripts/bench_login.py --logins 200 --concurrency 50 --rounds 12 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+PASSWORD = "Bench-Passw0rd!"
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+async def bench(args):
+    import httpx
+
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/register", json={
+            "email": "bench@example.com", "password": PASSWORD, "company_name": "Bench",
+            "first_name": "B", "last_name": "U", "industry": "Test", "employee_count": 1,
+        })
+        response.raise_for_status()
+
+        slots = asyncio.Semaphore(args.concurrency)
+        login_ms, probe_ms, statuses = [], [], {}
+        done = asyncio.Event()
+
+        async def login():
+            async with slots:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login", json={"email": "bench@example.com", "password": PASSWORD}
+                )
+                login_ms.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_ms.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.02)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    print(f"bcrypt rounds {args.rounds}, hash workers {args.workers}, concurrency {args.concurrency}")
+    print(f"logins: {args.logins} in {elapsed:.2f}s = {args.logins / elapsed:.1f}/s  statuses {statuses}")
+    print(
+        f"login latency ms: p50 {statistics.median(login_ms):.1f}  "
+        f"p95 {percentile(login_ms, 0.95):.1f}  max {max(login_ms):.1f}"
+    )
+    print(
+        f"/health during burst ms: p50 {statistics.median(probe_ms):.1f}  "
+        f"p95 {percentile(probe_ms, 0.95):.1f}  max {max(probe_ms):.1f}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # Settings are read at import, so configure them before the app is loaded
+    scratch = tempfile.mkdtemp(prefix="bench-login-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}/bench.db"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(max(args.concurrency, 1))
+    os.environ.setdefault("SECRET_KEY", "bench")
+    asyncio.run(bench(args))
+
+if __name__ == "__main__":
+    main()
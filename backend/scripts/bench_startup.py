@@ -0,0 +1,70 @@
+"""
+Cold-start benchmark: how long a fresh worker process takes to import app.main and
+run its startup handlers, i.e. until it could accept requests. Each run is a new
+interpreter, so nothing is shared between runs.
+
+    python scripts/bench_startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Modules that should only load on first use, not during boot
+LAZY_MODULES = ("pdfplumber", "requests")
+
+_WORKER = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(boot())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "eager": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+def run_once(env: dict) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _WORKER], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - started) * 1000
+    return sample
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = {**os.environ}
+    env.setdefault("SECRET_KEY", "bench")
+    samples = [run_once(env) for _ in range(args.runs)]
+
+    for key in ("import_ms", "startup_ms", "process_ms"):
+        values = [sample[key] for sample in samples]
+        print(
+            f"{key:>11}: median {statistics.median(values):8.1f}  "
+            f"min {min(values):8.1f}  max {max(values):8.1f}"
+        )
+    eager = sorted({name for sample in samples for name in sample["eager"]})
+    print(f"loaded at boot (should be lazy): {', '.join(eager) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.analytics import AnalyticsRollup
+from app.models.chat import ChatSession
+from app.models.file import File
+from app.models.form import Form, FormAnalysis
+from app.models.metrics import LLMCallMetric
+from app.models.user import User
+from app.services.analytics_service import rebuild_rollup, rollup_summary
+
+
+def add_history(db: Session, user, forms: int = 3):
+    for i in range(forms):
+        form = Form(
+            user_id=user.id, title=f"Form {i}", type="OSHA 300", year=2024, content={},
+            status="draft" if i % 2 else "completed", completion_percentage=10 * i,
+        )
+        db.add(form)
+        db.flush()
+        db.add(FormAnalysis(
+            form_id=form.id, analysis_type="compliance", model_used="m", suggestions={},
+            compliance_score=80 + i, created_by=user.id,
+            created_at=datetime.utcnow() - timedelta(days=i),
+        ))
+        db.add(File(
+            form_id=form.id, filename=f"f{i}.pdf", file_path=f"/tmp/f{i}.pdf", mime_type="application/pdf",
+            size=1, uploaded_by=user.id,
+        ))
+        db.add(ChatSession(form_id=form.id, user_id=user.id, context={}, model_used="m"))
+        db.commit()
+
+
+def fresh_summary(db: Session, scope: str, scope_id: str) -> dict:
+    db.expire_all()
+    # Recompute from the base tables, then roll back so the stored rollup is untouched
+    rollup = rebuild_rollup(db, scope, scope_id)
+    summary = rollup_summary(rollup)
+    db.rollback()
+    return summary
+
+
+def test_rollup_tracks_writes_incrementally(db: Session, test_user):
+    add_history(db, test_user)
+    form = db.query(Form).filter(Form.title == "Form 0").one()
+    form.status = "draft"
+    form.completion_percentage = 55
+    db.query(ChatSession).first().status = "closed"
+    db.commit()
+
+    stored = rollup_summary(db.get(AnalyticsRollup, ("user", test_user.id)))
+    assert stored == fresh_summary(db, "user", test_user.id)
+    assert stored["total_forms"] == 3
+    assert stored["forms_by_status"] == {"draft": 2, "completed": 1}
+    assert stored["active_chats"] == 2
+    assert len(stored["compliance_trend"]) == 3
+
+    db.delete(db.query(File).filter(File.filename == "f2.pdf").one())
+    db.commit()
+    stored = rollup_summary(db.get(AnalyticsRollup, ("user", test_user.id)))
+    assert [file["filename"] for file in stored["recent_files"]] == ["f1.pdf", "f0.pdf"]
+
+
+def test_company_rollup_spans_users(db: Session, test_user):
+    colleague = User(
+        email="colleague@example.com", password_hash="x", company_name="Test Company",
+        first_name="Co", last_name="Worker", industry="Technology", employee_count=100,
+    )
+    db.add(colleague)
+    db.commit()
+    add_history(db, test_user, forms=2)
+    add_history(db, colleague, forms=1)
+
+    company = rollup_summary(db.get(AnalyticsRollup, ("company", "Test Company")))
+    assert company["total_forms"] == 3
+    assert company == fresh_summary(db, "company", "Test Company")
+
+
+def test_dashboard_polls_revalidate_with_one_read(
+    authorized_client: TestClient, db: Session, test_user, async_engine
+):
+    add_history(db, test_user, forms=4)
+    expected = fresh_summary(db, "user", test_user.id)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    first = authorized_client.get("/api/v1/analytics/dashboard")
+    statements.clear()
+    poll = authorized_client.get(
+        "/api/v1/analytics/dashboard", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert first.json() == expected
+    assert poll.status_code == 304 and poll.content == b""
+    # The version read plus the test's user lookup
+    assert len(statements) == 2
+    assert "analytics_rollups.version" in statements[-1]
+
+    add_history(db, test_user, forms=1)
+    changed = authorized_client.get(
+        "/api/v1/analytics/dashboard", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert changed.json()["total_forms"] == 5
+
+
+def test_company_stats_require_admin(authorized_client: TestClient):
+    assert authorized_client.get("/api/v1/analytics/company").status_code == 403
+
+
+def test_llm_usage_for_admins_spans_only_their_company(authorized_client: TestClient, db: Session, test_user):
+    outsider = User(
+        email="outsider@example.com", password_hash="x", company_name="Other Company",
+        first_name="Out", last_name="Sider", industry="Technology", employee_count=5,
+    )
+    colleague = User(
+        email="colleague@example.com", password_hash="x", company_name="Test Company",
+        first_name="Co", last_name="Worker", industry="Technology", employee_count=100,
+    )
+    test_user.role = "admin"
+    db.add_all([outsider, colleague])
+    db.commit()
+    for user in (test_user, colleague, outsider):
+        db.add(LLMCallMetric(user_id=user.id, model="m", operation="form_chat", latency_ms=10))
+    db.commit()
+
+    usage = authorized_client.get("/api/v1/analytics/llm-usage?group_by=user").json()
+    assert sorted(group["user"] for group in usage["groups"]) == sorted([test_user.id, colleague.id])
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.file import Blob, File
+from app.models.form import Form
+from app.services.blob_store import blob_store
+
+
+def upload(client: TestClient, form_id: str, name: str, content: bytes):
+    return client.post(
+        f"/api/v1/files/upload?form_id={form_id}", files={"file": (name, content, "application/pdf")}
+    )
+
+
+def create_form(db: Session, user) -> Form:
+    form = Form(user_id=user.id, title="2024 Log", type="OSHA 300", year=2024, content={})
+    db.add(form)
+    db.commit()
+    return form
+
+
+def blob_files(root):
+    return sorted(path for path in root.rglob("*") if path.is_file()) if root.exists() else []
+
+
+def test_identical_uploads_share_one_blob(authorized_client: TestClient, db: Session, test_user, tmp_path, monkeypatch):
+    tmp_path = tmp_path / "uploads"
+    monkeypatch.setattr(blob_store, "root", str(tmp_path))
+    form_id = create_form(db, test_user).id
+
+    first = upload(authorized_client, form_id, "a.pdf", b"%PDF same").json()
+    second = upload(authorized_client, form_id, "a.pdf", b"%PDF same").json()
+    other = upload(authorized_client, form_id, "a.pdf", b"%PDF other").json()
+
+    assert first["id"] != second["id"]
+    assert first["file_path"] == second["file_path"] != other["file_path"]
+    assert len(blob_files(tmp_path)) == 2
+    with open(first["file_path"], "rb") as stored:
+        assert stored.read() == b"%PDF same"
+    digest = db.get(File, first["id"]).sha256
+    assert os.path.relpath(first["file_path"], tmp_path) == os.path.join(digest[:2], digest[2:4], digest)
+    assert db.get(Blob, digest).ref_count == 2
+
+
+def test_failed_upload_leaves_no_blob(authorized_client: TestClient, db: Session, test_user, tmp_path, monkeypatch):
+    tmp_path = tmp_path / "uploads"
+    monkeypatch.setattr(blob_store, "root", str(tmp_path))
+    form_id = create_form(db, test_user).id
+    upload(authorized_client, form_id, "a.pdf", b"%PDF kept")
+
+    with pytest.raises(IntegrityError):
+        upload(authorized_client, "no-such-form", "b.pdf", b"%PDF orphan")
+    with pytest.raises(IntegrityError):
+        upload(authorized_client, "no-such-form", "a.pdf", b"%PDF kept")
+    # The blob of the committed upload is still there
+    assert [path.read_bytes() for path in blob_files(tmp_path)] == [b"%PDF kept"]
+    assert db.query(Blob).count() == 1
+
+
+def test_blob_removed_with_its_last_reference(authorized_client: TestClient, db: Session, test_user, tmp_path, monkeypatch):
+    # files.sha256 -> blobs is checked, so the files row has to be deleted first
+    assert db.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    tmp_path = tmp_path / "uploads"
+    monkeypatch.setattr(blob_store, "root", str(tmp_path))
+    form_id = create_form(db, test_user).id
+    first = upload(authorized_client, form_id, "a.pdf", b"%PDF same").json()
+    second = upload(authorized_client, form_id, "b.pdf", b"%PDF same").json()
+    digest = db.get(File, first["id"]).sha256
+
+    assert authorized_client.delete(f"/api/v1/files/{first['id']}").status_code == 200
+    db.expire_all()
+    assert db.get(Blob, digest).ref_count == 1
+    assert os.path.exists(second["file_path"])
+
+    assert authorized_client.delete(f"/api/v1/files/{second['id']}").status_code == 200
+    db.expire_all()
+    assert db.get(Blob, digest) is None
+    assert blob_files(tmp_path) == []
@@ -0,0 +1,619 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints import forms as forms_endpoint
+from app.models.chat import ChatMessage, ChatSession
+from app.models.form import Form, FormAnalysis, FormDocument, FormVersion
+from app.models.metrics import LLMCallMetric
+from app.services.metrics_service import llm_metrics
+
+TEMPLATE_PDF = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "static", "templates", "OSHA-301-form.pdf"
+))
+
+
+def create_form(db: Session, user, content=None, text="Form 300 Log of Work-Related Injuries") -> Form:
+    form = Form(
+        user_id=user.id,
+        title="2024 Log",
+        type="OSHA 300",
+        year=2024,
+        content=content if content is not None else {},
+    )
+    db.add(form)
+    db.flush()
+    if text is not None:
+        document = FormDocument(form_id=form.id, filename="oshaforms.pdf")
+        document.text = text
+        db.add(document)
+    db.commit()
+    db.refresh(form)
+    return form
+
+
+def test_chat_appends_messages_instead_of_rewriting_content(
+    authorized_client: TestClient, db: Session, test_user, fake_llm
+):
+    form_id = create_form(db, test_user).id
+
+    first = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"})
+    second = authorized_client.post(
+        f"/api/v1/forms/{form_id}/chat", json={"message": "the year is 2024"}
+    )
+    assert first.status_code == 200
+    assert first.json()["response"] == "Hi Test User! reply 1"
+    assert second.json()["response"] == "reply 2"
+
+    db.expire_all()
+    rows = db.query(ChatMessage).order_by(ChatMessage.created_at).all()
+    assert [(row.role, row.content) for row in rows] == [
+        ("user", "hello"),
+        ("assistant", "Hi Test User! reply 1"),
+        ("user", "the year is 2024"),
+        ("assistant", "reply 2"),
+    ]
+    # History is replayed from rows on the second turn
+    assert fake_llm.sent_messages[1][-3:] == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "Hi Test User! reply 1"},
+        {"role": "user", "content": "the year is 2024"},
+    ]
+    form = db.get(Form, form_id)
+    assert "conversation" not in form.content
+    assert form.content["filled_fields"]["osha_300"]["year"] == "2024"
+
+
+def test_chat_sends_only_recent_window(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch
+):
+    conversation = []
+    for i in range(30):
+        conversation.append({"role": "user", "content": f"q{i}"})
+        conversation.append({"role": "assistant", "content": f"a{i}"})
+    form_id = create_form(db, test_user, {"conversation": conversation}, text="Form 300").id
+    monkeypatch.setattr(forms_endpoint.settings, "CHAT_HISTORY_WINDOW", 4)
+
+    response = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "next"})
+    assert response.status_code == 200
+
+    history = [m for m in fake_llm.sent_messages[0] if m["role"] != "system"]
+    assert history == [
+        {"role": "user", "content": "q28"},
+        {"role": "assistant", "content": "a28"},
+        {"role": "user", "content": "q29"},
+        {"role": "assistant", "content": "a29"},
+        {"role": "user", "content": "next"},
+    ]
+    db.expire_all()
+    assert db.query(ChatMessage).count() == 62
+    assert "conversation" not in db.get(Form, form_id).content
+
+
+def test_chat_records_llm_metrics(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch
+):
+    form_id = create_form(db, test_user).id
+    monkeypatch.setattr(llm_metrics, "batch_size", 2)
+
+    for message in ("hello", "again"):
+        authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": message})
+
+    # The batch of two is written in one go once full
+    assert llm_metrics.pending() == 0
+    rows = db.query(LLMCallMetric).all()
+    assert len(rows) == 2
+    for row in rows:
+        assert row.form_id == form_id
+        assert row.operation == "form_chat"
+        assert row.status == "ok"
+        assert row.prompt_tokens == 100 and row.completion_tokens == 20
+        assert row.cost_usd == (100 * 15.0 + 20 * 75.0) / 1_000_000
+        assert row.ttft_ms is not None and row.ttft_ms <= row.latency_ms
+
+    usage = authorized_client.get("/api/v1/analytics/llm-usage?group_by=model").json()
+    assert usage["groups"][0]["calls"] == 2
+    assert usage["groups"][0]["completion_tokens"] == 40
+
+
+def test_chat_merges_structured_field_updates(
+    authorized_client: TestClient, db: Session, test_user, fake_llm
+):
+    form_id = create_form(db, test_user).id
+    fake_llm.reply = lambda payload: json.dumps({
+        "reply": "Got it. What were the total hours worked?",
+        "field_updates": {
+            "osha_300": {
+                "establishment_name": "Acme Plant 2",
+                "cases": [{"case_number": "7", "employee_name": "Dana Ruiz", "death": "no"}],
+            },
+            "osha_300a": {"annual_avg_employees": 85, "bogus_field": "x"},
+            "not_a_form": {"anything": 1},
+        },
+    })
+
+    response = authorized_client.post(
+        f"/api/v1/forms/{form_id}/chat", json={"message": "we are acme plant 2, case 7 is dana"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"].endswith("What were the total hours worked?")
+    assert body["field_updates"]["osha_300a"] == {"annual_avg_employees": "85"}
+    assert fake_llm.payloads[0]["response_format"] == {"type": "json_object"}
+
+    db.expire_all()
+    fields = db.get(Form, form_id).content["filled_fields"]
+    assert fields["osha_300"]["establishment_name"] == "Acme Plant 2"
+    assert fields["osha_300"]["cases"] == [
+        {"case_number": "7", "employee_name": "Dana Ruiz", "death": False}
+    ]
+    assert "bogus_field" not in fields["osha_300a"]
+    assert "not_a_form" not in fields
+    assistant = db.query(ChatMessage).filter(ChatMessage.role == "assistant").one()
+    assert assistant.form_updates["osha_300"]["establishment_name"] == "Acme Plant 2"
+
+
+def test_chat_replays_response_for_same_idempotency_key(
+    authorized_client: TestClient, db: Session, test_user, fake_llm
+):
+    form_id = create_form(db, test_user).id
+    headers = {"Idempotency-Key": "turn-1"}
+
+    first = authorized_client.post(
+        f"/api/v1/forms/{form_id}/chat", json={"message": "hello"}, headers=headers
+    )
+    retry = authorized_client.post(
+        f"/api/v1/forms/{form_id}/chat", json={"message": "hello"}, headers=headers
+    )
+    assert retry.json() == first.json()
+    assert len(fake_llm.payloads) == 1
+    db.expire_all()
+    assert db.query(ChatMessage).count() == 2
+
+
+def test_chat_does_not_replay_an_ai_error(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch
+):
+    form_id = create_form(db, test_user).id
+    headers = {"Idempotency-Key": "turn-1"}
+    chat_completion = forms_endpoint.chat_completion
+    outage = iter([{"error": "upstream unavailable"}])
+
+    def flaky_completion(*args, **kwargs):
+        return next(outage, None) or chat_completion(*args, **kwargs)
+
+    monkeypatch.setattr(forms_endpoint, "chat_completion", flaky_completion)
+
+    failed = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"}, headers=headers)
+    assert failed.json()["response"].startswith("AI error")
+    retry = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"}, headers=headers)
+    assert retry.json()["response"] == "Hi Test User! reply 1"
+    db.expire_all()
+    assert db.query(ChatMessage).count() == 2
+
+
+def test_analyze_precomputes_opening_turn(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch, tmp_path,
+    AsyncTestingSessionLocal,
+):
+    form_id = create_form(db, test_user, text=None).id
+    monkeypatch.setattr(forms_endpoint, "AsyncSessionLocal", AsyncTestingSessionLocal)
+    monkeypatch.chdir(tmp_path)
+    fake_llm.reply = lambda payload: json.dumps({
+        "reply": "I found your 301 form; the employee name is missing.",
+        "field_updates": {"osha_301": {"case_number": "12"}},
+    })
+
+    with open(TEMPLATE_PDF, "rb") as pdf:
+        analyzed = authorized_client.post(
+            f"/api/v1/forms/{form_id}/analyze?precompute_opener=true",
+            files={"file": ("OSHA-301-form.pdf", pdf, "application/pdf")},
+        )
+    assert analyzed.status_code == 200
+    # Parsed in memory; no copy of the PDF is written
+    assert not (tmp_path / "uploads").exists()
+    opener = analyzed.json()["opening_message"]
+    # The background precompute ran once, after the response
+    assert len(fake_llm.payloads) == 1
+    assert fake_llm.payloads[0]["messages"][-1] == {"role": "user", "content": opener}
+
+    response = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": opener})
+    assert response.json()["response"] == (
+        "Hi Test User! I found your 301 form; the employee name is missing."
+    )
+    assert len(fake_llm.payloads) == 1
+
+    db.expire_all()
+    assert db.get(FormDocument, form_id).opening_turn is None
+    assert db.get(Form, form_id).content["filled_fields"]["osha_301"]["case_number"] == "12"
+
+
+def test_precomputed_opening_ignored_for_other_messages(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch,
+    AsyncTestingSessionLocal,
+):
+    form_id = create_form(db, test_user).id
+    monkeypatch.setattr(forms_endpoint, "AsyncSessionLocal", AsyncTestingSessionLocal)
+    asyncio.run(forms_endpoint.precompute_opening_turn(form_id, test_user.id))
+    assert len(fake_llm.payloads) == 1
+
+    authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "case number is 4"})
+    assert len(fake_llm.payloads) == 2
+    db.expire_all()
+    assert db.get(FormDocument, form_id).opening_turn is None
+
+
+def test_opening_not_precomputed_once_chat_started(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch,
+    AsyncTestingSessionLocal,
+):
+    form_id = create_form(db, test_user).id
+    monkeypatch.setattr(forms_endpoint, "AsyncSessionLocal", AsyncTestingSessionLocal)
+    authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"})
+    assert len(fake_llm.payloads) == 1
+
+    asyncio.run(forms_endpoint.precompute_opening_turn(form_id, test_user.id))
+    assert len(fake_llm.payloads) == 1
+    db.expire_all()
+    assert db.get(FormDocument, form_id).opening_turn is None
+
+
+def test_list_forms_keyset_pagination(authorized_client: TestClient, db: Session, test_user):
+    created = datetime(2025, 1, 1)
+    for i in range(5):
+        form = Form(
+            user_id=test_user.id, title=f"Form {i}", type="OSHA 300", year=2025, content={},
+            created_at=created + timedelta(days=i // 2),
+        )
+        db.add(form)
+    db.commit()
+
+    titles, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = authorized_client.get("/api/v1/forms/", params=params)
+        assert response.status_code == 200
+        titles.extend(form["title"] for form in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(titles) == [f"Form {i}" for i in range(5)]
+    assert titles[0] == "Form 4"
+    assert authorized_client.get("/api/v1/forms/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    legacy = authorized_client.get("/api/v1/forms/", params={"skip": 4, "limit": 2})
+    assert legacy.headers["Deprecation"] == "true"
+    assert len(legacy.json()) == 1
+
+
+def count_queries(async_engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    return statements, lambda: event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+
+def test_first_chat_turn_writes_nothing_before_the_model_call(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, async_engine
+):
+    form_id = create_form(db, test_user).id
+    authorized_client.get("/api/v1/analytics/dashboard")
+    statements, stop = count_queries(async_engine)
+    writes = lambda: [s for s in statements if s.split()[0].upper() in ("INSERT", "UPDATE", "DELETE")]
+    written_before_call = []
+    fake_llm.reply = lambda payload: written_before_call.extend(writes()) or "reply"
+
+    authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"})
+    stop()
+    assert written_before_call == []
+    # Applied at commit as in-place increments, not read-modify-write
+    assert any("active_chats=(analytics_rollups.active_chats +" in s for s in writes())
+    assert authorized_client.get("/api/v1/analytics/dashboard").json()["active_chats"] == 1
+
+
+def add_form_with_history(db: Session, user, versions: int, analyses: int) -> Form:
+    form = create_form(db, user, text="x" * 1000)
+    for n in range(versions):
+        db.add(FormVersion(form_id=form.id, version_number=n + 1, snapshot={"n": n}, created_by=user.id))
+    for _ in range(analyses):
+        db.add(FormAnalysis(
+            form_id=form.id, analysis_type="compliance", model_used="m", suggestions={},
+            compliance_score=90, created_by=user.id,
+        ))
+    db.commit()
+    return form
+
+
+def test_list_forms_returns_summaries_with_constant_query_count(
+    authorized_client: TestClient, db: Session, test_user, async_engine
+):
+    add_form_with_history(db, test_user, versions=3, analyses=2)
+    statements, stop = count_queries(async_engine)
+    authorized_client.get("/api/v1/forms/")
+    few_forms = len(statements)
+    stop()
+
+    for _ in range(4):
+        add_form_with_history(db, test_user, versions=2, analyses=1)
+    statements, stop = count_queries(async_engine)
+    response = authorized_client.get("/api/v1/forms/")
+    stop()
+
+    assert len(statements) == few_forms
+    forms = response.json()
+    assert len(forms) == 5
+    assert "content" not in forms[-1] and "versions" not in forms[-1]
+    assert forms[-1]["version_count"] == 3
+    assert forms[-1]["analysis_count"] == 2
+    assert forms[-1]["latest_version_at"] is not None
+
+
+def test_list_forms_served_from_cache_until_a_write(
+    authorized_client: TestClient, db: Session, test_user, async_engine
+):
+    form_id = create_form(db, test_user).id
+    first = authorized_client.get("/api/v1/forms/")
+    etag = first.headers["ETag"]
+
+    statements, stop = count_queries(async_engine)
+    cached = authorized_client.get("/api/v1/forms/")
+    not_modified = authorized_client.get("/api/v1/forms/", headers={"If-None-Match": etag})
+    stop()
+    assert cached.json() == first.json() and cached.headers["ETag"] == etag
+    assert not_modified.status_code == 304
+    assert not any("FROM forms" in statement for statement in statements)
+
+    authorized_client.put(f"/api/v1/forms/{form_id}", json={"title": "Renamed"})
+    renamed = authorized_client.get("/api/v1/forms/", headers={"If-None-Match": etag})
+    assert renamed.status_code == 200
+    assert renamed.json()[0]["title"] == "Renamed"
+
+    authorized_client.post(
+        f"/api/v1/forms/{form_id}/versions", json={"version_number": 1, "content": {}}
+    )
+    versioned = authorized_client.get("/api/v1/forms/", headers={"If-None-Match": renamed.headers["ETag"]})
+    assert versioned.json()[0]["version_count"] == 1
+
+
+def test_get_form_eager_loads_history(
+    authorized_client: TestClient, db: Session, test_user, async_engine
+):
+    form_id = add_form_with_history(db, test_user, versions=3, analyses=2).id
+    statements, stop = count_queries(async_engine)
+    response = authorized_client.get(f"/api/v1/forms/{form_id}")
+    stop()
+
+    assert len(response.json()["versions"]) == 3
+    assert len(response.json()["analyses"]) == 2
+    # Form, versions, analyses (plus the test's user lookup)
+    assert len(statements) <= 4
+
+
+def test_extracted_text_lives_in_document_not_form_row(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, async_engine
+):
+    form_id = create_form(db, test_user, text="Establishment: Acme Plant. " * 2000).id
+
+    document = db.get(FormDocument, form_id)
+    assert len(document.text_compressed) < document.text_length / 10
+
+    statements, stop = count_queries(async_engine)
+    form = authorized_client.get(f"/api/v1/forms/{form_id}").json()
+    stop()
+    assert form["content"] == {}
+    assert not any("form_documents" in statement for statement in statements)
+
+    fetched = authorized_client.get(f"/api/v1/forms/{form_id}/document").json()
+    assert fetched["text"].startswith("Establishment: Acme Plant.")
+    assert fetched["text_length"] == document.text_length
+
+    authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"})
+    system_prompt = fake_llm.sent_messages[0][2]["content"]
+    assert system_prompt.startswith("Relevant OSHA Form Content: Establishment: Acme Plant.")
+
+    exported = authorized_client.get(f"/api/v1/forms/{form_id}/export").json()
+    assert exported["text"] == document.text
+    assert [msg["role"] for msg in exported["conversation"]] == ["user", "assistant"]
+
+
+def test_delete_form_after_analyze(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch, tmp_path
+):
+    form_id = create_form(db, test_user, text=None).id
+    monkeypatch.chdir(tmp_path)
+    assert analyze(authorized_client, form_id).status_code == 200
+
+    assert authorized_client.delete(f"/api/v1/forms/{form_id}").status_code == 200
+    db.expire_all()
+    assert db.get(Form, form_id) is None
+    assert db.get(FormDocument, form_id) is None
+
+
+def analyze(client: TestClient, form_id: str):
+    with open(TEMPLATE_PDF, "rb") as pdf:
+        return client.post(
+            f"/api/v1/forms/{form_id}/analyze?precompute_opener=false",
+            files={"file": ("OSHA-301-form.pdf", pdf, "application/pdf")},
+        )
+
+
+def test_delete_form_after_chat(authorized_client: TestClient, db: Session, test_user, fake_llm):
+    form_id = create_form(db, test_user).id
+    assert authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"}).status_code == 200
+
+    assert authorized_client.delete(f"/api/v1/forms/{form_id}").status_code == 200
+    db.expire_all()
+    assert db.query(ChatSession).count() == 0
+    assert db.query(ChatMessage).count() == 0
+    dashboard = authorized_client.get("/api/v1/analytics/dashboard").json()
+    assert dashboard["total_forms"] == 0 and dashboard["active_chats"] == 0
+
+
+def test_reanalyze_starts_a_new_conversation(
+    authorized_client: TestClient, db: Session, test_user, fake_llm, monkeypatch, tmp_path
+):
+    form_id = create_form(db, test_user, text=None).id
+    monkeypatch.chdir(tmp_path)
+    assert analyze(authorized_client, form_id).status_code == 200
+    authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "about the old PDF"})
+
+    assert analyze(authorized_client, form_id).status_code == 200
+    response = authorized_client.post(f"/api/v1/forms/{form_id}/chat", json={"message": "hello"})
+    assert response.json()["response"].startswith("Hi Test User!")
+    history = [m for m in fake_llm.sent_messages[1] if m["role"] != "system"]
+    assert history == [{"role": "user", "content": "hello"}]
+    db.expire_all()
+    assert sorted(session.status for session in db.query(ChatSession)) == ["active", "completed"]
+
+    exported = authorized_client.get(f"/api/v1/forms/{form_id}/export").json()
+    assert [msg["content"] for msg in exported["conversation"] if msg["role"] == "user"] == ["hello"]
+
+
+def test_versions_store_deltas_and_reconstruct(
+    authorized_client: TestClient, db: Session, test_user, monkeypatch
+):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "FORM_VERSION_SNAPSHOT_INTERVAL", 3)
+    form_id = create_form(db, test_user).id
+    contents = [
+        {"text": "y" * 5000, "filled_fields": {"osha_300": {"year": str(2020 + n)}}}
+        for n in range(5)
+    ]
+    for n, content in enumerate(contents, start=1):
+        response = authorized_client.post(
+            f"/api/v1/forms/{form_id}/versions", json={"version_number": n, "content": content}
+        )
+        assert response.status_code == 200
+        assert response.json()["content"] == content
+
+    rows = db.query(FormVersion).order_by(FormVersion.version_number).all()
+    assert [row.is_snapshot for row in rows] == [True, False, False, True, False]
+    assert rows[1].snapshot is None
+    assert len(json.dumps(rows[1].delta)) < 100
+
+    for n, content in enumerate(contents, start=1):
+        assert authorized_client.get(f"/api/v1/forms/{form_id}/versions/{n}").json()["content"] == content
+    assert authorized_client.get(f"/api/v1/forms/{form_id}/versions/9").status_code == 404
+
+    versions = authorized_client.get(f"/api/v1/forms/{form_id}").json()["versions"]
+    assert sorted((v["version_number"], v["content"]["filled_fields"]["osha_300"]["year"]) for v in versions) == [
+        (n, str(2019 + n)) for n in range(1, 6)
+    ]
+
+
+def test_version_numbers_only_increase(authorized_client: TestClient, db: Session, test_user):
+    form_id = create_form(db, test_user).id
+    url = f"/api/v1/forms/{form_id}/versions"
+    for n in (1, 3, 5):
+        assert authorized_client.post(url, json={"version_number": n, "content": {"n": n}}).status_code == 200
+
+    # Back-filling would change what the later deltas replay to
+    for n in (2, 5):
+        response = authorized_client.post(url, json={"version_number": n, "content": {"n": 0}})
+        assert response.status_code == 409
+    for n in (1, 3, 5):
+        assert authorized_client.get(f"{url}/{n}").json()["content"] == {"n": n}
+
+    lines = [{"form_id": form_id, "version_number": n, "content": {"n": n}} for n in (4, 6, 6)]
+    result = authorized_client.post("/api/v1/forms/bulk/versions", json=lines).json()
+    assert [item["status"] for item in result["results"]] == ["error", "created", "error"]
+    assert result["results"][0]["error"] == "Version number must be greater than 5"
+    db.expire_all()
+    assert db.query(FormVersion).filter(FormVersion.form_id == form_id).count() == 4
+
+
+def test_list_forms_filters_on_filled_fields(authorized_client: TestClient, db: Session, test_user):
+    filled = [
+        {"osha_300": {"establishment_name": "Acme", "cases": [
+            {"employee_name": "Jane Doe", "death": False},
+            {"employee_name": "John Roe", "death": True},
+        ]}, "osha_300a": {"total_hours_worked": "4000"}},
+        {"osha_300": {"establishment_name": "Acme", "cases": [{"employee_name": "Ann Poe", "death": False}]},
+         "osha_300a": {"total_hours_worked": ""}},
+        {"osha_300": {"establishment_name": "Globex"}},
+    ]
+    for i, fields in enumerate(filled):
+        form = create_form(db, test_user, content={"filled_fields": fields})
+        form.title = f"Form {i}"
+        db.commit()
+
+    def matching(*filters):
+        response = authorized_client.get("/api/v1/forms/", params={"field": list(filters)})
+        assert response.status_code == 200, response.text
+        return sorted(form["title"] for form in response.json())
+
+    assert matching("osha_300.establishment_name:eq:Acme") == ["Form 0", "Form 1"]
+    assert matching("osha_300.cases[].employee_name:eq:John Roe") == ["Form 0"]
+    assert matching("osha_300.cases[].death:eq:yes") == ["Form 0"]
+    assert matching("osha_300a.total_hours_worked:missing") == ["Form 1", "Form 2"]
+    assert matching("osha_300a.total_hours_worked:exists", "osha_300.establishment_name:eq:Acme") == ["Form 0"]
+
+    for bad in ("osha_300.nope:eq:x", "osha_300.city:like:x", "osha_300.cases[].death:missing"):
+        assert authorized_client.get("/api/v1/forms/", params={"field": bad}).status_code == 400
+
+
+def test_bulk_forms_create_update_and_report_per_item(
+    authorized_client: TestClient, db: Session, test_user, async_engine, monkeypatch
+):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 50)
+    existing = create_form(db, test_user)
+    items = [
+        {"title": f"Log {n}", "type": "osha_300", "year": 2000 + n, "content": {"filled_fields": {}}}
+        for n in range(120)
+    ]
+    items[7] = {"title": "No type"}
+    items.append({"id": existing.id, "title": "Renamed", "status": "completed"})
+    items.append({"id": "missing", "title": "Ghost"})
+
+    statements, stop = count_queries(async_engine)
+    response = authorized_client.post("/api/v1/forms/bulk", json=items)
+    stop()
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["updated"], result["failed"]) == (119, 1, 2)
+    assert [item["index"] for item in result["results"]] == list(range(122))
+    assert result["results"][7]["status"] == "error"
+    assert result["results"][7]["error"][0]["loc"] == ["type"]
+    assert result["results"][120] == {"index": 120, "status": "updated", "id": existing.id, "error": None}
+    assert result["results"][121]["error"] == "Form not found"
+    # Rows go out in batched statements per chunk, not one INSERT per form
+    assert sum(statement.startswith("INSERT INTO forms") for statement in statements) < 10
+
+    db.expire_all()
+    assert db.query(Form).filter(Form.user_id == test_user.id).count() == 120
+    assert db.get(Form, existing.id).title == "Renamed"
+    assert authorized_client.post("/api/v1/forms/bulk", json={"title": "x"}).status_code == 400
+
+
+def test_bulk_versions_from_ndjson_stream(authorized_client: TestClient, db: Session, test_user):
+    form_id = create_form(db, test_user).id
+    lines = [
+        json.dumps({"form_id": form_id, "version_number": n, "content": {"filled_fields": {"n": n}}})
+        for n in range(1, 4)
+    ]
+    lines.insert(1, "{not json")
+    lines.append(json.dumps({"form_id": "missing", "version_number": 1, "content": {}}))
+
+    response = authorized_client.post(
+        "/api/v1/forms/bulk/versions",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["failed"]) == (3, 2)
+    assert [item["status"] for item in result["results"]] == ["created", "error", "created", "created", "error"]
+    assert result["results"][1]["error"] == "Invalid JSON"
+
+    for n in range(1, 4):
+        version = authorized_client.get(f"/api/v1/forms/{form_id}/versions/{n}").json()
+        assert version["content"] == {"filled_fields": {"n": n}}
@@ -0,0 +1,87 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage, ChatSession
+from app.models.form import Form, FormDocument
+from app.models.search import SearchEntry
+from app.models.user import User
+
+
+def add_form(db: Session, user, title: str, text: str = None, cases=()) -> Form:
+    form = Form(
+        user_id=user.id, title=title, type="OSHA 300", year=2024,
+        content={"filled_fields": {"osha_300": {"cases": list(cases)}}},
+    )
+    db.add(form)
+    db.flush()
+    if text is not None:
+        document = FormDocument(form_id=form.id, filename="log.pdf")
+        document.text = text
+        db.add(document)
+    db.commit()
+    return form
+
+
+def search(client: TestClient, q: str):
+    response = client.get("/api/v1/search/", params={"q": q})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_search_ranks_documents_cases_and_chats(authorized_client: TestClient, db: Session, test_user):
+    forklift = add_form(db, test_user, "2024 Warehouse Log", cases=[
+        {"employee_name": "Jane Doe", "description_of_injury": "Foot crushed by a forklift near dock 4"},
+    ])
+    add_form(db, test_user, "2024 Office Log", text="Establishment: Acme Offices. Paper cut in March.")
+    chat = ChatSession(form_id=forklift.id, user_id=test_user.id, context={}, model_used="m")
+    db.add(chat)
+    db.flush()
+    db.add(ChatMessage(session_id=chat.id, role="user", content="The forklifts were serviced in March"))
+    db.commit()
+
+    hits = search(authorized_client, "forklift")
+    assert {hit["source"] for hit in hits} == {"form", "chat"}
+    assert all(hit["form_title"] == "2024 Warehouse Log" for hit in hits)
+    # Stemmed: "forklifts" in the chat matches too
+    assert all("<mark>forklift" in hit["snippet"] for hit in hits)
+
+    march = search(authorized_client, "march")
+    assert {hit["source"] for hit in march} == {"document", "chat"}
+    assert [hit["source"] for hit in search(authorized_client, "forklift march")] == ["chat"]
+    assert search(authorized_client, '"*"') == []
+
+
+def test_snippets_escape_indexed_text(authorized_client: TestClient, db: Session, test_user):
+    add_form(db, test_user, "Log", text='<img src=x onerror="alert(1)"> forklift & dock')
+
+    snippet = search(authorized_client, "forklift")[0]["snippet"]
+    assert "<img" not in snippet
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>forklift</mark> &amp; dock" in snippet
+
+
+def test_search_index_follows_writes(authorized_client: TestClient, db: Session, test_user):
+    form = add_form(db, test_user, "Log", text="ladder fall in the stockroom")
+    assert len(search(authorized_client, "ladder")) == 1
+
+    document = db.get(FormDocument, form.id)
+    document.text = "scaffold collapse"
+    form.title = "Scaffold Log"
+    db.commit()
+    assert search(authorized_client, "ladder") == []
+    assert {hit["source"] for hit in search(authorized_client, "scaffold")} == {"document", "form"}
+
+    db.delete(document)
+    db.delete(form)
+    db.commit()
+    assert db.query(SearchEntry).count() == 0
+
+
+def test_search_is_scoped_to_the_user(authorized_client: TestClient, db: Session, test_user):
+    other = User(
+        email="other@example.com", password_hash="x", company_name="Other", first_name="O",
+        last_name="U", industry="Retail", employee_count=5,
+    )
+    db.add(other)
+    db.commit()
+    add_form(db, other, "Other Log", text="forklift incident")
+    assert search(authorized_client, "forklift") == []
@@ -1,42 +1,64 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
-from app.db.session import Base, get_db
+from app.core.rate_limit import auth_ip_limiter, login_email_limiter
+from app.db.session import Base, async_session_factory, enforce_foreign_keys, get_async_db
 from app.main import app
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite://"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    # Every TestClient request comes from the same address
+    auth_ip_limiter.clear()
+    login_email_limiter.clear()
 
+# Test database: one SQLite file per test, shared by the sync fixtures and the async app session
 @pytest.fixture(scope="function")
-def db():
+def engine(tmp_path):
+    # Foreign keys enforced, as on Postgres
+    engine = enforce_foreign_keys(create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    ))
     Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def async_engine(engine):
+    # NullPool: connections are opened on the TestClient's event loop and must not outlive it
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool)
+    enforce_foreign_keys(async_engine.sync_engine)
+    yield async_engine
+    async_engine.sync_engine.dispose()
+
+@pytest.fixture(scope="function")
+def TestingSessionLocal(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="function")
+def AsyncTestingSessionLocal(async_engine):
+    return async_session_factory(async_engine)
+
+@pytest.fixture(scope="function")
+def db(TestingSessionLocal):
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
-def client(db):
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_db] = override_get_db
+def client(db, AsyncTestingSessionLocal):
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -58,4 +80,63 @@ def test_user(db):
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user 
\ No newline at end of file
+    return user 
+@pytest.fixture(scope="function")
+def authorized_client(client, test_user):
+    from fastapi import Depends
+    from app.core.security import get_current_user
+    from app.models.user import User
+
+    user_id = test_user.id
+
+    async def override_get_current_user(db=Depends(get_async_db)):
+        return await db.get(User, user_id)
+
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    yield client
+
+class FakeStreamingResponse:
+    status_code = 200
+
+    def __init__(self, content: str, usage: dict):
+        self.content = content
+        self.usage = usage
+        self.encoding = None
+
+    def iter_lines(self, decode_unicode=False):
+        import json
+
+        yield ": OPENROUTER PROCESSING"
+        for i in range(0, len(self.content), 8):
+            yield "data: " + json.dumps({"choices": [{"delta": {"content": self.content[i:i + 8]}}]})
+            yield ""
+        yield "data: " + json.dumps({"choices": [], "usage": self.usage})
+        yield "data: [DONE]"
+
+
+class FakeLLM:
+    """Stands in for the OpenRouter HTTP API; replies with `reply(payload)`."""
+
+    def __init__(self):
+        self.payloads = []
+        self.reply = lambda payload: f"reply {len(self.payloads)}"
+        self.usage = {"prompt_tokens": 100, "completion_tokens": 20}
+
+    def post(self, url, headers=None, json=None, **kwargs):
+        self.payloads.append(json)
+        return FakeStreamingResponse(self.reply(json), self.usage)
+
+    @property
+    def sent_messages(self):
+        return [payload["messages"] for payload in self.payloads]
+
+
+@pytest.fixture(scope="function")
+def fake_llm(monkeypatch, TestingSessionLocal):
+    from app.services.metrics_service import llm_metrics
+
+    fake = FakeLLM()
+    monkeypatch.setattr("requests.post", fake.post)
+    monkeypatch.setattr(llm_metrics, "session_factory", TestingSessionLocal)
+    yield fake
+    llm_metrics.flush()
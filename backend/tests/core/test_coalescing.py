@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.coalescing import InFlightCoalescer
+
+
+def test_followers_share_leader_result():
+    coalescer = InFlightCoalescer()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"response": "done"}
+
+    async def scenario():
+        callers = [asyncio.create_task(coalescer.run("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert coalescer.in_flight("key")
+        return await asyncio.gather(*callers)
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"response": "done"}] * 3
+    assert not coalescer.in_flight("key")
+
+
+def test_followers_see_leader_exception_and_next_call_runs_again():
+    coalescer = InFlightCoalescer()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    async def fresh():
+        return "fresh"
+
+    async def scenario():
+        callers = [coalescer.run("key", failing) for _ in range(2)]
+        errors = await asyncio.gather(*callers, return_exceptions=True)
+        return [str(error) for error in errors], await coalescer.run("key", fresh)
+
+    errors, result = asyncio.run(scenario())
+    assert errors == ["boom", "boom"]
+    assert result == "fresh"
+
+
+def test_follower_timeout_leaves_leader_running():
+    coalescer = InFlightCoalescer()
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.create_task(coalescer.run("key", slow))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await coalescer.run("key", slow, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("short", "x", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short", "missing") == "missing"
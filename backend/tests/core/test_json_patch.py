@@ -0,0 +1,32 @@
+import pytest
+
+from app.core.json_patch import JsonPatchError, apply_patch, make_patch
+
+
+@pytest.mark.parametrize("old, new", [
+    ({"a": 1, "b": {"c": [1, 2, 3]}}, {"a": 1, "b": {"c": [1, 5]}, "d/e~": True}),
+    ({"cases": [{"n": "1"}]}, {"cases": [{"n": "1"}, {"n": "2", "x": None}]}),
+    ({"flag": 1}, {"flag": True}),
+    ([1, 2], {"now": "object"}),
+    ({}, {}),
+])
+def test_patch_round_trips(old, new):
+    patch = make_patch(old, new)
+    assert apply_patch(old, patch) == new
+    assert type(apply_patch(old, patch)) is type(new)
+
+
+def test_patch_only_touches_changed_members():
+    old = {"text": "x" * 10_000, "filled_fields": {"osha_300": {"year": "2023"}}}
+    new = {"text": "x" * 10_000, "filled_fields": {"osha_300": {"year": "2024"}}}
+    assert make_patch(old, new) == [
+        {"op": "replace", "path": "/filled_fields/osha_300/year", "value": "2024"}
+    ]
+
+
+def test_apply_patch_does_not_mutate_input_and_rejects_bad_paths():
+    document = {"a": [1]}
+    apply_patch(document, [{"op": "add", "path": "/a/-", "value": 2}])
+    assert document == {"a": [1]}
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, [{"op": "remove", "path": "/missing"}])
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.passwords import PasswordHasher
+from app.models.user import User
+from app.schemas.user import UserLogin
+from app.services.auth_service import AuthService
+
+
+def test_login_rehashes_password_made_with_old_cost(db, test_user, AsyncTestingSessionLocal):
+    old = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4)
+    test_user.password_hash = old.hash("testpassword")
+    db.commit()
+
+    async def login(password):
+        async with AsyncTestingSessionLocal() as session:
+            return await AuthService.authenticate_user(
+                session, UserLogin(email=test_user.email, password=password)
+            )
+
+    with pytest.raises(HTTPException):
+        asyncio.run(login("wrong"))
+    assert asyncio.run(login("testpassword")).id == test_user.id
+
+    db.expire_all()
+    upgraded = db.get(User, test_user.id).password_hash
+    assert upgraded.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert asyncio.run(login("testpassword")).password_hash == upgraded
+
+
+def test_hasher_sheds_load_beyond_max_pending():
+    hasher = PasswordHasher(CryptContext(schemes=["bcrypt"]), workers=1, max_pending=1)
+
+    async def burst():
+        return await asyncio.gather(
+            hasher._run(time.sleep, 0.2), hasher._run(time.sleep, 0), return_exceptions=True
+        )
+
+    slow, rejected = asyncio.run(burst())
+    assert slow is None
+    assert isinstance(rejected, HTTPException) and rejected.status_code == 503
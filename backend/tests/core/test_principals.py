@@ -0,0 +1,77 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.principals import principal_cache
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+from app.services.auth_service import AuthService
+
+
+def user_queries(async_engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    return statements
+
+
+def me(client: TestClient, token: str):
+    return client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_principal_served_from_cache_after_first_request(client: TestClient, test_user, async_engine):
+    principal_cache.clear()
+    token = create_access_token(test_user.id)
+    statements = user_queries(async_engine)
+
+    assert me(client, token).json()["email"] == test_user.email
+    loads = sum("FROM users" in statement for statement in statements)
+    assert me(client, token).json()["email"] == test_user.email
+    assert sum("FROM users" in statement for statement in statements) == loads == 1
+
+
+def test_profile_update_and_deactivation_invalidate(client: TestClient, test_user, AsyncTestingSessionLocal):
+    principal_cache.clear()
+    token = create_access_token(test_user.id)
+    assert me(client, token).json()["first_name"] == "Test"
+
+    async def run(method, *args):
+        async with AsyncTestingSessionLocal() as db:
+            return await method(db, test_user.id, *args)
+
+    asyncio.run(run(AuthService.update_user_profile, {"first_name": "Renamed"}))
+    assert me(client, token).json()["first_name"] == "Renamed"
+
+    user = asyncio.run(run(AuthService.deactivate_user))
+    assert me(client, token).status_code == 401
+    # Revoked by version even for a token minted for the new version: the user is inactive
+    assert me(client, create_access_token(test_user.id, token_version=user.token_version)).status_code == 401
+
+
+def test_admin_deactivates_users_of_their_company(client: TestClient, db: Session, test_user):
+    colleague, outsider = (
+        User(
+            email=f"{name}@example.com", password_hash=get_password_hash("x"), company_name=company,
+            first_name=name, last_name="User", industry="Technology", employee_count=10,
+        )
+        for name, company in (("colleague", "Test Company"), ("outsider", "Other Company"))
+    )
+    db.add_all([colleague, outsider])
+    db.commit()
+    colleague_token = create_access_token(colleague.id)
+    admin = {"Authorization": f"Bearer {create_access_token(test_user.id)}"}
+    url = "/api/v1/auth/users/{}/deactivate"
+
+    assert client.post(url.format(colleague.id), headers=admin).status_code == 403
+    test_user.role = "admin"
+    db.commit()
+    principal_cache.clear()
+    assert client.post(url.format(outsider.id), headers=admin).status_code == 404
+
+    assert me(client, colleague_token).status_code == 200
+    response = client.post(url.format(colleague.id), headers=admin)
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+    assert me(client, colleague_token).status_code == 401
@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.passwords import password_hasher
+from app.core.rate_limit import SlidingWindowLimiter, auth_ip_limiter, login_email_limiter
+
+
+class FakeSharedCache:
+    """Just the counter commands SlidingWindowLimiter uses; each yields like a network call."""
+
+    def __init__(self):
+        self.client = self
+        self.values = {}
+
+    def key(self, name):
+        return name
+
+    async def incr(self, name):
+        await asyncio.sleep(0)
+        self.values[name] = self.values.get(name, 0) + 1
+        return self.values[name]
+
+    async def decr(self, name):
+        await asyncio.sleep(0)
+        self.values[name] -= 1
+        return self.values[name]
+
+    async def pexpire(self, name, ms):
+        await asyncio.sleep(0)
+
+    async def get(self, name):
+        await asyncio.sleep(0)
+        return self.values.get(name)
+
+    async def delete(self, *names):
+        for name in names:
+            self.values.pop(name, None)
+
+
+def login(client: TestClient, password: str, email: str = "test@example.com"):
+    return client.post("/api/v1/auth/login", json={"email": email, "password": password})
+
+
+def test_limiter_allows_limit_hits_per_window():
+    limiter = SlidingWindowLimiter("test", limit=3, window=60)
+    for _ in range(3):
+        asyncio.run(limiter.hit("key"))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(limiter.hit("key"))
+    assert exc.value.status_code == 429
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 60
+    # Other keys have their own budget
+    asyncio.run(limiter.hit("other"))
+
+
+def test_concurrent_hits_through_shared_counters_respect_the_limit():
+    shared = FakeSharedCache()
+    # Two workers sharing the counters
+    workers = [SlidingWindowLimiter("test", limit=3, window=60, shared=shared) for _ in range(2)]
+
+    async def attempt(limiter):
+        try:
+            await limiter.hit("key")
+            return True
+        except HTTPException:
+            return False
+
+    async def burst():
+        return await asyncio.gather(*(attempt(workers[i % 2]) for i in range(10)))
+
+    assert sum(asyncio.run(burst())) == 3
+    # Refused hits are taken back
+    assert sum(shared.values.values()) == 3
+
+
+def test_previous_window_is_weighted_by_overlap():
+    limiter = SlidingWindowLimiter("test", limit=10, window=60)
+    with patch("app.core.rate_limit.time.time", return_value=60 * 1000 + 59.0):
+        for _ in range(10):
+            asyncio.run(limiter.hit("key"))
+    # A quarter into the next window three quarters of those 10 (7.5) still count
+    with patch("app.core.rate_limit.time.time", return_value=60 * 1001 + 15.0):
+        for _ in range(3):
+            asyncio.run(limiter.hit("key"))
+        with pytest.raises(HTTPException):
+            asyncio.run(limiter.hit("key"))
+
+
+def test_login_attempts_lock_the_email_before_hashing(client: TestClient, test_user, monkeypatch):
+    monkeypatch.setattr(login_email_limiter, "limit", 2)
+    assert login(client, "wrong").status_code == 401
+    assert login(client, "wrong").status_code == 401
+
+    with patch.object(password_hasher, "verify_and_update") as verify:
+        response = login(client, "testpassword")
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    verify.assert_not_called()
+    # Only that account is limited
+    assert login(client, "wrong", email="someone@example.com").status_code == 401
+
+
+def test_login_attempts_count_before_the_password_is_checked(client: TestClient, test_user, monkeypatch):
+    monkeypatch.setattr(login_email_limiter, "limit", 2)
+
+    async def verify(*args):
+        # A concurrent guess arriving while this one is being verified already sees it counted
+        await login_email_limiter.hit("test@example.com")
+        with pytest.raises(HTTPException):
+            await login_email_limiter.hit("test@example.com")
+        return False, None
+
+    with patch.object(password_hasher, "verify_and_update", side_effect=verify):
+        assert login(client, "wrong").status_code == 401
+
+
+def test_successful_login_clears_the_email_count(client: TestClient, test_user, monkeypatch):
+    monkeypatch.setattr(login_email_limiter, "limit", 2)
+    assert login(client, "wrong").status_code == 401
+    assert login(client, "testpassword").status_code == 200
+    assert login(client, "wrong").status_code == 401
+    assert login(client, "testpassword").status_code == 200
+
+
+def test_attempts_per_address_cover_login_and_refresh(client: TestClient, test_user, monkeypatch):
+    monkeypatch.setattr(auth_ip_limiter, "limit", 2)
+    assert login(client, "testpassword").status_code == 200
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": "x"}).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": "x"}).status_code == 429
+    assert login(client, "testpassword").status_code == 429
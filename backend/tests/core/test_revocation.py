@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.bloom import BloomFilter
+from app.core.revocation import RevocationStore
+from app.core.security import create_access_token, create_refresh_token
+
+
+class FakeSharedCache:
+    """Just the sorted-set commands RevocationStore uses, shared between stores."""
+
+    def __init__(self):
+        self.client = self
+        self.sets = {}
+
+    def key(self, name):
+        return name
+
+    async def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        entries = self.sets.get(key, {})
+        for member in [member for member, score in entries.items() if score <= high]:
+            del entries[member]
+
+    async def zrangebyscore(self, key, low, high, withscores=False):
+        entries = self.sets.get(key, {})
+        return sorted(((member, score) for member, score in entries.items() if score >= low), key=lambda e: e[1])
+
+
+def bearer(token: str):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f"revoked-{i}")
+    assert all(f"revoked-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"live-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_store_forgets_expired_revocations():
+    store = RevocationStore(capacity=100)
+    asyncio.run(store.revoke("gone", time.time() - 1))
+    asyncio.run(store.revoke("kept", time.time() + 60))
+    assert not asyncio.run(store.is_revoked("gone"))
+    assert asyncio.run(store.is_revoked("kept"))
+    assert not asyncio.run(store.is_revoked(None))
+
+
+def test_filter_grows_instead_of_rebuilding_on_every_revoke(monkeypatch):
+    store = RevocationStore(capacity=10)
+    rebuilds = []
+    prune = store._prune
+    monkeypatch.setattr(store, "_prune", lambda: (rebuilds.append(len(store._revoked)), prune()))
+    for i in range(1000):
+        asyncio.run(store.revoke(f"jti-{i}", time.time() + 60))
+    assert rebuilds == [11, 23, 47, 95, 191, 383, 767]
+    assert all(asyncio.run(store.is_revoked(f"jti-{i}")) for i in range(1000))
+
+
+def test_revocation_reaches_other_workers_through_shared_cache():
+    shared = FakeSharedCache()
+    first = RevocationStore(shared=shared, sync_interval=0)
+    second = RevocationStore(shared=shared, sync_interval=0)
+    asyncio.run(first.revoke("abc", time.time() + 60))
+    assert asyncio.run(second.is_revoked("abc"))
+    assert not asyncio.run(second.is_revoked("other"))
+
+
+def test_logout_revokes_access_and_refresh_tokens(client: TestClient, test_user):
+    access_token = create_access_token(test_user.id)
+    refresh_token = create_refresh_token(test_user.id)
+    assert client.get("/api/v1/auth/me", headers=bearer(access_token)).status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/logout", headers=bearer(access_token), json={"refresh_token": refresh_token}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=bearer(access_token)).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token}).status_code == 401
+    # Other sessions of the same user are unaffected
+    assert client.get("/api/v1/auth/me", headers=bearer(create_access_token(test_user.id))).status_code == 200
+
+
+def test_refresh_tokens_are_single_use(client: TestClient, test_user):
+    refresh_token = create_refresh_token(test_user.id)
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    rotated = response.json()["refresh_token"]
+
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token}).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": rotated}).status_code == 200
+
+
+def test_refresh_token_is_not_an_access_token(client: TestClient, test_user):
+    refresh_token = create_refresh_token(test_user.id)
+    assert client.get("/api/v1/auth/me", headers=bearer(refresh_token)).status_code == 401
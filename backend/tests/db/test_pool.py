@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db.pool import InstrumentedQueuePool, engine_options, instrument, pool_status
+
+
+def test_engine_options_apply_pool_and_statement_timeout_settings():
+    options = engine_options("postgresql+asyncpg://u:p@db/complymate")
+    assert options["pool_size"] == 10 and options["max_overflow"] == 20
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "30000"}}
+
+    options = engine_options("postgresql://u:p@db/complymate")
+    assert options["connect_args"] == {"options": "-c statement_timeout=30000"}
+    assert options["poolclass"] is InstrumentedQueuePool
+
+    assert "pool_size" not in engine_options("sqlite://")
+
+
+def test_pool_metrics_track_checkouts_and_saturation(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(uri, **{**engine_options(uri), "pool_size": 2, "max_overflow": 0})
+    instrument(engine.pool)
+
+    first, second = engine.connect(), engine.connect()
+    first.execute(text("select 1"))
+    stats = pool_status(engine.pool)
+    assert stats["in_use"] == 2
+    assert stats["saturation"] == 1.0
+    first.close()
+    second.close()
+
+    engine.dispose()
+    with engine.connect():
+        pass
+    stats = pool_status(engine.pool)
+    assert stats["checkouts"] == 3
+    assert stats["peak_in_use"] == 2
+    assert stats["in_use"] == 0
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+
+
+def test_health_db_reports_pools(client: TestClient):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert set(response.json()["pools"]) == {"async", "sync"}
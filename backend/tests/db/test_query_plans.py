@@ -0,0 +1,130 @@
+"""
+Query-plan regression tests: the per-user hot queries must be served by the
+composite indexes created by the Alembic migrations, not by table scans.
+"""
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select
+
+from app.core.pagination import encode_cursor, keyset
+from app.db.base import Base
+from app.models.chat import ChatMessage, ChatSession
+from app.models.file import File
+from app.models.form import Form, FormAnalysis, FormVersion
+from app.services.form_query_service import FormQueryService
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def newest_first(statement, model):
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(20)
+
+
+HOT_QUERIES = {
+    "list_forms": (
+        newest_first(select(Form).where(Form.user_id == "u"), Form),
+        "idx_forms_user_created",
+    ),
+    "list_form_versions": (
+        newest_first(select(FormVersion).where(FormVersion.form_id == "f"), FormVersion),
+        "idx_form_versions_form_created",
+    ),
+    "list_files": (
+        newest_first(select(File).where(File.uploaded_by == "u"), File),
+        "idx_files_uploader_created",
+    ),
+    "list_chat_sessions": (
+        newest_first(select(ChatSession).where(ChatSession.user_id == "u"), ChatSession),
+        "idx_chat_sessions_user_created",
+    ),
+    "active_chat_sessions": (
+        select(ChatSession.id).where(ChatSession.user_id == "u", ChatSession.status == "active"),
+        "idx_chat_sessions_user_status",
+    ),
+    "list_chat_messages": (
+        select(ChatMessage)
+        .where(ChatMessage.session_id == "s")
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .limit(20),
+        "idx_chat_messages_session_created",
+    ),
+    "forms_missing_field": (
+        select(Form.id).where(Form.user_id == "u", FormQueryService.field_filter(
+            "osha_300a.total_hours_worked:missing", "sqlite"
+        )),
+        "idx_forms_ff_total_hours_worked",
+    ),
+    "forms_by_status": (
+        select(Form.status).where(Form.user_id == "u").group_by(Form.status),
+        "idx_forms_user_status",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(migrated_engine, name):
+    statement, index = HOT_QUERIES[name]
+    plan = query_plan(migrated_engine, statement)
+    assert f"INDEX {index}" in plan, plan
+    assert "SCAN" not in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_keyset_page_seeks_index(migrated_engine):
+    cursor = encode_cursor(datetime(2025, 1, 1), "f")
+    statement = keyset(select(Form).where(Form.user_id == "u"), Form, cursor).limit(20)
+    plan = query_plan(migrated_engine, statement)
+    assert "INDEX idx_forms_user_created (user_id=? AND (created_at,id)<(?,?))" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_dashboard_recent_analyses_avoid_scans(migrated_engine):
+    statement = (
+        select(FormAnalysis)
+        .join(Form)
+        .where(Form.user_id == "u")
+        .order_by(FormAnalysis.created_at.desc())
+        .limit(5)
+    )
+    plan = query_plan(migrated_engine, statement)
+    assert "SCAN" not in plan, plan
+    assert "idx_form_analyses_form_created" in plan, plan
+
+
+def test_migrations_match_model_indexes(migrated_engine):
+    for table in Base.metadata.sorted_tables:
+        # Postgres-only indexes (GIN) are declared with ddl_if and skipped on SQLite
+        expected = {
+            index.name for index in table.indexes
+            if index._ddl_if is None or index._ddl_if.dialect in (None, "sqlite")
+        }
+        # sqlite_master rather than the inspector, which skips expression indexes
+        with migrated_engine.connect() as connection:
+            actual = set(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table.name,)
+            ).scalars())
+        assert expected <= actual, (table.name, expected - actual)
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.response_cache import response_cache
+from app.db import replica
+from app.db.session import Base, async_session_factory
+from app.models.form import Form
+
+
+class FakeSharedCache:
+    """In-memory stand-in for SharedCache, shared by every 'worker' in a test."""
+
+    def __init__(self):
+        self.values = {}
+
+    def key(self, name):
+        return name
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ttl):
+        self.values[name] = value
+
+
+def replica_sessionmaker(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    return async_session_factory(engine, info={"read_only": True})
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    # An empty database stands in for a replica that hasn't caught up with the primary
+    path = tmp_path / "replica.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    router = replica.ReplicaRouter(replica_sessionmaker(path), check_interval=0)
+    monkeypatch.setattr(replica, "replica_router", router)
+    response_cache.clear()
+    yield router
+    response_cache.clear()
+
+
+def add_form(db: Session, user) -> Form:
+    form = Form(user_id=user.id, title="Form 300", type="osha_300", year=2024, content={})
+    db.add(form)
+    db.commit()
+    return form
+
+
+def form_titles(client: TestClient):
+    response = client.get("/api/v1/forms/")
+    assert response.status_code == 200, response.text
+    return [form["title"] for form in response.json()]
+
+
+def test_reads_use_replica_until_the_user_writes(authorized_client: TestClient, db: Session, test_user, router):
+    add_form(db, test_user)
+    # The fixture's own session pinned the user; start outside the window
+    router._writers.clear()
+    assert form_titles(authorized_client) == []
+    assert authorized_client.get("/api/v1/analytics/dashboard").json()["total_forms"] == 0
+
+    response = authorized_client.post(
+        "/api/v1/forms/", json={"title": "New", "type": "osha_300", "year": 2024, "content": {}}
+    )
+    assert response.status_code == 200
+    assert asyncio.run(router.is_sticky(test_user.id))
+    assert sorted(form_titles(authorized_client)) == ["Form 300", "New"]
+    assert authorized_client.get(f"/api/v1/forms/{response.json()['id']}").status_code == 200
+
+
+def test_falls_back_to_primary_when_replica_down_or_lagging(
+    authorized_client: TestClient, db: Session, test_user, router, tmp_path
+):
+    add_form(db, test_user)
+    router._writers.clear()
+
+    router.sessionmaker = replica_sessionmaker(tmp_path / "missing" / "replica.db")
+    assert form_titles(authorized_client) == ["Form 300"]
+
+    router.sessionmaker = replica_sessionmaker(tmp_path / "replica.db")
+    router.max_lag = -1
+    assert form_titles(authorized_client) == ["Form 300"]
+
+    router.max_lag = 5
+    assert form_titles(authorized_client) == []
+
+
+def test_write_window_is_shared_between_workers(authorized_client: TestClient, db: Session, test_user, router):
+    add_form(db, test_user)
+    router._writers.clear()
+    router.shared = FakeSharedCache()
+
+    response = authorized_client.post(
+        "/api/v1/forms/", json={"title": "New", "type": "osha_300", "year": 2024, "content": {}}
+    )
+    assert response.status_code == 200
+    # The next read lands on a worker that didn't see the write
+    router._writers.clear()
+    assert sorted(form_titles(authorized_client)) == ["Form 300", "New"]
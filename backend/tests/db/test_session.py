@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.principals import principal_cache
+from app.core.security import create_access_token
+from app.db.session import async_database_uri
+
+
+def test_async_database_uri_maps_sync_drivers():
+    assert async_database_uri("postgresql://u:p@db:5432/complymate") == (
+        "postgresql+asyncpg://u:p@db:5432/complymate"
+    )
+    assert async_database_uri("postgresql+psycopg2://u:p@db/complymate") == (
+        "postgresql+asyncpg://u:p@db/complymate"
+    )
+    assert async_database_uri("sqlite:///./complymate.db") == "sqlite+aiosqlite:///./complymate.db"
+    assert async_database_uri("postgresql+asyncpg://u:p@db/complymate") == (
+        "postgresql+asyncpg://u:p@db/complymate"
+    )
+
+
+def test_one_connection_checkout_per_request(client: TestClient, test_user, async_engine):
+    headers = {"Authorization": f"Bearer {create_access_token(test_user.id)}"}
+    checkouts = []
+    event.listen(async_engine.sync_engine.pool, "checkout", lambda *args: checkouts.append(1))
+
+    def request(method, path, **kwargs):
+        # Cold principal cache: auth loads the user through the same session as the handler
+        principal_cache.clear()
+        checkouts.clear()
+        response = client.request(method, f"/api/v1{path}", headers=headers, **kwargs)
+        assert response.status_code == 200, (path, response.text)
+        assert len(checkouts) == 1, (method, path, len(checkouts))
+        return response.json()
+
+    form = {"title": "Log", "type": "osha_300", "year": 2024, "content": {}}
+    form_id = request("POST", "/forms/", json=form)["id"]
+    request("PUT", f"/forms/{form_id}", json={"title": "Renamed"})
+    request("POST", f"/forms/{form_id}/versions", json={"version_number": 1, "content": {}})
+    request("GET", f"/forms/{form_id}")
+    request("GET", "/forms/")
+    request("POST", "/chat/sessions", json={"form_id": form_id, "context": {}, "model_used": "m"})
+    request("GET", "/chat/sessions")
+    request("GET", "/files/")
+    request("GET", "/analytics/dashboard")
+    request("GET", "/search/", params={"q": "log"})
+    request("GET", "/auth/me")
+
+    # Warm principal cache: /me needs no connection at all
+    checkouts.clear()
+    client.get("/api/v1/auth/me", headers=headers)
+    assert checkouts == []
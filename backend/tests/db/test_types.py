@@ -0,0 +1,29 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.form import FILLED_FIELD_INDEXES, Form
+from app.services.form_query_service import FormQueryService
+
+
+def compile_on(clause, dialect):
+    return str(clause.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def test_equality_filters_use_jsonb_containment_on_postgres():
+    clause = FormQueryService.field_filter("osha_300.cases[].employee_name:eq:Jane", "postgresql")
+    compiled = clause.compile(dialect=postgresql.dialect())
+    assert str(compiled).startswith("forms.content @> ")
+    assert list(compiled.params.values()) == [
+        {"filled_fields": {"osha_300": {"cases": [{"employee_name": "Jane"}]}}}
+    ]
+
+
+def test_missing_filters_match_the_expression_indexes():
+    for dialect_name, dialect in (("postgresql", postgresql.dialect()), ("sqlite", sqlite.dialect())):
+        for name, path in FILLED_FIELD_INDEXES.items():
+            clause = FormQueryService.field_filter(f"{'.'.join(path)}:missing", dialect_name)
+            (index,) = [
+                index for index in Form.__table__.indexes
+                if index.name == name and index._ddl_if.dialect == dialect_name
+            ]
+            expression = str(index.expressions[1].compile(dialect=dialect))
+            assert expression in compile_on(clause, dialect)
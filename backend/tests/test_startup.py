@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def test_worker_boot_is_lazy_and_leaves_schema_to_alembic(tmp_path):
+    database = tmp_path / "boot.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}", "SECRET_KEY": "x"}
+    env.pop("OPENROUTER_API_KEY", None)
+    script = (
+        "import asyncio, json, sys\n"
+        "from app.main import app\n"
+        "async def boot():\n"
+        "    async with app.router.lifespan_context(app):\n"
+        "        pass\n"
+        "asyncio.run(boot())\n"
+        "print(json.dumps([name for name in ('pdfplumber', 'requests') if name in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+    # No create_all: the database isn't even opened
+    assert not database.exists()
+
+
+def test_llm_call_without_key_returns_error(monkeypatch):
+    from app.core.config import settings
+    from app.services.llm_service import chat_completion
+
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", None)
+    assert "error" in chat_completion([{"role": "user", "content": "hi"}], operation="chat")